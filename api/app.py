@@ -1,8 +1,8 @@
 import os
 import logging
 from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import text
 from dotenv import load_dotenv
 
 # تنظیم لاگر
@@ -11,14 +11,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-from api.database.database import engine, Base, get_db
+from api.database.database import engine, Base
 from api.routes.response_routes import router as response_router
 from api.routes.passport_routes import router as passport_router
 from api.routes.message_routes import router as message_routes
 from api.routes.trip_routes import router as trip_routes
 from api.routes import extract_info_routes
-from api.services.openai_service import OpenAIService
-from api.services.google_sheets_service import GoogleSheetsService
+from api.routes.metrics_routes import router as metrics_routes
+from api.routes.artifact_routes import router as artifact_routes
+from api.services.config_service import env_flag
+from api.services.dns_service import dns_resolver, configured_service_hosts
+from api.services.janitor_service import get_janitor
+from api.services.knowledge_base_service import get_knowledge_base_cache
+from api.services.answer_cache_service import get_answer_cache_builder
+from api.services.health_service import get_health_monitor
 
 from api.routes.assistant_routes import router as assistant_routes
 
@@ -86,6 +92,65 @@ except Exception as e:
     logger.warning(f"Could not initialize database: {e}")
     logger.info("Application will continue without persistent database")
 
+
+@app.on_event("startup")
+def start_dns_cache():
+    """Route outbound HTTP through the shared DNS cache and warm it up."""
+    dns_resolver.install()
+    dns_resolver.prefetch(configured_service_hosts())
+
+
+@app.on_event("startup")
+def start_janitor():
+    """Remove expired temporary audio and artifacts in the background."""
+    if env_flag("JANITOR_ENABLED", "true"):
+        get_janitor().start()
+
+
+@app.on_event("shutdown")
+def stop_janitor():
+    get_janitor().stop()
+
+
+@app.on_event("startup")
+def start_knowledge_base():
+    """Serve the knowledge base snapshot at once and fetch the sheet in the background."""
+    cache = get_knowledge_base_cache()
+    cache.load(fetch=False)
+    cache.start()
+
+
+@app.on_event("shutdown")
+def stop_knowledge_base():
+    get_knowledge_base_cache().stop()
+
+
+@app.on_event("startup")
+def start_answer_cache_builder():
+    """Pre-synthesize knowledge sheet answers in the background, if configured."""
+    builder = get_answer_cache_builder()
+    if builder is not None:
+        builder.start()
+
+
+@app.on_event("shutdown")
+def stop_answer_cache_builder():
+    builder = get_answer_cache_builder()
+    if builder is not None:
+        builder.stop()
+
+
+@app.on_event("startup")
+def start_health_probes():
+    """Check dependencies in the background for the readiness endpoint."""
+    get_health_monitor().start()
+
+
+@app.on_event("shutdown")
+def stop_health_probes():
+    get_health_monitor().stop()
+
+
 # Include API routes
 app.include_router(response_router, prefix="/api/v1", tags=["responses"])
 app.include_router(passport_router, prefix="/api/v1", tags=["passport"])
@@ -93,43 +158,43 @@ app.include_router(message_routes, prefix="/api/v1", tags=["messages"])
 app.include_router(trip_routes, prefix="/api/v1", tags=["trip"])
 app.include_router(extract_info_routes.router, prefix="/api/v1", tags=["extract-info"])
 app.include_router(assistant_routes, prefix="/api/v1/aiassistant", tags=["aiassistant"])
+app.include_router(metrics_routes, prefix="/api/v1", tags=["metrics"])
+app.include_router(artifact_routes, prefix="/api/v1", tags=["artifacts"])
+
+
+# Keys GET / reported before the checks became background probes
+ROOT_CONNECTION_ALIASES = {
+    "openai": "chat_service",
+    "google_sheets": "knowledge_base",
+}
 
 
 @app.get("/")
-async def root():
-    """Check application and services status."""
-    status = {
+def root():
+    """Application status with the dependency checks from the last probe round."""
+    checks = get_health_monitor().status()["checks"]
+    connections = {
+        name: check.get("detail", check["status"]) for name, check in checks.items()
+    }
+    for alias, name in ROOT_CONNECTION_ALIASES.items():
+        if name in connections:
+            connections[alias] = connections[name]
+    return {
         "status": "running",
         "version": "1.0.0",
         "environment": os.getenv("ENVIRONMENT", "development"),
-        "connections": {
-            "database": "checking...",
-            "openai": "checking...",
-            "google_sheets": "checking...",
-        },
+        "connections": connections,
     }
 
-    # DB connection test
-    try:
-        db = next(get_db())
-        db.execute(text("SELECT 1"))
-        status["connections"]["database"] = "connected"
-    except Exception as e:
-        status["connections"]["database"] = f"not available: {e}"
-
-    # OpenAI test
-    try:
-        _ = OpenAIService()
-        status["connections"]["openai"] = "configured"
-    except Exception as e:
-        status["connections"]["openai"] = f"error: {e}"
-
-    # Google Sheets test
-    try:
-        sheets_service = GoogleSheetsService()
-        sheets_service.get_sheet_data()
-        status["connections"]["google_sheets"] = "connected"
-    except Exception as e:
-        status["connections"]["google_sheets"] = f"error: {e}"
-
-    return status
+
+@app.get("/healthz")
+def liveness():
+    """Liveness: the process answers requests. Checks no dependency."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readiness():
+    """Readiness: 503 while a critical dependency failed its last background probe."""
+    status = get_health_monitor().status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
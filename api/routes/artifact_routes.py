@@ -0,0 +1,71 @@
+import time
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from api.services.artifact_store_service import (
+    KEY_RE,
+    get_artifact_store,
+    parse_range,
+    verify_signature,
+)
+from api.services.metrics_service import metrics
+
+router = APIRouter()
+
+
+@router.get("/artifacts/{key}")
+def get_artifact(
+    key: str,
+    expires: int,
+    sig: str,
+    range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+):
+    """Serve a stored clip through a signed, short-lived URL, with Range support."""
+    if not KEY_RE.match(key) or not verify_signature(key, expires, sig):
+        metrics.increment("artifact_requests_total", labels={"status": "403"})
+        raise HTTPException(status_code=403, detail="Invalid or expired artifact URL")
+
+    store = get_artifact_store()
+    artifact = store.get(key)
+    if artifact is None:
+        metrics.increment("artifact_requests_total", labels={"status": "404"})
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+    # Keys are content hashes, so the bytes never change, but the signed URL
+    # does: a cached copy must not outlive it
+    headers = {
+        "ETag": artifact.etag,
+        "Cache-Control": f"public, max-age={max(0, expires - int(time.time()))}",
+        "Accept-Ranges": "bytes",
+    }
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or artifact.etag in [tag.strip() for tag in if_none_match.split(",")]
+    ):
+        metrics.increment("artifact_requests_total", labels={"status": "304"})
+        return Response(status_code=304, headers=headers)
+
+    try:
+        byte_range = parse_range(range, artifact.size)
+    except ValueError:
+        metrics.increment("artifact_requests_total", labels={"status": "416"})
+        return Response(
+            status_code=416, headers={"Content-Range": f"bytes */{artifact.size}"}
+        )
+
+    status_code = 200
+    start, end = 0, artifact.size - 1
+    if byte_range is not None:
+        status_code = 206
+        start, end = byte_range["start"], byte_range["end"]
+        headers["Content-Range"] = f"bytes {start}-{end}/{artifact.size}"
+    headers["Content-Length"] = str(end - start + 1)
+    metrics.increment("artifact_requests_total", labels={"status": str(status_code)})
+    metrics.increment("artifact_bytes_served_total", end - start + 1)
+    return StreamingResponse(
+        store.iter_range(artifact, start, end),
+        status_code=status_code,
+        media_type=artifact.content_type,
+        headers=headers,
+    )
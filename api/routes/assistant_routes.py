@@ -1,15 +1,37 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from api.schemas.assistant_schema import ChatRequest, ChatResponse, Message
 from api.services.openai_service import OpenAIService
 from api.services.avashow_service import AvashowService
 from api.services.lipsync_service import LipSyncService
+from api.services.lipsync_codec import RHUBARB, encode_lipsync
 from api.services.file_service import FileService
-from api.services.elevenlabs_service import ElevenLabsService
+from api.services.tts_service import TTSRouter, get_tts_router
+from api.services.batch_tts_service import synthesize_batch
+from api.services.phrase_library_service import get_phrase_library
+from api.services.answer_cache_service import get_answer_cache
+from api.services.config_service import env_flag
+from api.services.dns_service import dns_resolver
+from api.services.metrics_service import StageTimer, metrics
+from api.services.multipart_service import accepts_multipart, build_multipart
+from api.services.artifact_store_service import get_artifact_store, signed_url
+from api.services.knowledge_base_service import get_knowledge_base_cache
+from api.services.fast_json_service import (
+    chat_response_json,
+    is_json_object,
+    iter_chat_response_json,
+)
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 import os
+import json
+import time
+import base64
 import logging
 import tempfile
 import re
-import socket
 import requests
 
 # تنظیم لاگر
@@ -18,6 +40,170 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Parse the chat service's response incrementally and synthesize messages in parallel
+# (streamed requests are not hedged, see OpenAIService.iter_assistant_response)
+INCREMENTAL_PARSING = env_flag("CHAT_INCREMENTAL_PARSING", "false")
+MEDIA_PIPELINE_WORKERS = int(os.getenv("CHAT_MEDIA_WORKERS", "3"))
+# Synthesize all messages of a reply in one TTS request and split it at the pauses
+# (sequential path only; the incremental path synthesizes as messages arrive)
+BATCH_TTS = env_flag("CHAT_BATCH_TTS", "false")
+# Serve sentences found in the pre-built phrase library without TTS or lipsync
+PHRASE_LIBRARY_ENABLED = env_flag("CHAT_PHRASE_LIBRARY", "true")
+# Serve knowledge sheet answers pre-synthesized by build_answer_cache.py
+ANSWER_CACHE_ENABLED = env_flag("CHAT_ANSWER_CACHE", "true")
+# How replies carry audio unless the client asks: "inline" base64 or "url"
+AUDIO_DELIVERY_MODES = ("inline", "multipart", "url")
+AUDIO_DELIVERY = os.getenv("CHAT_AUDIO_DELIVERY", "inline").lower()
+# Serialize replies with the fast encoder, embedding Rhubarb's JSON verbatim
+FAST_JSON_RESPONSE = env_flag("CHAT_FAST_JSON", "true")
+# Answer questions that match a knowledge sheet row closely from the sheet itself
+FAQ_FAST_PATH = env_flag("CHAT_FAQ_FAST_PATH", "true")
+# Stream inline replies, base64 encoding each mp3 from disk as it is sent
+STREAMING_JSON_RESPONSE = env_flag("CHAT_STREAMING_RESPONSE", "true")
+# Pipe TTS audio into ffmpeg as it downloads instead of converting afterwards
+STREAMING_TTS_DECODE = env_flag("CHAT_STREAMING_TTS_DECODE", "true")
+
+
+def audio_delivery_mode(requested: Optional[str], accept: Optional[str]) -> str:
+    """
+    How a reply carries its audio: "url" when the client asks for it,
+    "multipart" when its Accept header lists multipart/mixed, otherwise
+    "inline" base64 (or CHAT_AUDIO_DELIVERY).
+    """
+    if requested == "url":
+        return "url"
+    if accepts_multipart(accept):
+        return "multipart"
+    return requested if requested in AUDIO_DELIVERY_MODES else AUDIO_DELIVERY
+
+
+def message_audio_bytes(message: Message) -> Optional[bytes]:
+    if message._audio_bytes is not None:
+        return message._audio_bytes
+    # Canned replies (intro, error audio) still come base64 encoded
+    return base64.b64decode(message.audio) if message.audio else None
+
+
+def parse_raw_lipsync(message: Message):
+    """Turn verbatim lipsync bytes into a dict, for paths that need to look inside."""
+    if message._lipsync_raw is not None and message.lipsync is None:
+        message.lipsync = json.loads(message._lipsync_raw)
+    message._lipsync_raw = None
+
+
+def remove_files(paths: List[str]):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # the janitor gets whatever is left
+
+
+def json_response(messages: List[Message], response: Optional[Response] = None):
+    """
+    The reply as JSON: the fast encoder, or the ChatResponse model when disabled.
+
+    Messages whose audio is still on disk are streamed, and their mp3 files are
+    removed once the reply has been sent.
+    """
+    if not FAST_JSON_RESPONSE:
+        for message in messages:
+            parse_raw_lipsync(message)
+        return ChatResponse(messages=messages)
+    headers = {}
+    if response is not None and "Server-Timing" in response.headers:
+        headers["Server-Timing"] = response.headers["Server-Timing"]
+    audio_paths = [m._audio_path for m in messages if m._audio_path is not None]
+    if audio_paths:
+        return StreamingResponse(
+            iter_chat_response_json(messages),
+            media_type="application/json",
+            headers=headers,
+            background=BackgroundTask(remove_files, audio_paths),
+        )
+    return Response(
+        content=chat_response_json(messages),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+def chat_response(
+    messages: List[Message],
+    lipsync_format: str,
+    audio_delivery: str = "inline",
+    response: Optional[Response] = None,
+):
+    """
+    ChatResponse with every message's lipsync in the format the client asked for.
+
+    With "url" delivery each clip goes to the artifact store and the message
+    carries a signed audioUrl instead of base64. With "multipart" the reply is
+    multipart/mixed: part 0 is the JSON manifest, and each message's mp3 follows
+    as a raw audio/mpeg part that the message references by its audioPart index.
+    Headers already set on response are carried over.
+    """
+    if lipsync_format != RHUBARB:
+        for message in messages:
+            parse_raw_lipsync(message)
+            message.lipsync = encode_lipsync(message.lipsync, lipsync_format)
+    metrics.increment("chat_responses_total", labels={"format": audio_delivery})
+
+    if audio_delivery == "url":
+        store = get_artifact_store()
+        for message in messages:
+            audio = message_audio_bytes(message)
+            if audio is not None:
+                message.audioUrl = signed_url(store.put(audio, "audio/mpeg").key)
+                message.audio = None
+        return json_response(messages, response)
+
+    if audio_delivery != "multipart":
+        return json_response(messages, response)
+
+    audio_parts = []
+    for message in messages:
+        audio = message_audio_bytes(message)
+        if audio is not None:
+            audio_parts.append(({"Content-Type": "audio/mpeg"}, audio))
+            message.audioPart = len(audio_parts)
+            message.audio = None
+    manifest = chat_response_json(messages)
+    body, content_type = build_multipart(
+        [({"Content-Type": "application/json"}, manifest)] + audio_parts
+    )
+    headers = {}
+    if response is not None and "Server-Timing" in response.headers:
+        headers["Server-Timing"] = response.headers["Server-Timing"]
+    return Response(content=body, media_type=content_type, headers=headers)
+
+
+def faq_messages(
+    question: str, is_english: bool, timings: StageTimer
+) -> Optional[list]:
+    """
+    The reply as assistant messages when the question matches a knowledge sheet
+    row with high confidence, so the chat service can be skipped.
+    """
+    if not FAQ_FAST_PATH:
+        return None
+    with timings.stage("faq"):
+        row = (
+            get_knowledge_base_cache()
+            .get()
+            .faq.answer(question, "en" if is_english else "fa")
+        )
+    metrics.increment("faq_fast_path_total", labels={"hit": "true" if row else "false"})
+    if row is None:
+        return None
+    # What the skipped call would typically have taken
+    saved = metrics.get_percentile("chat_stage_seconds", 0.5, {"stage": "chat_service"})
+    if saved is not None:
+        metrics.increment("faq_latency_saved_seconds_total", saved)
+    return [
+        {"text": row["answer"], "facialExpression": "smile", "animation": "Talking_1"}
+    ]
+
 
 def get_avashow_api_key():
     return os.getenv("AVASHOW_GATEWAY_TOKEN")
@@ -74,58 +260,6 @@ def clean_text_from_json(text: str) -> str:
     return cleaned_text
 
 
-def cleanup_temp_files(session_id: str = None):
-    """Clean up temporary message files from audios directory"""
-    try:
-        import glob
-
-        if session_id:
-            # Clean up files for specific session
-            session_suffix = (
-                session_id.split("_")[-1] if "_" in session_id else session_id[-8:]
-            )
-            temp_patterns = [
-                f"audios/message_{session_suffix}_*.mp3",
-                f"audios/message_{session_suffix}_*.wav",
-                f"audios/message_{session_suffix}_*.json",
-            ]
-            logger.info(f"🧹 Cleaning up files for session: {session_suffix}")
-        else:
-            # Clean up all temporary message files
-            temp_patterns = [
-                "audios/message_*.mp3",
-                "audios/message_*.wav",
-                "audios/message_*.json",
-            ]
-            logger.info("🧹 Cleaning up all temporary message files")
-
-        cleaned_files = []
-        for pattern in temp_patterns:
-            files = glob.glob(pattern)
-            for file_path in files:
-                try:
-                    # Skip permanent files (like introduction, errorMessage, etc.)
-                    filename = os.path.basename(file_path)
-                    if filename.startswith(
-                        ("introduction", "errorMessage", "intro_", "api_")
-                    ):
-                        continue
-
-                    os.remove(file_path)
-                    cleaned_files.append(file_path)
-                    logger.info(f"🗑️ Cleaned up temp file: {file_path}")
-                except Exception as e:
-                    logger.warning(f"⚠️ Could not remove {file_path}: {e}")
-
-        if cleaned_files:
-            logger.info(f"✅ Cleaned up {len(cleaned_files)} temporary files")
-        else:
-            logger.info("ℹ️ No temporary files to clean up")
-
-    except Exception as e:
-        logger.error(f"❌ Error during cleanup: {e}")
-
-
 @router.get("/")
 def root():
     logger.info("Root endpoint called")
@@ -155,7 +289,9 @@ def test_text_cleaning():
 
 
 @router.get("/intro", response_model=ChatResponse)
-def play_introduction(language: str = "fa"):
+def play_introduction(
+    language: str = "fa", lipsync_format: str = RHUBARB, audio_delivery: str = "inline"
+):
     """Prepare audio+lip-sync for introduction in selected language (fa or en)."""
     try:
         logger.info("=" * 80)
@@ -248,7 +384,9 @@ def play_introduction(language: str = "fa"):
         )
 
         logger.info("✅ /intro completed successfully")
-        return ChatResponse(messages=[message])
+        return chat_response(
+            [message], lipsync_format, audio_delivery_mode(audio_delivery, None)
+        )
 
     except HTTPException:
         raise
@@ -273,25 +411,524 @@ def test_connectivity():
 @router.get("/test-dns")
 def test_dns():
     try:
-        ip = socket.gethostbyname("elevenlab-test.vercel.app")
-        return {"status": "success", "ip": ip}
+        host = (
+            urlparse(os.getenv("EXTERNAL_CHAT_SERVICE_URL") or "").hostname
+            or "elevenlab-test.vercel.app"
+        )
+        ips = dns_resolver.resolve(host)
+        return {"status": "success", "host": host, "ip": ips[0], "ips": ips}
     except Exception as e:
         logger.error(f"DNS resolution failed: {e}")
         return {"status": "error", "message": str(e)}
 
 
+def is_error_message(message) -> bool:
+    return (
+        isinstance(message, dict)
+        and message.get("text") == "ERROR_SERVICE_UNAVAILABLE"
+        and message.get("is_error", False)
+    )
+
+
+def find_presynthesized(text: str, is_english: bool, record: bool = True):
+    """The phrase library entry or pre-synthesized answer for text, if any."""
+    language = "en" if is_english else "fa"
+    phrase = None
+    if PHRASE_LIBRARY_ENABLED:
+        phrase = get_phrase_library().lookup(text, language, record=record)
+    if phrase is None and ANSWER_CACHE_ENABLED:
+        phrase = get_answer_cache().lookup(text, language, record=record)
+    return phrase
+
+
+def prepare_batch_audio(
+    messages: list,
+    session_id: str,
+    is_english: bool,
+    tts_router: TTSRouter,
+    timings: StageTimer,
+) -> Dict[int, Tuple[str, str]]:
+    """Synthesize a multi-message reply in one TTS call; {index: (mp3, provider)}."""
+    indexes = [
+        i
+        for i, message in enumerate(messages)
+        if isinstance(message, dict)
+        and (message.get("text") or "").strip()
+        and not is_error_message(message)
+        and not find_presynthesized(
+            clean_text_from_json(message["text"]), is_english, record=False
+        )
+    ]
+    if len(indexes) < 2:
+        return {}
+    session_suffix = session_id.split("_")[-1] if "_" in session_id else session_id[-8:]
+    prefix = os.path.join("audios", f"message_{session_suffix}_batch")
+    try:
+        with timings.stage("tts"):
+            result = synthesize_batch(
+                tts_router,
+                [messages[i]["text"] for i in indexes],
+                "en" if is_english else "fa",
+                prefix,
+            )
+    except Exception as e:
+        logger.warning(f"⚠️ Batch TTS failed, synthesizing per message: {e}")
+        return {}
+    if result is None:
+        logger.info("ℹ️ Batch TTS split not confident enough, synthesizing per message")
+        return {}
+    logger.info(
+        f"✅ Batch TTS split {len(indexes)} messages (confidence {result.confidence:.2f})"
+    )
+    return {i: (clip, result.provider) for i, clip in zip(indexes, result.clips)}
+
+
+def process_assistant_message(
+    i: int,
+    message,
+    total: Optional[int],
+    session_id: str,
+    is_english: bool,
+    can_write_files: bool,
+    tts_router: TTSRouter,
+    lipsync_service: LipSyncService,
+    file_service: FileService,
+    timings: Optional[StageTimer] = None,
+    prepared_audio: Optional[Tuple[str, str]] = None,
+    raw_audio: bool = False,
+    stream_audio: bool = False,
+) -> Message:
+    """Turn one assistant message into a Message with audio and lip-sync when possible.
+
+    prepared_audio is an already synthesized (mp3 path, provider) to use instead
+    of calling TTS for this message. With raw_audio the mp3 is kept as bytes for a
+    multipart reply instead of being base64 encoded into the message. With
+    stream_audio the mp3 stays on disk and is encoded while the reply streams out.
+    """
+    timings = timings or StageTimer()
+    logger.info(f"📝 Processing Message {i + 1}/{total or '?'}:")
+    logger.info(f"   - Message Type: {type(message)}")
+    logger.info(f"   - Message Content: {message}")
+
+    try:
+        text_value = message.get("text") if isinstance(message, dict) else str(message)
+        logger.info(f"   - Extracted Text: '{text_value}'")
+    except Exception as extract_error:
+        text_value = str(message)
+        logger.warning(f"   - Text extraction failed: {extract_error}")
+        logger.info(f"   - Fallback Text: '{text_value}'")
+
+    logger.info(f"   - Final Text Value: '{text_value if text_value else 'No text'}'")
+
+    # Check if this is an error response from the external service
+    is_error_response = is_error_message(message)
+
+    if is_error_response:
+        logger.info("🚨 Processing ERROR response from external service")
+        error_language = message.get("language", "fa")
+        logger.info(f"   - Error Language: {error_language}")
+
+        # Determine error audio file based on language
+        if error_language.lower().startswith("en"):
+            error_audio_file = "audios/errorMessage_en.mp3"
+            error_text_file = "audios/errorMessage_en.txt"
+            logger.info("   - Using English error message")
+        else:
+            error_audio_file = "audios/errorMessage.mp3"
+            error_text_file = "audios/errorMessage.txt"
+            logger.info("   - Using Persian error message")
+
+        # Read error text
+        try:
+            with open(error_text_file, "r", encoding="utf-8") as f:
+                error_text = f.read().strip()
+            logger.info(f"   - Error Text: '{error_text}'")
+        except Exception as e:
+            logger.error(f"   - Failed to read error text file: {e}")
+            error_text = "خطا در دریافت پاسخ از سرور"
+
+        # Create error message with audio and lipsync
+        try:
+            if os.path.exists(error_audio_file):
+                logger.info(f"   - Error audio file found: {error_audio_file}")
+
+                # Convert MP3 to WAV for lipsync
+                error_wav_file = error_audio_file.replace(".mp3", ".wav")
+                error_json_file = error_audio_file.replace(".mp3", ".json")
+
+                logger.info(f"   - Converting error audio to WAV: {error_wav_file}")
+                lipsync_service.mp3_to_wav(error_audio_file, error_wav_file)
+
+                logger.info(f"   - Generating error lipsync: {error_json_file}")
+                lipsync_service.wav_to_lipsync_json(error_wav_file, error_json_file)
+
+                # Read audio and lipsync data
+                audio_base64 = file_service.audio_file_to_base64(error_audio_file)
+                lipsync_data = file_service.read_json_transcript(error_json_file)
+
+                logger.info(
+                    "   ✅ Error message with audio and lipsync created successfully"
+                )
+
+                error_message = Message(
+                    text=error_text,
+                    audio=audio_base64,
+                    lipsync=lipsync_data,
+                    facialExpression="sad",
+                    animation="Sad",
+                )
+
+                logger.info(f"   ✅ Error message {i + 1} added to response")
+                return error_message  # Skip normal processing for this message
+            else:
+                logger.warning(f"   - Error audio file not found: {error_audio_file}")
+        except Exception as e:
+            logger.error(f"   - Failed to process error audio: {e}")
+
+        # Fallback: create error message without audio
+        fallback_error_message = Message(
+            text=error_text,
+            audio=None,
+            lipsync=None,
+            facialExpression="sad",
+            animation="Sad",
+        )
+        logger.info(f"   ✅ Fallback error message {i + 1} added to response")
+        return fallback_error_message  # Skip normal processing for this message
+
+    phrase = None
+    if text_value:
+        phrase = find_presynthesized(clean_text_from_json(text_value), is_english)
+    if phrase:
+        try:
+            if raw_audio:
+                audio_bytes, lipsync_data = phrase.load_bytes()
+                audio_base64 = None
+            else:
+                audio_base64, lipsync_data = phrase.load()
+                audio_bytes = None
+            logger.info(f"   📚 Served from the {phrase.served_by}: '{phrase.text}'")
+            # Built from our own data, so skip validation
+            phrase_message = Message.model_construct(
+                text=clean_text_from_json(text_value),
+                audio=audio_base64,
+                lipsync=lipsync_data,
+                facialExpression=(
+                    message.get("facialExpression", "default")
+                    if isinstance(message, dict)
+                    else "default"
+                ),
+                animation=(
+                    message.get("animation") or "StandingIdle"
+                    if isinstance(message, dict)
+                    else "StandingIdle"
+                ),
+                ttsProvider=phrase.served_by,
+            )
+            phrase_message._audio_bytes = audio_bytes
+            return phrase_message
+        except Exception as e:
+            logger.warning(
+                f"   ⚠️ {phrase.served_by} entry unusable, synthesizing: {e}"
+            )
+
+    if can_write_files:
+        logger.info(f"   🎵 Audio Processing Enabled for Message {i + 1}")
+        try:
+            # Ensure audios directory exists
+            logger.info(f"   📁 Ensuring audios directory exists")
+            os.makedirs("audios", exist_ok=True)
+
+            # Create unique filename with session ID to prevent conflicts
+            session_suffix = (
+                session_id.split("_")[-1] if "_" in session_id else session_id[-8:]
+            )
+            file_name = os.path.join("audios", f"message_{session_suffix}_{i}.mp3")
+            logger.info(f"   📄 Target Audio File: {file_name}")
+            logger.info(f"   🔑 Session Suffix: {session_suffix}")
+
+            text_input = (
+                message.get("text", "") if isinstance(message, dict) else str(message)
+            )
+            logger.info(
+                f"   📝 Text Input for TTS: '{text_input[:100]}{'...' if len(text_input) > 100 else ''}'"
+            )
+
+            # تبدیل متن به گفتار - انتخاب سرویس بر اساس زبان
+            logger.info(f"   🔊 Converting text to speech:")
+            logger.info(
+                f"      - Language: {'English' if is_english else 'Non-English'}"
+            )
+            logger.info(f"      - Text Length: {len(text_input)} characters")
+
+            wav_file = os.path.join("audios", f"message_{session_suffix}_{i}.wav")
+            json_file = os.path.join("audios", f"message_{session_suffix}_{i}.json")
+            # Leftovers of an earlier failed turn must not pass for this one's
+            for stale_file in (wav_file, json_file):
+                if os.path.exists(stale_file):
+                    os.remove(stale_file)
+
+            # Decode to WAV while the audio streams in; one decoder per TTS attempt
+            decoders = []
+
+            def start_decoder():
+                decoders.append(lipsync_service.mp3_stream_to_wav(wav_file))
+                return decoders[-1]
+
+            tts_provider = None
+            wav_ready = False
+            try:
+                if prepared_audio:
+                    os.replace(prepared_audio[0], file_name)
+                    tts_provider = prepared_audio[1]
+                else:
+                    with timings.stage("tts"):
+                        tts_provider = tts_router.synthesize(
+                            text_input,
+                            file_name,
+                            "en" if is_english else "fa",
+                            start_decoder if STREAMING_TTS_DECODE else None,
+                        )
+                logger.info(f"      ✅ TTS conversion completed by {tts_provider}")
+                if decoders:
+                    decoder = decoders[-1]
+                    with timings.stage("mp3_to_wav"):
+                        wav_ready = decoder.close()
+                    if wav_ready:
+                        timings.add("tts_first_byte", decoder.first_byte_seconds)
+                        timings.add(
+                            "first_byte_to_wav", decoder.first_byte_to_ready_seconds
+                        )
+            except Exception as tts_error:
+                logger.warning(f"      ❌ TTS failed: {tts_error}")
+                logger.warning(f"      - Error Type: {type(tts_error).__name__}")
+                logger.warning(f"      - Skipping audio generation for this message")
+                # Continue without audio if TTS fails
+
+            # Check if audio file was created
+            if os.path.exists(file_name):
+                file_size = os.path.getsize(file_name)
+                logger.info(f"      ✅ Audio file created successfully:")
+                logger.info(f"         - File: {file_name}")
+                logger.info(f"         - Size: {file_size} bytes")
+                logger.info(f"         - Absolute Path: {os.path.abspath(file_name)}")
+            else:
+                logger.warning(
+                    f"      ❌ Expected audio file not found after TTS: {file_name}"
+                )
+
+            logger.info(f"   📄 Lip Sync Files:")
+            logger.info(f"      - WAV File: {wav_file}")
+            logger.info(f"      - JSON File: {json_file}")
+
+            # تبدیل mp3 به wav
+            logger.info(f"   🔄 Converting MP3 to WAV:")
+            logger.info(f"      - Source: {file_name}")
+            logger.info(f"      - Target: {wav_file}")
+            try:
+                if wav_ready:
+                    logger.info(f"      ✅ WAV decoded while the audio streamed in")
+                else:
+                    with timings.stage("mp3_to_wav"):
+                        lipsync_service.mp3_to_wav(file_name, wav_file)
+                    logger.info(f"      ✅ MP3 to WAV conversion completed")
+
+                # Check WAV file
+                if os.path.exists(wav_file):
+                    wav_size = os.path.getsize(wav_file)
+                    logger.info(f"      - WAV file size: {wav_size} bytes")
+                else:
+                    logger.warning(f"      ❌ WAV file not created: {wav_file}")
+            except Exception as wav_error:
+                logger.error(f"      ❌ MP3 to WAV conversion failed: {wav_error}")
+
+            # تولید lipsync
+            logger.info(f"   🎭 Generating Lip Sync:")
+            logger.info(f"      - Source WAV: {wav_file}")
+            logger.info(f"      - Target JSON: {json_file}")
+            try:
+                with timings.stage("lipsync"):
+                    lipsync_service.wav_to_lipsync_json(wav_file, json_file)
+                logger.info(f"      ✅ Lip sync generation completed")
+
+                # Check JSON file
+                if os.path.exists(json_file):
+                    json_size = os.path.getsize(json_file)
+                    logger.info(f"      - JSON file size: {json_size} bytes")
+                else:
+                    logger.warning(f"      ❌ JSON file not created: {json_file}")
+            except Exception as lipsync_error:
+                logger.error(f"      ❌ Lip sync generation failed: {lipsync_error}")
+
+            # خواندن فایل‌ها
+            logger.info(f"   📖 Reading Generated Files:")
+            audio_base64 = None
+            audio_bytes = None
+            audio_path = None
+            try:
+                with timings.stage("encode"):
+                    if stream_audio and os.path.exists(file_name):
+                        audio_path = file_name
+                    elif raw_audio:
+                        audio_bytes = file_service.audio_file_to_bytes(file_name)
+                    else:
+                        audio_base64 = file_service.audio_file_to_base64(file_name)
+                if audio_path:
+                    logger.info(f"      ✅ Audio left on disk to stream with the reply")
+                else:
+                    logger.info(
+                        f"      ✅ Audio file read (length: {len(audio_bytes or audio_base64 or '')})"
+                    )
+            except Exception as audio_error:
+                logger.error(f"      ❌ Audio base64 conversion failed: {audio_error}")
+
+            lipsync_data = None
+            lipsync_raw = None
+            try:
+                with timings.stage("encode"):
+                    if FAST_JSON_RESPONSE:
+                        lipsync_raw = file_service.read_json_bytes(json_file)
+                        if not is_json_object(lipsync_raw):
+                            raise ValueError("lipsync file is not a JSON object")
+                    else:
+                        lipsync_data = file_service.read_json_transcript(json_file)
+                logger.info(f"      ✅ Lip sync data read successfully")
+                logger.info(
+                    f"      - Lip sync data length: {len(lipsync_raw or str(lipsync_data or ''))}"
+                )
+            except Exception as lipsync_read_error:
+                logger.error(
+                    f"      ❌ Lip sync data reading failed: {lipsync_read_error}"
+                )
+                lipsync_data = None
+                lipsync_raw = None
+
+            # Create final message
+            logger.info(f"   📝 Creating Final Message:")
+            cleaned_text = clean_text_from_json(message.get("text", ""))
+            facial_expression = (
+                message.get("facialExpression", "default")
+                if isinstance(message, dict)
+                else "default"
+            )
+            animation = (
+                message.get("animation", "StandingIdle")
+                if isinstance(message, dict) and message.get("animation") is not None
+                else "StandingIdle"
+            )
+
+            logger.info(
+                f"      - Cleaned Text: '{cleaned_text[:100]}{'...' if len(cleaned_text) > 100 else ''}'"
+            )
+            logger.info(f"      - Facial Expression: '{facial_expression}'")
+            logger.info(f"      - Animation: '{animation}'")
+            logger.info(
+                f"      - Audio Present: {any(a is not None for a in (audio_base64, audio_bytes, audio_path))}"
+            )
+            logger.info(
+                f"      - Lip Sync Present: {lipsync_data is not None or lipsync_raw is not None}"
+            )
+
+            # Built from our own data, so skip validation
+            final_message = Message.model_construct(
+                text=cleaned_text,
+                audio=audio_base64,
+                lipsync=lipsync_data,
+                facialExpression=facial_expression,
+                animation=animation,
+                ttsProvider=tts_provider,
+            )
+            final_message._audio_bytes = audio_bytes
+            final_message._audio_path = audio_path
+            final_message._lipsync_raw = lipsync_raw
+
+            logger.info(f"   ✅ Message {i + 1} processed successfully with audio")
+
+            # پاک کردن فایل‌های موقت
+            try:
+                if audio_path:
+                    logger.info(f"   📤 Keeping MP3 file until the reply is sent")
+                elif os.path.exists(file_name):
+                    os.remove(file_name)
+                    logger.info(f"   🗑️ Cleaned up MP3 file: {file_name}")
+                if os.path.exists(wav_file):
+                    os.remove(wav_file)
+                    logger.info(f"   🗑️ Cleaned up WAV file: {wav_file}")
+                if os.path.exists(json_file):
+                    os.remove(json_file)
+                    logger.info(f"   🗑️ Cleaned up JSON file: {json_file}")
+                logger.info(f"   ✅ Temporary files cleaned up for message {i + 1}")
+            except Exception as e:
+                logger.warning(
+                    f"   ⚠️ Could not clean up temporary files for message {i + 1}: {e}"
+                )
+
+            return final_message
+
+        except Exception as e:
+            logger.error(f"   ❌ Error processing message {i + 1} with audio: {e}")
+            logger.error(f"      - Error Type: {type(e).__name__}")
+            logger.error(f"      - Error Details: {str(e)}")
+            logger.info(f"      - Creating fallback message without audio")
+
+            # در صورت خطا، پیام بدون audio و lipsync برگردان
+            fallback_message = Message(
+                text=clean_text_from_json(message.get("text", "")),
+                audio=None,
+                lipsync=None,
+                facialExpression=(
+                    message.get("facialExpression", "default")
+                    if isinstance(message, dict)
+                    else "default"
+                ),
+                animation=(
+                    message.get("animation", "StandingIdle")
+                    if isinstance(message, dict)
+                    and message.get("animation") is not None
+                    else "StandingIdle"
+                ),
+            )
+            logger.info(f"   ✅ Fallback message {i + 1} created successfully")
+            return fallback_message
+    else:
+        logger.info(f"   📝 File Writing Disabled - Creating Text-Only Message {i + 1}")
+        # Create message without audio when file writing is disabled
+        text_only_message = Message(
+            text=clean_text_from_json(message.get("text", "")),
+            audio=None,
+            lipsync=None,
+            facialExpression=(
+                message.get("facialExpression", "default")
+                if isinstance(message, dict)
+                else "default"
+            ),
+            animation=(
+                message.get("animation", "StandingIdle")
+                if isinstance(message, dict) and message.get("animation") is not None
+                else "StandingIdle"
+            ),
+        )
+        logger.info(f"   ✅ Text-only message {i + 1} created successfully")
+        return text_only_message
+
+
 @router.post("/chat", response_model=ChatResponse)
-def chat(request: ChatRequest):
+def chat(
+    request: ChatRequest, response: Response, accept: Optional[str] = Header(None)
+):
+    started = time.monotonic()
+    audio_delivery = audio_delivery_mode(request.audioDelivery, accept)
+    # Audio that leaves as a part or a URL is never base64 encoded
+    raw_audio = audio_delivery != "inline"
+    stream_audio = (
+        audio_delivery == "inline" and FAST_JSON_RESPONSE and STREAMING_JSON_RESPONSE
+    )
+    timings = StageTimer()
     logger.info("=" * 100)
     logger.info("🚀 STARTING /chat ENDPOINT")
     logger.info("=" * 100)
 
-    # Clean up any existing temporary files for this session before processing
-    logger.info(
-        f"🧹 Cleaning up previous temporary files for session: {request.session_id}"
-    )
-    cleanup_temp_files(request.session_id)
-
+    # Leftover temporary files are removed by the background janitor
     # Log incoming request details
     logger.info(f"📝 Incoming Request Details:")
     logger.info(f"   - Message: '{request.message}'")
@@ -308,11 +945,8 @@ def chat(request: ChatRequest):
         openai_service = OpenAIService()
         logger.info("   ✅ OpenAIService initialized")
 
-        avashow_service = AvashowService()
-        logger.info("   ✅ AvashowService initialized")
-
-        elevenlabs_service = ElevenLabsService()
-        logger.info("   ✅ ElevenLabsService initialized")
+        tts_router = get_tts_router()
+        logger.info("   ✅ TTSRouter ready")
 
         lipsync_service = LipSyncService()
         logger.info("   ✅ LipSyncService initialized")
@@ -388,7 +1022,7 @@ def chat(request: ChatRequest):
                 ),
             ]
 
-        return ChatResponse(messages=default_messages)
+        return chat_response(default_messages, request.lipsyncFormat, audio_delivery)
 
     # Validate required API keys depending on language
     logger.info("🔑 Validating API Keys:")
@@ -457,26 +1091,9 @@ def chat(request: ChatRequest):
                 ),
             ]
 
-        return ChatResponse(messages=api_messages)
+        return chat_response(api_messages, request.lipsyncFormat, audio_delivery)
 
     try:
-        # گرفتن پیام‌ها از OpenAI
-        logger.info("🤖 Calling OpenAI Service:")
-        logger.info(f"   - Message: '{request.message}'")
-        logger.info(f"   - Session ID: '{request.session_id}'")
-        logger.info(f"   - Language: '{request.language}'")
-
-        openai_messages: list = openai_service.get_assistant_response(
-            request.message, request.session_id, request.language
-        )
-
-        logger.info(f"✅ OpenAI Service Response:")
-        logger.info(
-            f"   - Messages Count: {len(openai_messages) if openai_messages else 0}"
-        )
-        logger.info(f"   - Messages Type: {type(openai_messages)}")
-        logger.info(f"   - Messages Content: {openai_messages}")
-
         result_messages = []
 
         # استفاده از مسیر قابل نوشتن
@@ -499,376 +1116,96 @@ def chat(request: ChatRequest):
             logger.warning(f"   ❌ Cannot write files to {audio_dir}: {e}")
             can_write_files = False
 
-        logger.info("🔄 Processing Messages:")
-        logger.info(
-            f"   - Total Messages to Process: {len(openai_messages) if openai_messages else 0}"
-        )
-
-        for i, message in enumerate(openai_messages or []):
-            logger.info(
-                f"📝 Processing Message {i + 1}/{len(openai_messages) if openai_messages else 0}:"
-            )
-            logger.info(f"   - Message Type: {type(message)}")
-            logger.info(f"   - Message Content: {message}")
-
-            try:
-                text_value = (
-                    message.get("text") if isinstance(message, dict) else str(message)
-                )
-                logger.info(f"   - Extracted Text: '{text_value}'")
-            except Exception as extract_error:
-                text_value = str(message)
-                logger.warning(f"   - Text extraction failed: {extract_error}")
-                logger.info(f"   - Fallback Text: '{text_value}'")
+        # گرفتن پیام‌ها از OpenAI
+        logger.info("🤖 Calling OpenAI Service:")
+        logger.info(f"   - Message: '{request.message}'")
+        logger.info(f"   - Session ID: '{request.session_id}'")
+        logger.info(f"   - Language: '{request.language}'")
 
+        local_messages = faq_messages(request.message, is_english, timings)
+        if local_messages:
             logger.info(
-                f"   - Final Text Value: '{text_value if text_value else 'No text'}'"
-            )
-
-            # Check if this is an error response from the external service
-            is_error_response = (
-                isinstance(message, dict)
-                and message.get("text") == "ERROR_SERVICE_UNAVAILABLE"
-                and message.get("is_error", False)
+                "❓ Answering from the knowledge base, skipping the chat service"
             )
 
-            if is_error_response:
-                logger.info("🚨 Processing ERROR response from external service")
-                error_language = message.get("language", "fa")
-                logger.info(f"   - Error Language: {error_language}")
-
-                # Determine error audio file based on language
-                if error_language.lower().startswith("en"):
-                    error_audio_file = "audios/errorMessage_en.mp3"
-                    error_text_file = "audios/errorMessage_en.txt"
-                    logger.info("   - Using English error message")
-                else:
-                    error_audio_file = "audios/errorMessage.mp3"
-                    error_text_file = "audios/errorMessage.txt"
-                    logger.info("   - Using Persian error message")
-
-                # Read error text
-                try:
-                    with open(error_text_file, "r", encoding="utf-8") as f:
-                        error_text = f.read().strip()
-                    logger.info(f"   - Error Text: '{error_text}'")
-                except Exception as e:
-                    logger.error(f"   - Failed to read error text file: {e}")
-                    error_text = "خطا در دریافت پاسخ از سرور"
-
-                # Create error message with audio and lipsync
-                try:
-                    if os.path.exists(error_audio_file):
-                        logger.info(f"   - Error audio file found: {error_audio_file}")
-
-                        # Convert MP3 to WAV for lipsync
-                        error_wav_file = error_audio_file.replace(".mp3", ".wav")
-                        error_json_file = error_audio_file.replace(".mp3", ".json")
-
-                        logger.info(
-                            f"   - Converting error audio to WAV: {error_wav_file}"
-                        )
-                        lipsync_service.mp3_to_wav(error_audio_file, error_wav_file)
-
-                        logger.info(f"   - Generating error lipsync: {error_json_file}")
-                        lipsync_service.wav_to_lipsync_json(
-                            error_wav_file, error_json_file
-                        )
-
-                        # Read audio and lipsync data
-                        audio_base64 = file_service.audio_file_to_base64(
-                            error_audio_file
-                        )
-                        lipsync_data = file_service.read_json_transcript(
-                            error_json_file
-                        )
-
-                        logger.info(
-                            "   ✅ Error message with audio and lipsync created successfully"
-                        )
-
-                        error_message = Message(
-                            text=error_text,
-                            audio=audio_base64,
-                            lipsync=lipsync_data,
-                            facialExpression="sad",
-                            animation="Sad",
-                        )
-
-                        result_messages.append(error_message)
-                        logger.info(f"   ✅ Error message {i + 1} added to response")
-                        continue  # Skip normal processing for this message
-                    else:
-                        logger.warning(
-                            f"   - Error audio file not found: {error_audio_file}"
-                        )
-                except Exception as e:
-                    logger.error(f"   - Failed to process error audio: {e}")
-
-                # Fallback: create error message without audio
-                fallback_error_message = Message(
-                    text=error_text,
-                    audio=None,
-                    lipsync=None,
-                    facialExpression="sad",
-                    animation="Sad",
-                )
-                result_messages.append(fallback_error_message)
-                logger.info(f"   ✅ Fallback error message {i + 1} added to response")
-                continue  # Skip normal processing for this message
-
-            if can_write_files:
-                logger.info(f"   🎵 Audio Processing Enabled for Message {i + 1}")
-                try:
-                    # Ensure audios directory exists
-                    logger.info(f"   📁 Ensuring audios directory exists")
-                    os.makedirs("audios", exist_ok=True)
-
-                    # Create unique filename with session ID to prevent conflicts
-                    session_suffix = (
-                        request.session_id.split("_")[-1]
-                        if "_" in request.session_id
-                        else request.session_id[-8:]
-                    )
-                    file_name = os.path.join(
-                        "audios", f"message_{session_suffix}_{i}.mp3"
-                    )
-                    logger.info(f"   📄 Target Audio File: {file_name}")
-                    logger.info(f"   🔑 Session Suffix: {session_suffix}")
-
-                    text_input = (
-                        message.get("text", "")
-                        if isinstance(message, dict)
-                        else str(message)
-                    )
-                    logger.info(
-                        f"   📝 Text Input for TTS: '{text_input[:100]}{'...' if len(text_input) > 100 else ''}'"
-                    )
-
-                    # تبدیل متن به گفتار - انتخاب سرویس بر اساس زبان
-                    logger.info(f"   🔊 Converting text to speech:")
-                    logger.info(
-                        f"      - Language: {'English' if is_english else 'Non-English'}"
-                    )
-                    logger.info(f"      - Text Length: {len(text_input)} characters")
-
-                    try:
-                        if is_english:
-                            logger.info(
-                                "      - Using ElevenLabsService for English TTS"
-                            )
-                            elevenlabs_service.text_to_speech(text_input, file_name)
-                        else:
-                            logger.info(
-                                "      - Using AvashowService for non-English TTS"
-                            )
-                            avashow_service.text_to_speech(text_input, file_name)
-                        logger.info("      ✅ TTS conversion completed")
-                    except Exception as tts_error:
-                        logger.warning(f"      ❌ TTS failed: {tts_error}")
-                        logger.warning(
-                            f"      - Error Type: {type(tts_error).__name__}"
+        if INCREMENTAL_PARSING and not local_messages:
+            # Start TTS on each message as soon as the chat service has streamed it
+            logger.info("🔄 Processing Messages as they stream in:")
+            with ThreadPoolExecutor(max_workers=MEDIA_PIPELINE_WORKERS) as pool:
+                with timings.stage("chat_service"):
+                    futures = [
+                        pool.submit(
+                            process_assistant_message,
+                            i,
+                            message,
+                            None,
+                            request.session_id,
+                            is_english,
+                            can_write_files,
+                            tts_router,
+                            lipsync_service,
+                            file_service,
+                            timings,
+                            None,
+                            raw_audio,
+                            stream_audio,
                         )
-                        logger.warning(
-                            f"      - Skipping audio generation for this message"
-                        )
-                        # Continue without audio if TTS fails
-
-                    # Check if audio file was created
-                    if os.path.exists(file_name):
-                        file_size = os.path.getsize(file_name)
-                        logger.info(f"      ✅ Audio file created successfully:")
-                        logger.info(f"         - File: {file_name}")
-                        logger.info(f"         - Size: {file_size} bytes")
-                        logger.info(
-                            f"         - Absolute Path: {os.path.abspath(file_name)}"
-                        )
-                    else:
-                        logger.warning(
-                            f"      ❌ Expected audio file not found after TTS: {file_name}"
-                        )
-
-                    wav_file = os.path.join(
-                        "audios", f"message_{session_suffix}_{i}.wav"
-                    )
-                    json_file = os.path.join(
-                        "audios", f"message_{session_suffix}_{i}.json"
-                    )
-                    logger.info(f"   📄 Lip Sync Files:")
-                    logger.info(f"      - WAV File: {wav_file}")
-                    logger.info(f"      - JSON File: {json_file}")
-
-                    # تبدیل mp3 به wav
-                    logger.info(f"   🔄 Converting MP3 to WAV:")
-                    logger.info(f"      - Source: {file_name}")
-                    logger.info(f"      - Target: {wav_file}")
-                    try:
-                        lipsync_service.mp3_to_wav(file_name, wav_file)
-                        logger.info(f"      ✅ MP3 to WAV conversion completed")
-
-                        # Check WAV file
-                        if os.path.exists(wav_file):
-                            wav_size = os.path.getsize(wav_file)
-                            logger.info(f"      - WAV file size: {wav_size} bytes")
-                        else:
-                            logger.warning(f"      ❌ WAV file not created: {wav_file}")
-                    except Exception as wav_error:
-                        logger.error(
-                            f"      ❌ MP3 to WAV conversion failed: {wav_error}"
-                        )
-
-                    # تولید lipsync
-                    logger.info(f"   🎭 Generating Lip Sync:")
-                    logger.info(f"      - Source WAV: {wav_file}")
-                    logger.info(f"      - Target JSON: {json_file}")
-                    try:
-                        lipsync_service.wav_to_lipsync_json(wav_file, json_file)
-                        logger.info(f"      ✅ Lip sync generation completed")
-
-                        # Check JSON file
-                        if os.path.exists(json_file):
-                            json_size = os.path.getsize(json_file)
-                            logger.info(f"      - JSON file size: {json_size} bytes")
-                        else:
-                            logger.warning(
-                                f"      ❌ JSON file not created: {json_file}"
+                        for i, message in enumerate(
+                            openai_service.iter_assistant_response(
+                                request.message, request.session_id, request.language
                             )
-                    except Exception as lipsync_error:
-                        logger.error(
-                            f"      ❌ Lip sync generation failed: {lipsync_error}"
-                        )
-
-                    # خواندن فایل‌ها
-                    logger.info(f"   📖 Reading Generated Files:")
-                    try:
-                        audio_base64 = file_service.audio_file_to_base64(file_name)
-                        logger.info(
-                            f"      ✅ Audio file converted to base64 (length: {len(audio_base64) if audio_base64 else 0})"
-                        )
-                    except Exception as audio_error:
-                        logger.error(
-                            f"      ❌ Audio base64 conversion failed: {audio_error}"
-                        )
-                        audio_base64 = None
-
-                    try:
-                        lipsync_data = file_service.read_json_transcript(json_file)
-                        logger.info(f"      ✅ Lip sync data read successfully")
-                        logger.info(f"      - Lip sync data type: {type(lipsync_data)}")
-                        logger.info(
-                            f"      - Lip sync data length: {len(str(lipsync_data)) if lipsync_data else 0}"
                         )
-                    except Exception as lipsync_read_error:
-                        logger.error(
-                            f"      ❌ Lip sync data reading failed: {lipsync_read_error}"
-                        )
-                        lipsync_data = None
-
-                    # Create final message
-                    logger.info(f"   📝 Creating Final Message:")
-                    cleaned_text = clean_text_from_json(message.get("text", ""))
-                    facial_expression = (
-                        message.get("facialExpression", "default")
-                        if isinstance(message, dict)
-                        else "default"
-                    )
-                    animation = (
-                        message.get("animation", "StandingIdle")
-                        if isinstance(message, dict)
-                        and message.get("animation") is not None
-                        else "StandingIdle"
+                    ]
+                result_messages = [future.result() for future in futures]
+        else:
+            if local_messages:
+                openai_messages = local_messages
+            else:
+                with timings.stage("chat_service"):
+                    openai_messages = openai_service.get_assistant_response(
+                        request.message, request.session_id, request.language
                     )
 
-                    logger.info(
-                        f"      - Cleaned Text: '{cleaned_text[:100]}{'...' if len(cleaned_text) > 100 else ''}'"
-                    )
-                    logger.info(f"      - Facial Expression: '{facial_expression}'")
-                    logger.info(f"      - Animation: '{animation}'")
-                    logger.info(f"      - Audio Present: {audio_base64 is not None}")
-                    logger.info(f"      - Lip Sync Present: {lipsync_data is not None}")
-
-                    final_message = Message(
-                        text=cleaned_text,
-                        audio=audio_base64,
-                        lipsync=lipsync_data,
-                        facialExpression=facial_expression,
-                        animation=animation,
-                    )
+            logger.info(f"✅ OpenAI Service Response:")
+            logger.info(
+                f"   - Messages Count: {len(openai_messages) if openai_messages else 0}"
+            )
+            logger.info(f"   - Messages Type: {type(openai_messages)}")
+            logger.info(f"   - Messages Content: {openai_messages}")
 
-                    result_messages.append(final_message)
-                    logger.info(
-                        f"   ✅ Message {i + 1} processed successfully with audio"
-                    )
+            logger.info("🔄 Processing Messages:")
+            logger.info(
+                f"   - Total Messages to Process: {len(openai_messages) if openai_messages else 0}"
+            )
 
-                    # پاک کردن فایل‌های موقت
-                    try:
-                        if os.path.exists(file_name):
-                            os.remove(file_name)
-                            logger.info(f"   🗑️ Cleaned up MP3 file: {file_name}")
-                        if os.path.exists(wav_file):
-                            os.remove(wav_file)
-                            logger.info(f"   🗑️ Cleaned up WAV file: {wav_file}")
-                        if os.path.exists(json_file):
-                            os.remove(json_file)
-                            logger.info(f"   🗑️ Cleaned up JSON file: {json_file}")
-                        logger.info(
-                            f"   ✅ Temporary files cleaned up for message {i + 1}"
-                        )
-                    except Exception as e:
-                        logger.warning(
-                            f"   ⚠️ Could not clean up temporary files for message {i + 1}: {e}"
-                        )
+            batch_audio = {}
+            if BATCH_TTS and can_write_files:
+                batch_audio = prepare_batch_audio(
+                    openai_messages or [],
+                    request.session_id,
+                    is_english,
+                    tts_router,
+                    timings,
+                )
 
-                except Exception as e:
-                    logger.error(
-                        f"   ❌ Error processing message {i + 1} with audio: {e}"
+            for i, message in enumerate(openai_messages or []):
+                result_messages.append(
+                    process_assistant_message(
+                        i,
+                        message,
+                        len(openai_messages),
+                        request.session_id,
+                        is_english,
+                        can_write_files,
+                        tts_router,
+                        lipsync_service,
+                        file_service,
+                        timings,
+                        batch_audio.get(i),
+                        raw_audio,
+                        stream_audio,
                     )
-                    logger.error(f"      - Error Type: {type(e).__name__}")
-                    logger.error(f"      - Error Details: {str(e)}")
-                    logger.info(f"      - Creating fallback message without audio")
-
-                    # در صورت خطا، پیام بدون audio و lipsync برگردان
-                    fallback_message = Message(
-                        text=clean_text_from_json(message.get("text", "")),
-                        audio=None,
-                        lipsync=None,
-                        facialExpression=(
-                            message.get("facialExpression", "default")
-                            if isinstance(message, dict)
-                            else "default"
-                        ),
-                        animation=(
-                            message.get("animation", "StandingIdle")
-                            if isinstance(message, dict)
-                            and message.get("animation") is not None
-                            else "StandingIdle"
-                        ),
-                    )
-                    result_messages.append(fallback_message)
-                    logger.info(f"   ✅ Fallback message {i + 1} created successfully")
-            else:
-                logger.info(
-                    f"   📝 File Writing Disabled - Creating Text-Only Message {i + 1}"
-                )
-                # Create message without audio when file writing is disabled
-                text_only_message = Message(
-                    text=clean_text_from_json(message.get("text", "")),
-                    audio=None,
-                    lipsync=None,
-                    facialExpression=(
-                        message.get("facialExpression", "default")
-                        if isinstance(message, dict)
-                        else "default"
-                    ),
-                    animation=(
-                        message.get("animation", "StandingIdle")
-                        if isinstance(message, dict)
-                        and message.get("animation") is not None
-                        else "StandingIdle"
-                    ),
                 )
-                result_messages.append(text_only_message)
-                logger.info(f"   ✅ Text-only message {i + 1} created successfully")
 
         logger.info("=" * 100)
         logger.info("🎉 CHAT ENDPOINT COMPLETED SUCCESSFULLY")
@@ -876,10 +1213,10 @@ def chat(request: ChatRequest):
         logger.info(f"📊 Final Results:")
         logger.info(f"   - Total Messages Processed: {len(result_messages)}")
         logger.info(
-            f"   - Messages with Audio: {sum(1 for msg in result_messages if msg.audio is not None)}"
+            f"   - Messages with Audio: {sum(1 for msg in result_messages if msg.audio is not None or msg._audio_path is not None)}"
         )
         logger.info(
-            f"   - Messages with Lip Sync: {sum(1 for msg in result_messages if msg.lipsync is not None)}"
+            f"   - Messages with Lip Sync: {sum(1 for msg in result_messages if msg.lipsync is not None or msg._lipsync_raw is not None)}"
         )
         logger.info(f"   - File Write Enabled: {can_write_files}")
         logger.info(f"   - Audio Directory: {audio_dir}")
@@ -889,17 +1226,17 @@ def chat(request: ChatRequest):
             logger.info(f"   📝 Message {i + 1}:")
             logger.info(f"      - Text Length: {len(msg.text) if msg.text else 0}")
             logger.info(f"      - Has Audio: {msg.audio is not None}")
-            logger.info(f"      - Has Lip Sync: {msg.lipsync is not None}")
+            logger.info(
+                f"      - Has Lip Sync: {msg.lipsync is not None or msg._lipsync_raw is not None}"
+            )
             logger.info(f"      - Facial Expression: {msg.facialExpression}")
             logger.info(f"      - Animation: {msg.animation}")
 
-        # Final cleanup of any remaining temporary files for this session
-        logger.info(
-            f"🧹 Final cleanup of temporary files for session: {request.session_id}"
+        timings.add("total", time.monotonic() - started)
+        response.headers["Server-Timing"] = timings.server_timing_header()
+        return chat_response(
+            result_messages, request.lipsyncFormat, audio_delivery, response
         )
-        cleanup_temp_files(request.session_id)
-
-        return ChatResponse(messages=result_messages)
 
     except Exception as e:
         logger.error("=" * 100)
@@ -919,12 +1256,6 @@ def chat(request: ChatRequest):
             f"   - Request Language: '{request.language if 'request' in locals() else 'N/A'}'"
         )
 
-        # Clean up temporary files even if there was an error
-        logger.info(
-            f"🧹 Cleaning up temporary files after error for session: {request.session_id}"
-        )
-        cleanup_temp_files(request.session_id)
-
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
@@ -940,10 +1271,11 @@ def test_avashow_service(text_input: str):
         import uuid
 
         filename = f"test_avashow_{uuid.uuid4().hex[:8]}.mp3"
-        file_path = os.path.join("audios", filename)
+        # Own directory, which the janitor empties; audios/ holds tracked samples
+        directory = os.path.join("audios", "test_avashow")
+        file_path = os.path.join(directory, filename)
 
-        # Ensure audios directory exists
-        os.makedirs("audios", exist_ok=True)
+        os.makedirs(directory, exist_ok=True)
 
         # Convert text to speech
         logger.info(f"Converting text to speech and saving to: {file_path}")
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from api.services.metrics_service import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+def get_metrics():
+    """Return a snapshot of the in-process counters, gauges and latency summaries."""
+    return metrics.snapshot()
@@ -5,12 +5,11 @@ from api.database.database import get_db
 from api.models.response_model import Response
 from api.schemas.response_schema import ResponseCreate, Response as ResponseSchema
 from api.services.openai_service import OpenAIService
-from api.services.google_sheets_service import GoogleSheetsService
+from api.services.knowledge_base_service import get_knowledge_base_cache
 import uuid
 
 router = APIRouter()
 openai_service = OpenAIService()
-sheets_service = GoogleSheetsService()
 
 
 @router.post("/ask", response_model=ResponseSchema)
@@ -26,8 +25,8 @@ async def ask_question(
         if not session_id:
             session_id = str(uuid.uuid4())
 
-        # Get knowledge base from Google Sheets
-        knowledge_base = sheets_service.format_knowledge_for_prompt()
+        # Rows of the in-memory knowledge base relevant to the question
+        knowledge_base = get_knowledge_base_cache().get().prompt_for(question)
         print("knowledge_base:", knowledge_base)
 
         # Get response from OpenAI
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 from typing import List, Optional, Dict, Any
 
 
@@ -8,12 +8,23 @@ class Message(BaseModel):
     lipsync: Optional[Dict[str, Any]] = None
     facialExpression: str
     animation: str
+    ttsProvider: Optional[str] = None  # which TTS provider produced the audio
+    audioPart: Optional[int] = None  # index of the audio part in a multipart reply
+    audioUrl: Optional[str] = None  # signed, short-lived URL of the stored clip
+    # Raw mp3 kept out of the JSON; sent as its own part in a multipart reply
+    _audio_bytes: Optional[bytes] = PrivateAttr(default=None)
+    # mp3 left on disk, base64 encoded into the reply while it streams out
+    _audio_path: Optional[str] = PrivateAttr(default=None)
+    # Rhubarb's JSON file as read, embedded verbatim by the fast JSON encoder
+    _lipsync_raw: Optional[bytes] = PrivateAttr(default=None)
 
 
 class ChatRequest(BaseModel):
     message: str
     session_id: str
     language: str = "fa"  # Default to Persian, can be "fa" or "en"
+    lipsyncFormat: str = "rhubarb"  # "rhubarb" (Rhubarb JSON) or "compact"
+    audioDelivery: Optional[str] = None  # "inline" (base64) or "url"
 
 
 class ChatResponse(BaseModel):
@@ -0,0 +1,341 @@
+import os
+import json
+import time
+import base64
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+from api.services.artifact_store_service import (
+    ArtifactStore,
+    MemoryArtifactStore,
+    get_artifact_store,
+)
+from api.services.faq_service import script_language
+from api.services.metrics_service import metrics
+from api.services.phrase_library_service import normalize_phrase, phrase_key
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_PATH = os.getenv(
+    "ANSWER_CACHE_MANIFEST", os.path.join("data", "answer_cache.json")
+)
+
+
+class CachedAnswer:
+    """
+    A knowledge sheet answer synthesized ahead of time. Audio and lipsync live
+    in the artifact store and are read on use; same interface as a Phrase.
+    """
+
+    served_by = "answer_cache"
+
+    def __init__(self, entry: dict, store: ArtifactStore):
+        self.text = entry["text"]
+        self.language = entry["language"]
+        self.provider = entry.get("provider")
+        self.audio_key = entry["audio"]
+        self.lipsync_key = entry["lipsync"]
+        self.store = store
+
+    def _read(self, key: str) -> bytes:
+        artifact = self.store.get(key)
+        if artifact is None:
+            raise FileNotFoundError(f"Artifact {key} is gone")
+        return b"".join(self.store.iter_range(artifact, 0, artifact.size - 1))
+
+    def load(self):
+        audio, lipsync = self.load_bytes()
+        return base64.b64encode(audio).decode(), lipsync
+
+    def load_bytes(self):
+        return self._read(self.audio_key), json.loads(self._read(self.lipsync_key))
+
+
+class AnswerCache:
+    """
+    Lookup of pre-synthesized answers by normalized text, per language. The
+    manifest is re-read whenever it changes on disk, so answers written by
+    build_answer_cache.py are served without restarting the app.
+    """
+
+    def __init__(self, manifest_path: str = MANIFEST_PATH, store=None):
+        self.manifest_path = manifest_path
+        self.store = store or get_artifact_store()
+        self.answers: Dict[str, Dict[str, CachedAnswer]] = {}
+        self._signature = None
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        signature = _manifest_signature(self.manifest_path)
+        answers: Dict[str, Dict[str, CachedAnswer]] = {}
+        for entry in read_manifest(self.manifest_path).values():
+            answers.setdefault(entry["language"], {})[
+                normalize_phrase(entry["text"])
+            ] = CachedAnswer(entry, self.store)
+        self.answers, self._signature = answers, signature
+        metrics.set_gauge("answer_cache_entries", len(self))
+        logger.info(
+            f"Answer cache loaded: "
+            f"{ {language: len(a) for language, a in answers.items()} }"
+        )
+
+    def __len__(self):
+        return sum(len(answers) for answers in self.answers.values())
+
+    def reload_if_changed(self):
+        """Reload when the manifest was rewritten since it was last read."""
+        if _manifest_signature(self.manifest_path) == self._signature:
+            return
+        with self._lock:
+            signature = _manifest_signature(self.manifest_path)
+            if signature == self._signature:
+                return
+            try:
+                self.reload()
+            except Exception as e:
+                # Keep serving what was loaded; try again once the file changes
+                self._signature = signature
+                logger.error(f"Could not reload the answer cache manifest: {e}")
+
+    def lookup(
+        self, text: str, language: str, record: bool = True
+    ) -> Optional[CachedAnswer]:
+        self.reload_if_changed()
+        if not self.answers:
+            return None
+        language = "en" if (language or "").lower().startswith("en") else "fa"
+        answer = self.answers.get(language, {}).get(normalize_phrase(text))
+        if record:
+            metrics.increment(
+                "answer_cache_lookups_total",
+                labels={"language": language, "hit": "true" if answer else "false"},
+            )
+        return answer
+
+
+def read_manifest(manifest_path: str) -> Dict[str, dict]:
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return {entry["key"]: entry for entry in json.load(f)["answers"]}
+
+
+def _manifest_signature(manifest_path: str) -> Optional[tuple]:
+    """Changes whenever the manifest is rewritten (it is replaced, never edited)."""
+    try:
+        stat = os.stat(manifest_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_ino, stat.st_size
+
+
+_manifest_keys = (None, frozenset())  # (manifest signature, keys)
+
+
+def manifest_keys(manifest_path: str = MANIFEST_PATH) -> Set[str]:
+    """Artifact keys the manifest refers to, re-read only when the file changes."""
+    global _manifest_keys
+    signature = _manifest_signature(manifest_path)
+    if signature is None:
+        return frozenset()
+    if _manifest_keys[0] != signature:
+        entries = read_manifest(manifest_path).values()
+        _manifest_keys = (
+            signature,
+            frozenset(
+                entry[name] for entry in entries for name in ("audio", "lipsync")
+            ),
+        )
+    return _manifest_keys[1]
+
+
+def _synthesize(
+    key: str, text: str, language: str, tts_router, lipsync_service, store
+) -> dict:
+    with tempfile.TemporaryDirectory(prefix="answer_cache_") as directory:
+        mp3_path = os.path.join(directory, f"{key}.mp3")
+        wav_path = os.path.join(directory, f"{key}.wav")
+        json_path = os.path.join(directory, f"{key}.json")
+        provider = tts_router.synthesize(text, mp3_path, language)
+        lipsync_service.mp3_to_wav(mp3_path, wav_path)
+        lipsync_service.wav_to_lipsync_json(wav_path, json_path)
+        with open(mp3_path, "rb") as f:
+            audio = store.put(f.read(), "audio/mpeg")
+        with open(json_path, "rb") as f:
+            lipsync = store.put(f.read(), "application/json")
+    return {
+        "key": key,
+        "language": language,
+        "text": text,
+        "audio": audio.key,
+        "lipsync": lipsync.key,
+        "provider": provider,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def build_answers(
+    rows: List[Dict[str, str]],
+    tts_router,
+    lipsync_service,
+    store: Optional[ArtifactStore] = None,
+    manifest_path: str = MANIFEST_PATH,
+    workers: int = 4,
+    force: bool = False,
+) -> dict:
+    """
+    Synthesize and lip-sync every answer of the knowledge sheet into the
+    artifact store and write the manifest. Each answer is voiced in the language
+    it is written in. Answers already built from the same normalized text are
+    kept, so only new or edited rows are synthesized, unless force is set.
+    """
+    store = store or get_artifact_store()
+    started = time.perf_counter()
+    existing = read_manifest(manifest_path)
+
+    wanted: Dict[str, tuple] = {}
+    for row in rows:
+        text = (row.get("answer") or "").strip()
+        if text:
+            language = script_language(text)
+            wanted[phrase_key(text, language)] = (text, language)
+
+    kept, jobs = [], []
+    for key, (text, language) in wanted.items():
+        previous = None if force else existing.get(key)
+        if previous and all(
+            store.get(previous[name]) is not None for name in ("audio", "lipsync")
+        ):
+            # Keep reused clips from expiring out of the store
+            store.touch(previous["audio"])
+            store.touch(previous["lipsync"])
+            kept.append(previous)
+        else:
+            jobs.append((key, text, language))
+
+    def run(job):
+        key, text, language = job
+        try:
+            return _synthesize(key, text, language, tts_router, lipsync_service, store)
+        except Exception as e:
+            logger.error(f"Failed to pre-synthesize answer '{text[:60]}': {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(run, jobs))
+    built = [entry for entry in results if entry is not None]
+    failed = [text for (_, text, _), entry in zip(jobs, results) if entry is None]
+
+    directory = os.path.dirname(manifest_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    partial = f"{manifest_path}.part"
+    with open(partial, "w", encoding="utf-8") as f:
+        json.dump({"answers": kept + built}, f, indent=2, ensure_ascii=False)
+    os.replace(partial, manifest_path)
+
+    metrics.increment("answer_cache_built_total", len(built))
+    metrics.increment("answer_cache_build_failures_total", len(failed))
+    metrics.observe("answer_cache_build_seconds", time.perf_counter() - started)
+    removed = len(set(existing) - set(wanted))
+    logger.info(
+        f"🔊 Answer cache: {len(built)} built, {len(kept)} kept, "
+        f"{len(failed)} failed, {removed} removed"
+    )
+    return {
+        "built": len(built),
+        "kept": len(kept),
+        "removed": removed,
+        "failed": failed,
+    }
+
+
+class AnswerCacheBuilder:
+    """
+    Runs build_answers off the request path: once, or again every interval so
+    edits to the sheet are picked up. Builds are incremental, so a run with no
+    changed rows only checks the store.
+    """
+
+    def __init__(self, interval: Optional[float], workers: int):
+        self.interval = interval
+        self.workers = workers
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        from api.services.knowledge_base_service import get_knowledge_base_cache
+        from api.services.lipsync_service import LipSyncService
+        from api.services.tts_service import get_tts_router
+
+        rows = get_knowledge_base_cache().get().items
+        if not rows:
+            logger.info("🔊 Answer cache: knowledge base is empty, nothing to build")
+            return
+        build_answers(rows, get_tts_router(), LipSyncService(), workers=self.workers)
+        get_answer_cache().reload()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"🔊 Answer cache build failed: {e}")
+            if not self.interval:
+                return
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._loop, name="answer-cache-builder", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+_builder = None
+
+
+def get_answer_cache() -> AnswerCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AnswerCache()
+                if get_answer_cache_builder() is None and isinstance(
+                    _cache.store, MemoryArtifactStore
+                ):
+                    logger.warning(
+                        "⚠️ Answer cache: ARTIFACT_STORE=memory lives in this process, "
+                        "so build_answer_cache.py cannot fill it; set "
+                        "ANSWER_CACHE_BUILD=startup or background to build here"
+                    )
+    return _cache
+
+
+def get_answer_cache_builder() -> Optional[AnswerCacheBuilder]:
+    """
+    The builder ANSWER_CACHE_BUILD asks for: "startup" builds once when the app
+    starts, "background" also rebuilds every ANSWER_CACHE_BUILD_INTERVAL seconds,
+    "off" (the default) leaves building to build_answer_cache.py.
+    """
+    global _builder
+    mode = os.getenv("ANSWER_CACHE_BUILD", "off").lower()
+    if mode not in ("startup", "background"):
+        return None
+    if _builder is None:
+        with _cache_lock:
+            if _builder is None:
+                interval = float(os.getenv("ANSWER_CACHE_BUILD_INTERVAL", "3600"))
+                _builder = AnswerCacheBuilder(
+                    interval if mode == "background" else None,
+                    int(os.getenv("ANSWER_CACHE_WORKERS", "4")),
+                )
+    return _builder
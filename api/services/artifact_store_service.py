@@ -0,0 +1,317 @@
+import os
+import re
+import hmac
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlencode
+from api.services.metrics_service import metrics
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_ROUTE = "/api/v1/artifacts"
+URL_TTL_SECONDS = int(os.getenv("ARTIFACT_URL_TTL", "300"))
+if URL_TTL_SECONDS <= 0:
+    logger.warning(
+        f"ARTIFACT_URL_TTL must be positive, not {URL_TTL_SECONDS}; using 300"
+    )
+    URL_TTL_SECONDS = 300
+READ_CHUNK_SIZE = 65536
+EXTENSIONS = {"audio/mpeg": ".mp3", "audio/wav": ".wav", "application/json": ".json"}
+CONTENT_TYPES = {extension: kind for kind, extension in EXTENSIONS.items()}
+KEY_RE = re.compile(r"^[0-9a-f]{32}\.[a-z0-9]{1,5}$")
+
+_secret = os.getenv("ARTIFACT_URL_SECRET", "").encode()
+if not _secret:
+    logger.warning(
+        "ARTIFACT_URL_SECRET is not set; artifact URLs only verify in this process"
+    )
+    _secret = os.urandom(32)
+
+
+class Artifact:
+    """A stored clip. The key is derived from the content, so it doubles as a strong ETag."""
+
+    def __init__(
+        self, key: str, size: int, content_type: str, data: Optional[bytes] = None
+    ):
+        self.key = key
+        self.size = size
+        self.content_type = content_type
+        # Set by stores that hold the bytes in memory, so serving them cannot
+        # race an eviction
+        self.data = data
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.key.split(".")[0]}"'
+
+
+def artifact_key(data: bytes, content_type: str) -> str:
+    digest = hashlib.sha256(data).hexdigest()[:32]
+    return f"{digest}{EXTENSIONS.get(content_type, '.bin')}"
+
+
+class ArtifactStore:
+    """
+    Content-addressed storage for generated clips. Putting the same bytes twice
+    keeps one copy, which is what lets kiosks and CDNs cache repeated clips.
+    """
+
+    name = "base"
+
+    def put(self, data: bytes, content_type: str = "audio/mpeg") -> Artifact:
+        key = artifact_key(data, content_type)
+        existing = self.get(key)
+        if existing is not None:
+            self.touch(key)
+            metrics.increment("artifact_puts_total", labels={"stored": "false"})
+            return existing
+        self._write(key, data, content_type)
+        metrics.increment("artifact_puts_total", labels={"stored": "true"})
+        metrics.increment("artifact_bytes_stored_total", len(data))
+        return Artifact(key, len(data), content_type)
+
+    def get(self, key: str) -> Optional[Artifact]:
+        raise NotImplementedError
+
+    def iter_range(self, artifact: Artifact, start: int, end: int) -> Iterator[bytes]:
+        """Bytes start..end (inclusive) of an artifact returned by get(), in chunks."""
+        raise NotImplementedError
+
+    def _write(self, key: str, data: bytes, content_type: str):
+        raise NotImplementedError
+
+    def touch(self, key: str):
+        """Mark a clip as recently used; stores that expire by age override this."""
+
+
+class LocalArtifactStore(ArtifactStore):
+    name = "local"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def get(self, key: str) -> Optional[Artifact]:
+        try:
+            size = os.path.getsize(self.path(key))
+        except OSError:
+            return None
+        content_type = CONTENT_TYPES.get(
+            os.path.splitext(key)[1], "application/octet-stream"
+        )
+        return Artifact(key, size, content_type)
+
+    def iter_range(self, artifact: Artifact, start: int, end: int) -> Iterator[bytes]:
+        with open(self.path(artifact.key), "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(READ_CHUNK_SIZE, remaining))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                yield chunk
+
+    def touch(self, key: str):
+        # The janitor expires artifacts by mtime, so reused clips stay around
+        try:
+            os.utime(self.path(key))
+        except OSError:
+            pass
+
+    def _write(self, key: str, data: bytes, content_type: str):
+        path = self.path(key)
+        partial = f"{path}.{threading.get_ident()}.part"
+        with open(partial, "wb") as f:
+            f.write(data)
+        os.replace(partial, path)
+
+
+class MemoryArtifactStore(ArtifactStore):
+    """Process-local store, evicting least recently used clips beyond max_bytes."""
+
+    name = "memory"
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Artifact]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            self._items.move_to_end(key)
+            return Artifact(key, len(item[0]), item[1], data=item[0])
+
+    def iter_range(self, artifact: Artifact, start: int, end: int) -> Iterator[bytes]:
+        # The clip may be evicted while it is being served; the bytes taken
+        # at get() time stay valid
+        view = memoryview(artifact.data)[start : end + 1]
+        for offset in range(0, len(view), READ_CHUNK_SIZE):
+            yield bytes(view[offset : offset + READ_CHUNK_SIZE])
+
+    def _write(self, key: str, data: bytes, content_type: str):
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = (data, content_type)
+            self.size += len(data)
+            while self.size > self.max_bytes and len(self._items) > 1:
+                _, (evicted, _) = self._items.popitem(last=False)
+                self.size -= len(evicted)
+                metrics.increment("artifact_evictions_total")
+            metrics.set_gauge("artifact_memory_bytes", self.size)
+
+
+class S3ArtifactStore(ArtifactStore):
+    """Any S3-compatible bucket (AWS, MinIO, the mock stand-in); needs boto3."""
+
+    name = "s3"
+
+    def __init__(
+        self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None
+    ):
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError as e:
+            raise RuntimeError(
+                "ARTIFACT_STORE=s3 requires boto3 to be installed"
+            ) from e
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            config=Config(
+                s3={"addressing_style": "path"},
+                retries={"max_attempts": 3, "mode": "standard"},
+                max_pool_connections=int(os.getenv("ARTIFACT_S3_POOL_SIZE", "16")),
+            ),
+        )
+        self._client_error = self.client.exceptions.ClientError
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def get(self, key: str) -> Optional[Artifact]:
+        try:
+            head = self.client.head_object(
+                Bucket=self.bucket, Key=self._object_key(key)
+            )
+        except self._client_error as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return None
+            raise
+        return Artifact(key, head["ContentLength"], head.get("ContentType") or "")
+
+    def iter_range(self, artifact: Artifact, start: int, end: int) -> Iterator[bytes]:
+        body = self.client.get_object(
+            Bucket=self.bucket,
+            Key=self._object_key(artifact.key),
+            Range=f"bytes={start}-{end}",
+        )["Body"]
+        try:
+            yield from body.iter_chunks(READ_CHUNK_SIZE)
+        finally:
+            body.close()
+
+    def _write(self, key: str, data: bytes, content_type: str):
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self._object_key(key),
+            Body=data,
+            ContentType=content_type,
+        )
+
+
+def create_store(kind: Optional[str] = None) -> ArtifactStore:
+    kind = (kind or os.getenv("ARTIFACT_STORE", "local")).lower()
+    if kind == "memory":
+        return MemoryArtifactStore(
+            int(os.getenv("ARTIFACT_MEMORY_MAX_BYTES", str(64 * 1024 * 1024)))
+        )
+    if kind == "s3":
+        return S3ArtifactStore(
+            os.getenv("ARTIFACT_S3_BUCKET", "artifacts"),
+            os.getenv("ARTIFACT_S3_PREFIX", ""),
+            os.getenv("ARTIFACT_S3_ENDPOINT_URL") or None,
+        )
+    if kind != "local":
+        logger.warning(f"Unknown ARTIFACT_STORE '{kind}', using local")
+    return LocalArtifactStore(
+        os.getenv("ARTIFACT_DIR", os.path.join("audios", "artifacts"))
+    )
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_store()
+                logger.info(f"Artifact store: {_store.name}")
+    return _store
+
+
+def _signature(key: str, expires: int) -> str:
+    message = f"{key}:{expires}".encode()
+    return hmac.new(_secret, message, hashlib.sha256).hexdigest()[:32]
+
+
+def signed_url(key: str, ttl: int = URL_TTL_SECONDS) -> str:
+    """
+    Short-lived URL for an artifact. The expiry is rounded up to a ttl window,
+    so a clip sent again within the window gets the very same URL and is served
+    from the browser or CDN cache. URLs stay valid for ttl to 2 * ttl seconds.
+    """
+    expires = (int(time.time()) // ttl + 2) * ttl
+    query = urlencode({"expires": expires, "sig": _signature(key, expires)})
+    base = os.getenv("ARTIFACT_PUBLIC_BASE_URL", "").rstrip("/")
+    return f"{base}{ARTIFACT_ROUTE}/{key}?{query}"
+
+
+def verify_signature(key: str, expires: int, signature: str) -> bool:
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(_signature(key, expires), signature or "")
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Dict[str, int]]:
+    """
+    Single byte range from a Range header as {"start", "end"} (inclusive).
+
+    None means serve the whole artifact (no header, or a multi-range request,
+    which we are allowed to ignore). ValueError means the range cannot be
+    satisfied.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes=") :].strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            start = max(0, size - int(last))
+            end = size - 1
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        raise ValueError(f"Range {header} not satisfiable for {size} bytes")
+    return {"start": start, "end": end}
@@ -1,10 +1,54 @@
 import os
+import re
+import time
+import base64
+import binascii
+import hashlib
+import threading
 import requests
 import json
 import logging
+from typing import BinaryIO, Iterable, Optional, Union
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from api.services.config_service import env_flag
+from api.services.metrics_service import metrics
+from api.services.rate_limit_service import get_limiter
 
 logger = logging.getLogger(__name__)
 
+DOWNLOAD_CHUNK_SIZE = int(os.getenv("AVASHOW_DOWNLOAD_CHUNK_SIZE", "65536"))
+AUDIO_MODES = ("filepath", "base64")
+MD5_HEX_RE = re.compile(r"^[0-9a-f]{32}$")
+
+# AvashowService is created per request, so the pooled session lives at module
+# level and keeps connections to the API and file hosts alive across requests
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Shared keep-alive session used for both Avashow hops."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                pool_size = int(os.getenv("AVASHOW_POOL_SIZE", "16"))
+                # Only retry failed connects; a repeated longText call is billed again
+                retries = Retry(
+                    total=2, connect=2, read=0, status=0, backoff_factor=0.3
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=4, pool_maxsize=pool_size, max_retries=retries
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({"Connection": "keep-alive"})
+                _session = session
+                logger.info(f"Avashow session created (pool size {pool_size})")
+    return _session
+
 
 class AvashowService:
     def __init__(self):
@@ -14,13 +58,38 @@ class AvashowService:
         self.gateway_token = os.getenv(
             "AVASHOW_GATEWAY_TOKEN"
         )  # توکن را در .env قرار دهید
+        # "base64" asks for the audio inline and skips the second download hop
+        self.audio_mode = os.getenv("AVASHOW_AUDIO_MODE", "filepath").lower()
+        if self.audio_mode not in AUDIO_MODES:
+            logger.warning(
+                f"Unknown AVASHOW_AUDIO_MODE '{self.audio_mode}', using filepath"
+            )
+            self.audio_mode = "filepath"
+        # A second synthesis is billed again, so by default an unusable inline
+        # answer fails and the TTS router moves on to the next provider
+        self.inline_retry_as_file = env_flag("AVASHOW_INLINE_RETRY_AS_FILE")
+        self.session = get_session()
+        # Only the longText call counts against the quota; file downloads do not
+        self.limiter = get_limiter("avashow")
+
+    def text_to_speech(
+        self,
+        text: str,
+        file_name: Union[str, BinaryIO],
+        speaker: str = "3",
+        mode: Optional[str] = None,
+        sink=None,
+    ):
+        """Synthesize text and write the mp3 to a path or a writable binary buffer.
 
-    def text_to_speech(self, text: str, file_name: str, speaker: str = "3"):
+        Each chunk is also copied to sink (anything with write()) as it arrives.
+        """
+        inline = (mode or self.audio_mode) == "base64"
         payload = json.dumps(
             {
                 "data": text,
-                "filePath": "true",
-                "base64": "0",
+                "filePath": "false" if inline else "true",
+                "base64": "1" if inline else "0",
                 "checksum": "1",
                 "speaker": speaker,
             }
@@ -30,13 +99,43 @@ class AvashowService:
             "gateway-token": self.gateway_token or "",
         }
         logger.info(f"Sending text to Avashow: {text[:50]}...")
-        response = requests.post(self.url, headers=headers, data=payload, timeout=60)
+        start = time.perf_counter()
+        with self.limiter.limit(timeout=60):
+            response = self.session.post(
+                self.url, headers=headers, data=payload, timeout=60
+            )
+        self.limiter.observe_response(response)
         response.raise_for_status()
         result = response.json()
-        logger.info(f"Avashow response: {result}")
+        metrics.observe(
+            "avashow_request_seconds",
+            time.perf_counter() - start,
+            {"stage": "synthesize"},
+        )
+        data = result.get("data", {}).get("data", {})
+
+        if inline:
+            audio = _decode_inline_audio(data)
+            if audio is not None:
+                size = _save([audio], file_name, sink)
+                metrics.increment("avashow_audio_total", labels={"mode": "base64"})
+                logger.info(f"Inline audio saved: {file_name} ({size} bytes)")
+                return
+            metrics.increment("avashow_inline_fallback_total")
+            if not data.get("filePath"):
+                if not self.inline_retry_as_file:
+                    logger.error("No usable inline audio or filePath from Avashow")
+                    raise Exception("No usable inline audio from Avashow")
+                logger.warning("No usable inline audio from Avashow, retrying as file")
+                return self.text_to_speech(
+                    text, file_name, speaker, mode="filepath", sink=sink
+                )
+            logger.warning("No usable inline audio from Avashow, downloading file")
+        else:
+            logger.info(f"Avashow response: {result}")
 
         # استخراج آدرس فایل mp3
-        audio_path = result.get("data", {}).get("data", {}).get("filePath")
+        audio_path = data.get("filePath")
         if not audio_path:
             logger.error("No audio filePath returned from Avashow")
             raise Exception("No audio filePath returned from Avashow")
@@ -48,8 +147,82 @@ class AvashowService:
             audio_url = audio_path
 
         # دانلود فایل mp3
-        audio_response = requests.get(audio_url, timeout=60)
-        audio_response.raise_for_status()
-        with open(file_name, "wb") as f:
-            f.write(audio_response.content)
-        logger.info(f"Audio file saved: {file_name}")
+        self.download(audio_url, file_name, sink)
+        metrics.increment("avashow_audio_total", labels={"mode": "filepath"})
+
+    def download(
+        self, audio_url: str, destination: Union[str, BinaryIO], sink=None
+    ) -> int:
+        """Stream the mp3 at audio_url into destination chunk by chunk."""
+        start = time.perf_counter()
+        with self.session.get(audio_url, timeout=60, stream=True) as audio_response:
+            audio_response.raise_for_status()
+            chunks = audio_response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE)
+            size = _save(chunks, destination, sink)
+        metrics.observe(
+            "avashow_request_seconds",
+            time.perf_counter() - start,
+            {"stage": "download"},
+        )
+        logger.info(f"Audio file saved: {destination} ({size} bytes)")
+        return size
+
+
+def _decode_inline_audio(data: dict) -> Optional[bytes]:
+    """Decoded inline mp3, or None when it is missing, malformed or fails its checksum."""
+    encoded = data.get("base64")
+    if not encoded or not isinstance(encoded, str):
+        return None
+    try:
+        audio = base64.b64decode(encoded, validate=True)
+    except (binascii.Error, ValueError) as e:
+        logger.warning(f"Invalid base64 audio from Avashow: {e}")
+        return None
+    # Only an md5 hex digest can be checked; other checksum formats are not
+    # documented, and rejecting the audio would mean a second billed synthesis
+    checksum = str(data.get("checksum") or "").lower()
+    if MD5_HEX_RE.match(checksum):
+        if hashlib.md5(audio).hexdigest() != checksum:
+            logger.warning("Inline audio checksum mismatch")
+            metrics.increment("avashow_checksum_mismatch_total")
+            return None
+    elif checksum:
+        logger.info(
+            f"Unrecognized inline audio checksum '{checksum[:40]}', not verified"
+        )
+    return audio or None
+
+
+def _save(chunks: Iterable[bytes], destination: Union[str, BinaryIO], sink=None) -> int:
+    if sink is not None:
+        chunks = _tee(chunks, sink)
+    if not isinstance(destination, str):
+        return _write_chunks(chunks, destination)
+    # Write next to the target and rename, so a broken transfer never leaves a
+    # truncated mp3 where the pipeline looks for audio
+    partial = f"{destination}.part"
+    try:
+        with open(partial, "wb") as f:
+            size = _write_chunks(chunks, f)
+        os.replace(partial, destination)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return size
+
+
+def _tee(chunks: Iterable[bytes], sink) -> Iterable[bytes]:
+    for chunk in chunks:
+        if chunk:
+            sink.write(chunk)
+        yield chunk
+
+
+def _write_chunks(chunks: Iterable[bytes], out: BinaryIO) -> int:
+    size = 0
+    for chunk in chunks:
+        if chunk:
+            out.write(chunk)
+            size += len(chunk)
+    return size
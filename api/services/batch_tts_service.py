@@ -0,0 +1,162 @@
+import os
+import re
+import logging
+import subprocess
+from typing import List, Optional, Tuple
+from api.services.metrics_service import metrics
+from api.services.tts_service import TTSRouter
+
+logger = logging.getLogger(__name__)
+
+SILENCE_NOISE_DB = float(os.getenv("BATCH_TTS_SILENCE_DB", "-35"))
+SILENCE_MIN_SECONDS = float(os.getenv("BATCH_TTS_SILENCE_MIN", "0.3"))
+MIN_SPLIT_CONFIDENCE = float(os.getenv("BATCH_TTS_MIN_CONFIDENCE", "0.5"))
+
+_SILENCE_RE = re.compile(r"silence_(start|end): (-?[\d.]+)")
+_TIME_RE = re.compile(r"time=(\d+):(\d+):([\d.]+)")
+
+
+class BatchResult:
+    def __init__(self, provider: str, clips: List[str], confidence: float):
+        self.provider = provider
+        self.clips = clips
+        self.confidence = confidence
+
+
+def detect_silences(mp3_path: str) -> Tuple[List[Tuple[float, float]], float]:
+    """Silent spans (start, end) in seconds and the decoded duration of the file."""
+    completed = subprocess.run(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-i",
+            mp3_path,
+            "-af",
+            f"silencedetect=noise={SILENCE_NOISE_DB}dB:d={SILENCE_MIN_SECONDS}",
+            "-f",
+            "null",
+            "-",
+        ],
+        capture_output=True,
+        check=True,
+    )
+    output = completed.stderr.decode(errors="replace")
+    times = _TIME_RE.findall(output)
+    if not times:
+        raise ValueError(f"Could not read the duration of {mp3_path}")
+    hours, minutes, seconds = times[-1]
+    duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    silences = []
+    start = None
+    for kind, value in _SILENCE_RE.findall(output):
+        if kind == "start":
+            start = max(0.0, float(value))
+        elif start is not None:
+            silences.append((start, float(value)))
+            start = None
+    if start is not None:
+        silences.append((start, duration))
+    return silences, duration
+
+
+def plan_split(
+    silences: List[Tuple[float, float]], duration: float, weights: List[int]
+) -> Tuple[Optional[List[float]], float]:
+    """
+    Cut points between len(weights) messages, and how much to trust them (0..1).
+
+    The longest interior silences are taken as the pauses between messages. The
+    confidence is the lower of two scores: how clearly the chosen silences
+    outlast every other pause, and how close each cut lands to where the
+    messages' share of the text puts it.
+    """
+    count = len(weights)
+    if count < 2:
+        return [], 1.0
+    edge = 0.05
+    interior = [(s, e) for s, e in silences if s > edge and e < duration - edge]
+    if len(interior) < count - 1:
+        return None, 0.0
+
+    by_length = sorted(interior, key=lambda span: span[1] - span[0], reverse=True)
+    chosen = sorted(by_length[: count - 1])
+    rest = by_length[count - 1 :]
+    shortest_chosen = min(e - s for s, e in chosen)
+    longest_rest = max((e - s for s, e in rest), default=0.0)
+    separation = max(0.0, 1.0 - longest_rest / shortest_chosen)
+
+    cuts = [(s + e) / 2 for s, e in chosen]
+    total = float(sum(weights)) or 1.0
+    expected, running = [], 0
+    for weight in weights[:-1]:
+        running += weight
+        expected.append(duration * running / total)
+    slot = duration / count
+    worst = max(abs(cut - target) for cut, target in zip(cuts, expected))
+    alignment = max(0.0, 1.0 - worst / slot)
+
+    return cuts, min(separation, alignment)
+
+
+def cut_clip(source: str, start: float, end: float, destination: str):
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-y",
+            "-loglevel",
+            "error",
+            "-i",
+            source,
+            "-ss",
+            f"{start:.3f}",
+            "-to",
+            f"{end:.3f}",
+            "-c",
+            "copy",
+            destination,
+        ],
+        check=True,
+    )
+
+
+def synthesize_batch(
+    router: TTSRouter, texts: List[str], language: str, file_prefix: str
+) -> Optional[BatchResult]:
+    """
+    Synthesize all texts with one TTS request and split the audio per message.
+
+    Returns None when the split is not trustworthy enough (below
+    BATCH_TTS_MIN_CONFIDENCE); the caller then synthesizes messages one by one.
+    Clips are written as f"{file_prefix}_{index}.mp3".
+    """
+    combined = f"{file_prefix}.mp3"
+    try:
+        provider = router.synthesize_batch(texts, combined, language)
+        silences, duration = detect_silences(combined)
+        cuts, confidence = plan_split(
+            silences, duration, [len(text.strip()) for text in texts]
+        )
+        metrics.observe("tts_batch_split_confidence", confidence)
+        logger.info(
+            f"Batch TTS by {provider}: {len(texts)} messages, {duration:.2f}s, "
+            f"{len(silences)} silences, confidence {confidence:.2f}"
+        )
+        if cuts is None or confidence < MIN_SPLIT_CONFIDENCE:
+            metrics.increment("tts_batch_total", labels={"outcome": "low_confidence"})
+            return None
+
+        bounds = [0.0] + cuts + [duration]
+        clips = []
+        for index in range(len(texts)):
+            clip = f"{file_prefix}_{index}.mp3"
+            cut_clip(combined, bounds[index], bounds[index + 1], clip)
+            clips.append(clip)
+        metrics.increment("tts_batch_total", labels={"outcome": "split"})
+        return BatchResult(provider, clips, confidence)
+    except Exception:
+        metrics.increment("tts_batch_total", labels={"outcome": "failed"})
+        raise
+    finally:
+        if os.path.exists(combined):
+            os.remove(combined)
@@ -0,0 +1,8 @@
+import os
+
+TRUTHY = ("1", "true", "yes", "on")
+
+
+def env_flag(name: str, default: str = "false") -> bool:
+    """Boolean setting from the environment: 1/true/yes/on, in any case, are true."""
+    return os.getenv(name, default).strip().lower() in TRUTHY
@@ -0,0 +1,197 @@
+import os
+import time
+import socket
+import logging
+import ipaddress
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import urllib3.util.connection as urllib3_connection
+
+from api.services.metrics_service import metrics
+
+logger = logging.getLogger(__name__)
+
+# Outbound service URLs whose hosts are resolved ahead of the first request
+PREFETCH_URL_ENV_VARS = [
+    "EXTERNAL_CHAT_SERVICE_URL",
+    "EXTERNAL_EXTRACTINFO_SERVICE_URL",
+    "EXTERNAL_ELEVENLABS_SERVICE_URL",
+    "AVASHOW_API_URL",
+]
+
+
+def _is_ip_address(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+        return True
+    except ValueError:
+        return False
+
+
+class _DNSEntry:
+    __slots__ = ("addresses", "error", "expires_at", "refreshing")
+
+    def __init__(self, addresses: List[str], error: Optional[Exception], ttl: float):
+        self.addresses = addresses
+        self.error = error
+        self.expires_at = time.monotonic() + ttl
+        self.refreshing = False
+
+
+class DNSResolverCache:
+    """Shared host -> IP cache with TTL, negative caching and background refresh.
+
+    Fresh entries are served from memory. Expired entries are still served while a
+    background refresh runs, so only the very first lookup of a host blocks, and
+    that lookup can be avoided entirely with ``prefetch`` at startup.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        negative_ttl: float = 30.0,
+        resolve_timeout: float = 5.0,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.resolve_timeout = resolve_timeout
+        self._entries: Dict[str, _DNSEntry] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="dns")
+        self._original_create_connection = None
+
+    def _lookup(self, host: str) -> List[str]:
+        started = time.monotonic()
+        try:
+            infos = socket.getaddrinfo(
+                host, None, urllib3_connection.allowed_gai_family(), socket.SOCK_STREAM
+            )
+        finally:
+            metrics.observe(
+                "dns_resolution_seconds", time.monotonic() - started, {"host": host}
+            )
+        addresses = []
+        for info in infos:
+            address = info[4][0]
+            if address not in addresses:
+                addresses.append(address)
+        return addresses
+
+    def _resolve_and_store(self, host: str) -> _DNSEntry:
+        try:
+            future = self._executor.submit(self._lookup, host)
+            entry = _DNSEntry(
+                future.result(timeout=self.resolve_timeout), None, self.ttl
+            )
+            logger.info(f"🌐 DNS Resolution: {host} -> {entry.addresses}")
+        except FutureTimeoutError:
+            error = socket.gaierror(f"DNS resolution timed out for {host}")
+            entry = _DNSEntry([], error, self.negative_ttl)
+        except OSError as e:
+            entry = _DNSEntry([], e, self.negative_ttl)
+        if entry.error is not None:
+            metrics.increment("dns_failures_total", labels={"host": host})
+            logger.warning(f"❌ DNS Resolution failed for {host}: {entry.error}")
+
+        with self._lock:
+            previous = self._entries.get(host)
+            # Keep serving the last good answer if a refresh of a known host fails
+            if entry.error is not None and previous and previous.addresses:
+                previous.expires_at = time.monotonic() + self.negative_ttl
+                previous.refreshing = False
+                return previous
+            self._entries[host] = entry
+        return entry
+
+    def _refresh_in_background(self, host: str):
+        try:
+            self._resolve_and_store(host)
+        except Exception as e:
+            logger.warning(f"Background DNS refresh failed for {host}: {e}")
+
+    def resolve(self, host: str) -> List[str]:
+        """Return the cached addresses for host, raising socket.gaierror on failure."""
+        if _is_ip_address(host):
+            return [host.strip("[]")]
+
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                if entry.addresses and not entry.refreshing:
+                    entry.refreshing = True
+                    self._executor.submit(self._refresh_in_background, host)
+                elif not entry.addresses:
+                    entry = None
+
+        if entry is None:
+            metrics.increment("dns_cache_misses_total")
+            entry = self._resolve_and_store(host)
+        else:
+            metrics.increment("dns_cache_hits_total")
+
+        if entry.error is not None:
+            raise socket.gaierror(str(entry.error))
+        return list(entry.addresses)
+
+    def peek(self, host: str) -> Optional[List[str]]:
+        """Return cached addresses without resolving, or None when unknown."""
+        with self._lock:
+            entry = self._entries.get(host)
+            return list(entry.addresses) if entry and entry.addresses else None
+
+    def invalidate(self, host: str):
+        with self._lock:
+            self._entries.pop(host, None)
+
+    def prefetch(self, hosts: Iterable[str]):
+        """Resolve hosts in the background so the first request finds them cached."""
+        for host in hosts:
+            if host and not _is_ip_address(host):
+                self._executor.submit(self._refresh_in_background, host)
+
+    def _create_connection(self, address, *args, **kwargs):
+        host, port = address
+        if _is_ip_address(host):
+            return self._original_create_connection(address, *args, **kwargs)
+
+        last_error = None
+        for ip in self.resolve(host):
+            try:
+                return self._original_create_connection((ip, port), *args, **kwargs)
+            except OSError as e:
+                last_error = e
+        # Every cached address failed; force a fresh lookup next time
+        self.invalidate(host)
+        raise last_error or socket.gaierror(f"No addresses for {host}")
+
+    def install(self):
+        """Route urllib3 (and so every requests session) through this cache."""
+        if self._original_create_connection is not None:
+            return
+        self._original_create_connection = urllib3_connection.create_connection
+        urllib3_connection.create_connection = self._create_connection
+        logger.info("DNS resolver cache installed for outbound HTTP clients")
+
+
+def configured_service_hosts() -> List[str]:
+    """Hosts of all configured external services, plus DNS_PREFETCH_HOSTS."""
+    hosts = []
+    for var in PREFETCH_URL_ENV_VARS:
+        host = urlparse(os.getenv(var) or "").hostname
+        if host and host not in hosts:
+            hosts.append(host)
+    for host in (os.getenv("DNS_PREFETCH_HOSTS") or "").split(","):
+        host = host.strip()
+        if host and host not in hosts:
+            hosts.append(host)
+    return hosts
+
+
+dns_resolver = DNSResolverCache(
+    ttl=float(os.getenv("DNS_CACHE_TTL", "300")),
+    negative_ttl=float(os.getenv("DNS_NEGATIVE_TTL", "30")),
+    resolve_timeout=float(os.getenv("DNS_RESOLVE_TIMEOUT", "5")),
+)
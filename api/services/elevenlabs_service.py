@@ -1,8 +1,15 @@
 import os
+import time
 import requests
 import logging
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from api.services.metrics_service import metrics
+from api.services.rate_limit_service import (
+    RateLimitExceeded,
+    get_limiter,
+    retry_statuses,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -26,8 +33,12 @@ class ElevenLabsService:
 
         # Create a session for connection pooling
         self.session = requests.Session()
+        self.limiter = get_limiter("elevenlabs")
+        # 429s are left to the rate limiter, unless it is off
         retries = Retry(
-            total=3, backoff_factor=2.0, status_forcelist=[429, 500, 502, 503, 504]
+            total=3,
+            backoff_factor=2.0,
+            status_forcelist=retry_statuses(self.limiter),
         )
         self.session.mount("https://", HTTPAdapter(max_retries=retries))
         self.session.headers.update(
@@ -53,7 +64,8 @@ class ElevenLabsService:
             self.session.proxies.update(proxies)
             logger.info(f"Proxies set: {proxies}")
 
-    def text_to_speech(self, text: str, file_name: str):
+    def text_to_speech(self, text: str, file_name: str, sink=None):
+        """Stream the synthesized mp3 into file_name, copying each chunk to sink."""
         try:
             logger.info(f"Converting text to speech: {text[:50]}...")
             logger.info(f"Output file: {file_name}")
@@ -81,50 +93,83 @@ class ElevenLabsService:
                 headers["xi-api-key"] = self.api_key
 
             # Optimized retry with shorter timeouts
+            streamed = False
             for attempt in range(2):
+                start = time.perf_counter()
                 try:
                     timeout = 20 if attempt == 0 else 40  # Reduced timeouts
                     logger.info(
                         f"ElevenLabs TTS attempt {attempt + 1} with timeout {timeout}s"
                     )
 
-                    response = self.session.post(
-                        self.base_url,
-                        json=payload,
-                        headers=headers,
-                        timeout=timeout,
-                        verify=False,
-                    )
-
-                    logger.info(
-                        f"ElevenLabs TTS response status={response.status_code} length={len(response.content)}"
-                    )
-                    response.raise_for_status()
-
-                    content_type = response.headers.get("Content-Type", "")
-                    if content_type and not content_type.lower().startswith("audio"):
-                        logger.error(
-                            f"Unexpected content-type from TTS: {content_type}"
+                    # The slot is held until the audio has been fully read
+                    with self.limiter.limit(timeout):
+                        response = self.session.post(
+                            self.base_url,
+                            json=payload,
+                            headers=headers,
+                            timeout=timeout,
+                            verify=False,
+                            stream=True,
                         )
-                        logger.error(
-                            f"Response body (first 500 chars): {getattr(response, 'text', '')[:500]}"
-                        )
-                        raise ValueError(
-                            f"TTS returned non-audio content-type: {content_type}"
-                        )
-
-                    if not response.content:
-                        raise ValueError("TTS service returned empty audio content")
-
-                    with open(file_name, "wb") as f:
-                        f.write(response.content)
-
-                    logger.info(f"Audio file created successfully: {file_name}")
-                    return  # Success, exit the retry loop
+                        # Released on every exit, also when a check or the sink raises
+                        with response:
+                            self.limiter.observe_response(response)
+
+                            logger.info(
+                                f"ElevenLabs TTS response status={response.status_code}"
+                            )
+                            response.raise_for_status()
+
+                            content_type = response.headers.get("Content-Type", "")
+                            if content_type and not content_type.lower().startswith(
+                                "audio"
+                            ):
+                                logger.error(
+                                    f"Unexpected content-type from TTS: {content_type}"
+                                )
+                                logger.error(
+                                    f"Response body (first 500 chars): {getattr(response, 'text', '')[:500]}"
+                                )
+                                raise ValueError(
+                                    f"TTS returned non-audio content-type: {content_type}"
+                                )
+
+                            # Write chunks as they arrive so a sink can decode meanwhile
+                            size = 0
+                            with open(file_name, "wb") as f:
+                                for chunk in response.iter_content(chunk_size=16384):
+                                    if not chunk:
+                                        continue
+                                    if not size:
+                                        metrics.observe(
+                                            "elevenlabs_first_byte_seconds",
+                                            time.perf_counter() - start,
+                                        )
+                                    f.write(chunk)
+                                    if sink is not None:
+                                        sink.write(chunk)
+                                        streamed = True
+                                    size += len(chunk)
+
+                            if not size:
+                                raise ValueError(
+                                    "TTS service returned empty audio content"
+                                )
+                            metrics.observe(
+                                "elevenlabs_total_seconds", time.perf_counter() - start
+                            )
+                            logger.info(f"ElevenLabs TTS received {size} bytes")
+
+                            logger.info(f"Audio file created successfully: {file_name}")
+                            return  # Success, exit the retry loop
 
                 except Exception as e:
                     logger.warning(f"ElevenLabs TTS attempt {attempt + 1} failed: {e}")
-                    if attempt == 1:  # Last attempt
+                    # Last attempt, the sink already holds part of this audio (the
+                    # router retries once with a fresh sink), or the quota is
+                    # exhausted and another provider should take the request
+                    if attempt == 1 or streamed or isinstance(e, RateLimitExceeded):
                         logger.error(
                             f"All ElevenLabs TTS attempts failed. Last error: {e}"
                         )
@@ -4,16 +4,56 @@ import logging
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from api.schemas.extract_info_schema import ExtractInfoRequest
+from api.services.rate_limit_service import get_limiter, retry_statuses
 
 logger = logging.getLogger(__name__)
 
 
+def normalize_passengers(passengers) -> list:
+    """Map the external service's passenger records to our passenger schema."""
+    normalized_passengers = []
+    for p in passengers or []:
+        try:
+            # read possible sources
+            luggage = p.get("luggageCount")
+            if luggage is None:
+                baggage_raw = p.get("baggageCount")
+                if baggage_raw is not None:
+                    # try to convert to int; fallback to 0
+                    try:
+                        luggage = int(str(baggage_raw).strip())
+                    except Exception:
+                        luggage = 0
+            # build normalized passenger
+            normalized_passengers.append(
+                {
+                    "name": p.get("name", ""),
+                    "lastName": p.get("lastName", ""),
+                    "nationalId": p.get("nationalId", ""),
+                    "passportNumber": p.get("passportNumber", ""),
+                    "luggageCount": int(luggage) if luggage is not None else 0,
+                    "passengerType": p.get("passengerType", ""),
+                    "gender": p.get("gender", ""),
+                    "nationality": p.get(
+                        "nationality", "ایرانی"
+                    ),  # ایرانی، غیر ایرانی، دیپلمات
+                }
+            )
+        except Exception as norm_err:
+            logger.warning(f"Could not normalize passenger record {p}: {norm_err}")
+    return normalized_passengers
+
+
 class ExtractInfoService:
     def __init__(self):
         self.url = os.getenv("EXTERNAL_EXTRACTINFO_SERVICE_URL")
         self.session = requests.Session()
+        self.limiter = get_limiter("extract_info")
+        # 429s are left to the rate limiter, unless it is off
         retries = Retry(
-            total=3, backoff_factor=2.0, status_forcelist=[429, 500, 502, 503, 504]
+            total=3,
+            backoff_factor=2.0,
+            status_forcelist=retry_statuses(self.limiter),
         )
         self.session.mount("https://", HTTPAdapter(max_retries=retries))
         self.session.headers.update(
@@ -57,9 +97,11 @@ class ExtractInfoService:
             logger.info(f"Calling external extractInfo service: {self.url}")
             logger.info(f"Payload: {payload}")
 
-            response = self.session.post(
-                self.url, json=payload, timeout=30, verify=False
-            )
+            with self.limiter.limit(timeout=30):
+                response = self.session.post(
+                    self.url, json=payload, timeout=30, verify=False
+                )
+            self.limiter.observe_response(response)
             response.raise_for_status()
             result = response.json()
 
@@ -90,39 +132,7 @@ class ExtractInfoService:
                     else:
                         result[field] = ""
             # Normalize passengers: map baggageCount -> luggageCount (int)
-            normalized_passengers = []
-            for p in result.get("passengers", []) or []:
-                try:
-                    # read possible sources
-                    luggage = p.get("luggageCount")
-                    if luggage is None:
-                        baggage_raw = p.get("baggageCount")
-                        if baggage_raw is not None:
-                            # try to convert to int; fallback to 0
-                            try:
-                                luggage = int(str(baggage_raw).strip())
-                            except Exception:
-                                luggage = 0
-                    # build normalized passenger
-                    normalized_passengers.append(
-                        {
-                            "name": p.get("name", ""),
-                            "lastName": p.get("lastName", ""),
-                            "nationalId": p.get("nationalId", ""),
-                            "passportNumber": p.get("passportNumber", ""),
-                            "luggageCount": int(luggage) if luggage is not None else 0,
-                            "passengerType": p.get("passengerType", ""),
-                            "gender": p.get("gender", ""),
-                            "nationality": p.get(
-                                "nationality", "ایرانی"
-                            ),  # ایرانی، غیر ایرانی، دیپلمات
-                        }
-                    )
-                except Exception as norm_err:
-                    logger.warning(
-                        f"Could not normalize passenger record {p}: {norm_err}"
-                    )
-            result["passengers"] = normalized_passengers
+            result["passengers"] = normalize_passengers(result.get("passengers"))
 
             # result["flightNumber"] = messages.flightNumber  # type: ignore
             print("get_extractInfo_response", result)
@@ -0,0 +1,133 @@
+import os
+import logging
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from api.services.phrase_library_service import fold_text
+
+logger = logging.getLogger(__name__)
+
+NGRAM_SIZES = (2, 3, 4)
+# Cosine similarity a question needs to be answered from the sheet directly
+FAQ_THRESHOLD = float(os.getenv("CHAT_FAQ_THRESHOLD", "0.85"))
+# ... and how far ahead of the runner-up it must be, so near-duplicate rows
+# with different answers go to the chat service instead
+FAQ_MIN_MARGIN = float(os.getenv("CHAT_FAQ_MIN_MARGIN", "0.05"))
+
+
+def normalize_question(text: str) -> str:
+    """Folded letters and digits with single spaces (می‌شود and میشود become one)."""
+    kept = []
+    for char in fold_text(text):
+        category = unicodedata.category(char)
+        if category.startswith("L"):
+            kept.append(char)
+        elif category == "Nd":
+            kept.append(str(unicodedata.digit(char)))
+        elif not category.startswith("M") and kept and kept[-1] != " ":
+            kept.append(" ")
+    return "".join(kept).strip()
+
+
+def char_ngrams(text: str) -> Dict[str, int]:
+    padded = f" {normalize_question(text)} "
+    counts: Dict[str, int] = {}
+    for size in NGRAM_SIZES:
+        for start in range(len(padded) - size + 1):
+            gram = padded[start : start + size]
+            counts[gram] = counts.get(gram, 0) + 1
+    return counts
+
+
+def script_language(text: str) -> str:
+    """Language of a text by its letters: "fa" for Arabic script, otherwise "en"."""
+    for char in text or "":
+        if "\u0600" <= char <= "\u06ff":
+            return "fa"
+    return "en"
+
+
+class FaqIndex:
+    """
+    Character n-gram TF-IDF over the knowledge sheet's questions.
+
+    Rows are unit vectors stored column-wise (n-gram -> rows, weights), so
+    scoring a question is one np.bincount over the postings of its n-grams.
+    Character n-grams are robust to the spelling and spacing variants of
+    typed and transcribed Persian.
+    """
+
+    def __init__(self, items: List[Dict[str, str]]):
+        self.items = items
+        self.vocabulary: Dict[str, int] = {}
+        postings: List[List[Tuple[int, float]]] = []
+        row_counts = [char_ngrams(item.get("question", "")) for item in items]
+        for row, counts in enumerate(row_counts):
+            for gram, count in counts.items():
+                column = self.vocabulary.setdefault(gram, len(postings))
+                if column == len(postings):
+                    postings.append([])
+                postings[column].append((row, 1.0 + np.log(count)))
+
+        document_frequency = np.array([len(p) for p in postings], dtype=np.float64)
+        self.idf = np.log((1 + len(items)) / (1 + document_frequency)) + 1.0
+        self.max_idf = np.log(1 + len(items)) + 1.0  # of an n-gram in no row
+
+        lengths = np.array([len(p) for p in postings], dtype=np.int64)
+        self.indptr = np.concatenate(([0], np.cumsum(lengths)))
+        self.rows = np.fromiter(
+            (row for p in postings for row, _ in p), np.int64, int(lengths.sum())
+        )
+        weights = np.fromiter(
+            (tf for p in postings for _, tf in p), np.float64, int(lengths.sum())
+        )
+        weights *= np.repeat(self.idf, lengths)
+        norms = np.sqrt(np.bincount(self.rows, weights**2, minlength=len(items)))
+        self.weights = weights / np.where(norms > 0, norms, 1.0)[self.rows]
+
+    def match(self, question: str) -> Optional[Tuple[float, float, Dict[str, str]]]:
+        """(score, margin over the runner-up, row) of the closest question."""
+        counts = char_ngrams(question)
+        if not self.items or not counts:
+            return None
+        grams = list(counts)
+        known = [i for i, gram in enumerate(grams) if gram in self.vocabulary]
+        if not known:
+            return None
+        # n-grams the sheet never uses still count towards the query's length
+        query = np.log(np.fromiter(counts.values(), np.float64, len(grams))) + 1.0
+        query *= np.array(
+            [
+                self.idf[self.vocabulary[g]] if g in self.vocabulary else self.max_idf
+                for g in grams
+            ]
+        )
+        query /= np.linalg.norm(query)
+        columns = np.array([self.vocabulary[grams[i]] for i in known], dtype=np.int64)
+        query = query[known]
+
+        starts, ends = self.indptr[columns], self.indptr[columns + 1]
+        lengths = ends - starts
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        positions += np.arange(lengths.sum())
+        scores = np.bincount(
+            self.rows[positions],
+            self.weights[positions] * np.repeat(query, lengths),
+            minlength=len(self.items),
+        )
+        best = int(np.argmax(scores))
+        runner_up = np.partition(scores, -2)[-2] if len(scores) > 1 else 0.0
+        return float(scores[best]), float(scores[best] - runner_up), self.items[best]
+
+    def answer(self, question: str, language: str) -> Optional[Dict[str, str]]:
+        """The sheet row to answer with, when the match is confident enough."""
+        found = self.match(question)
+        if found is None:
+            return None
+        score, margin, row = found
+        if score < FAQ_THRESHOLD or margin < FAQ_MIN_MARGIN:
+            return None
+        if script_language(row.get("answer", "")) != language:
+            return None  # the stored answer is in the other language
+        logger.info(f"❓ FAQ match {score:.2f}: '{row.get('question', '')[:60]}'")
+        return row
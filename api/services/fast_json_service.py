@@ -0,0 +1,110 @@
+import os
+import json
+import base64
+import logging
+from typing import Iterable, Iterator, Optional
+from api.schemas.assistant_schema import Message
+from api.services.metrics_service import metrics
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # the stdlib encoder gives the same bytes, slower
+    orjson = None
+# The two only differ in exponent notation of floats below 1e-4 or from 1e16 on,
+# which lipsync times and the other message fields never reach
+
+MESSAGE_FIELDS = tuple(Message.model_fields)
+# Audio read per step when streaming a reply
+STREAM_CHUNK_SIZE = int(os.getenv("CHAT_STREAM_CHUNK_SIZE", "49152"))
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def is_json_object(raw: Optional[bytes]) -> bool:
+    """Cheap sanity check before embedding bytes verbatim into a response."""
+    if not raw:
+        return False
+    stripped = raw.strip()
+    return stripped[:1] == b"{" and stripped[-1:] == b"}"
+
+
+def message_json(message: Message, omit: Iterable[str] = ()) -> bytes:
+    """
+    One Message as JSON without going through pydantic serialization.
+
+    A lipsync file read as bytes (message._lipsync_raw) is embedded verbatim,
+    so Rhubarb's output is never parsed or re-encoded. Fields in omit are left
+    out.
+    """
+    fields = {
+        name: getattr(message, name) for name in MESSAGE_FIELDS if name not in omit
+    }
+    raw = message._lipsync_raw
+    if raw is None or fields["lipsync"] is not None:
+        return dumps(fields)
+    del fields["lipsync"]
+    return b"".join((dumps(fields)[:-1], b',"lipsync":', raw.strip(), b"}"))
+
+
+def chat_response_json(messages: Iterable[Message]) -> bytes:
+    """Body of a ChatResponse ({"messages": [...]}) built from trusted messages."""
+    return b"".join(
+        (b'{"messages":[', b",".join(message_json(m) for m in messages), b"]}")
+    )
+
+
+def iter_message_json(
+    message: Message, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    One Message as JSON in pieces. Audio left on disk (message._audio_path) is
+    base64 encoded chunk by chunk as it is read, so it is never held whole.
+    """
+    path = message._audio_path
+    if path is None:
+        yield message_json(message)
+        return
+    try:
+        f = open(path, "rb")
+    except OSError as e:
+        logger.error(f"❌ Audio to stream is gone, sending the message without it: {e}")
+        yield message_json(message)
+        return
+    # base64 works on 3-byte groups; whole groups let each chunk be encoded alone
+    chunk_size = max(3, chunk_size // 3 * 3)
+    streamed = 0
+    # Same field order, and so the same bytes, as message_json
+    before = MESSAGE_FIELDS[: MESSAGE_FIELDS.index("audio")]
+    with f:
+        yield dumps({name: getattr(message, name) for name in before})[:-1]
+        yield b',"audio":"'
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            streamed += len(chunk)
+            yield base64.b64encode(chunk)
+    yield b'",' + message_json(message, omit=before + ("audio",))[1:]
+    metrics.increment("chat_streamed_audio_bytes_total", streamed)
+
+
+def iter_chat_response_json(
+    messages: Iterable[Message], chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    The same body as chat_response_json, produced piece by piece for a
+    StreamingResponse. Memory per reply stays around one audio chunk, however
+    long the clips are.
+    """
+    yield b'{"messages":['
+    for index, message in enumerate(messages):
+        if index:
+            yield b","
+        yield from iter_message_json(message, chunk_size)
+    yield b"]}"
@@ -22,6 +22,33 @@ class FileService:
             logger.error(f"Error reading audio file {file_path}: {e}")
             raise
 
+    @staticmethod
+    def audio_file_to_bytes(file_path: str) -> bytes:
+        try:
+            logger.info(f"Reading audio file: {file_path}")
+            with open(file_path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            logger.error(f"Audio file not found: {file_path}")
+            raise
+        except Exception as e:
+            logger.error(f"Error reading audio file {file_path}: {e}")
+            raise
+
+    @staticmethod
+    def read_json_bytes(file_path: str) -> bytes:
+        """A JSON transcript as bytes, for embedding into a response without parsing."""
+        try:
+            logger.info(f"Reading JSON transcript bytes: {file_path}")
+            with open(file_path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            logger.error(f"JSON transcript file not found: {file_path}")
+            raise
+        except Exception as e:
+            logger.error(f"Error reading JSON transcript {file_path}: {e}")
+            raise
+
     @staticmethod
     def read_json_transcript(file_path: str):
         try:
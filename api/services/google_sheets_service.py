@@ -1,24 +1,50 @@
 import os
 import json
+import threading
 from google.oauth2.credentials import Credentials  # type: ignore
 from google.oauth2 import service_account  # type: ignore
 from googleapiclient.discovery import build  # type: ignore
 from dotenv import load_dotenv
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 # from google.oauth2.service_account import ServiceAccountCredentials
 
 
 class GoogleSheetsService:
+    """
+    Read access to the knowledge and questions sheets.
+
+    Credentials are parsed once per scope set and refresh their own tokens.
+    API clients are built once, from the discovery documents bundled with
+    google-api-python-client. Their httplib2 connections are not thread-safe,
+    so requests through them are serialized; use get_sheets_service() to
+    share one instance.
+    """
+
     def __init__(self):
         load_dotenv(override=True)
         self.SCOPES = ["https://www.googleapis.com/auth/spreadsheets.readonly"]
+        # Only for reading the sheet's revision; credentials may not grant it
+        self.REVISION_SCOPES = self.SCOPES + [
+            "https://www.googleapis.com/auth/drive.metadata.readonly"
+        ]
         self.KNOWLEDGE_SHEET_ID = os.getenv("KNOWLEDGE_SHEET_ID")
         self.QUESTIONS_SHEET_ID = os.getenv("QUESTIONS_SHEET_ID")
-        self.KNOWLEDGE_RANGE = "Sheet1!A1:Z1000"
-        self.QUESTIONS_RANGE = "Sheet1!A1:Z1000"
-
-    def get_credentials(self):
+        self.KNOWLEDGE_RANGE = os.getenv("KNOWLEDGE_SHEET_RANGE", "Sheet1!A1:Z1000")
+        self.QUESTIONS_RANGE = os.getenv("QUESTIONS_SHEET_RANGE", "Sheet1!A1:Z1000")
+        self._credentials: Dict[Tuple[str, ...], object] = {}
+        self._clients: Dict[Tuple, object] = {}
+        self._lock = threading.RLock()
+
+    def get_credentials(self, scopes: Optional[List[str]] = None):
+        """Credentials for the given scopes, parsed from the environment once."""
+        key = tuple(scopes or self.SCOPES)
+        with self._lock:
+            if key not in self._credentials:
+                self._credentials[key] = self._load_credentials(list(key))
+            return self._credentials[key]
+
+    def _load_credentials(self, scopes: List[str]):
         """Get credentials from environment variables."""
         try:
             # Try to get service account credentials
@@ -26,14 +52,14 @@ class GoogleSheetsService:
             if credentials_json:
                 credentials_info = json.loads(credentials_json)
                 return service_account.Credentials.from_service_account_info(
-                    credentials_info, scopes=self.SCOPES
+                    credentials_info, scopes=scopes
                 )
 
             # If no service account credentials, try to get OAuth2 credentials
             token_json = os.getenv("GOOGLE_SHEETS_TOKEN")
             if token_json:
                 token_info = json.loads(token_json)
-                return Credentials.from_authorized_user_info(token_info, self.SCOPES)
+                return Credentials.from_authorized_user_info(token_info, scopes)
 
             raise ValueError("No Google credentials found in environment variables")
         except json.JSONDecodeError as e:
@@ -41,38 +67,112 @@ class GoogleSheetsService:
         except Exception as e:
             raise ValueError(f"Error loading credentials: {e}")
 
+    def _client(self, api: str, version: str, scopes: Optional[List[str]] = None):
+        key = (api, version, tuple(scopes or self.SCOPES))
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = build(
+                    api,
+                    version,
+                    credentials=self.get_credentials(scopes),
+                    static_discovery=True,
+                    cache_discovery=False,
+                )
+            return self._clients[key]
+
+    def _execute(self, request) -> dict:
+        with self._lock:
+            return request.execute()
+
     def get_sheet_data(self):
         """Get data from Google Sheets."""
         try:
-            credentials = self.get_credentials()
-            service = build("sheets", "v4", credentials=credentials)
-            sheet = service.spreadsheets()
-            result = (
-                sheet.values()
-                .get(spreadsheetId=self.KNOWLEDGE_SHEET_ID, range=self.KNOWLEDGE_RANGE)
-                .execute()
-            )
-            return result.get("values", [])
+            return self._fetch_sheet_data(self.KNOWLEDGE_SHEET_ID, self.KNOWLEDGE_RANGE)
         except Exception as e:
             print(f"Error fetching sheet data: {e}")
             return []
 
+    def _fetch_sheet_data(self, sheet_id: str, range_name: str) -> List[List[str]]:
+        """Get data from Google Sheet, raising on failure."""
+        sheet = self._client("sheets", "v4").spreadsheets()
+        result = self._execute(
+            sheet.values().get(spreadsheetId=sheet_id, range=range_name)
+        )
+        return result.get("values", [])
+
     def _get_sheet_data(self, sheet_id: str, range_name: str) -> List[List[str]]:
         """Get data from Google Sheet."""
         try:
-            service = build("sheets", "v4", credentials=self.get_credentials())
-            sheet = service.spreadsheets()
-            result = (
-                sheet.values().get(spreadsheetId=sheet_id, range=range_name).execute()
-            )
-            return result.get("values", [])
+            return self._fetch_sheet_data(sheet_id, range_name)
         except Exception as e:
             print(f"Error getting sheet data: {str(e)}")
             return []
 
+    def get_knowledge_revision(self) -> Optional[str]:
+        """Revision of the knowledge sheet (Drive file version), raising on failure."""
+        files = self._client("drive", "v3", self.REVISION_SCOPES).files()
+        result = self._execute(
+            files.get(fileId=self.KNOWLEDGE_SHEET_ID, fields="version")
+        )
+        return result.get("version")
+
+    def fetch_knowledge_base(self) -> List[Dict[str, str]]:
+        """Like get_knowledge_base, but raises when the sheet cannot be read."""
+        return self._knowledge_items(
+            self._fetch_sheet_data(self.KNOWLEDGE_SHEET_ID, self.KNOWLEDGE_RANGE)
+        )
+
+    def fetch_knowledge_and_questions(
+        self,
+    ) -> Tuple[List[Dict[str, str]], Optional[List[Dict[str, str]]]]:
+        """
+        Knowledge base and questions history, raising only when the knowledge
+        range cannot be read; questions are None when they could not be.
+        Ranges of one spreadsheet come back in a single batchGet round trip.
+        """
+        if (
+            self.QUESTIONS_SHEET_ID
+            and self.QUESTIONS_SHEET_ID == self.KNOWLEDGE_SHEET_ID
+        ):
+            sheet = self._client("sheets", "v4").spreadsheets()
+            try:
+                result = self._execute(
+                    sheet.values().batchGet(
+                        spreadsheetId=self.KNOWLEDGE_SHEET_ID,
+                        ranges=[self.KNOWLEDGE_RANGE, self.QUESTIONS_RANGE],
+                    )
+                )
+                # valueRanges come back in the order they were asked for
+                knowledge, questions = [
+                    self._knowledge_items(value_range.get("values", []))
+                    for value_range in result.get("valueRanges", [])
+                ]
+                return knowledge, questions
+            except Exception as e:
+                # A bad questions range fails the whole batch; read the knowledge alone
+                print(f"Error batch-fetching knowledge and questions: {e}")
+                return self.fetch_knowledge_base(), None
+
+        knowledge = self.fetch_knowledge_base()
+        if not self.QUESTIONS_SHEET_ID:
+            return knowledge, None
+        try:
+            questions = self._knowledge_items(
+                self._fetch_sheet_data(self.QUESTIONS_SHEET_ID, self.QUESTIONS_RANGE)
+            )
+        except Exception as e:
+            print(f"Error fetching questions history: {e}")
+            questions = None
+        return knowledge, questions
+
     def get_knowledge_base(self) -> List[Dict[str, str]]:
         """Get formatted knowledge base data."""
-        raw_data = self._get_sheet_data(self.KNOWLEDGE_SHEET_ID, self.KNOWLEDGE_RANGE)
+        return self._knowledge_items(
+            self._get_sheet_data(self.KNOWLEDGE_SHEET_ID, self.KNOWLEDGE_RANGE)
+        )
+
+    @staticmethod
+    def _knowledge_items(raw_data: List[List[str]]) -> List[Dict[str, str]]:
         if not raw_data or len(raw_data) < 2:  # Need at least header and one row
             return []
 
@@ -105,7 +205,10 @@ class GoogleSheetsService:
 
     def format_knowledge_for_prompt(self) -> str:
         """Format knowledge base data for OpenAI prompt."""
-        knowledge_base = self.get_knowledge_base()
+        return self.format_knowledge(self.get_knowledge_base())
+
+    @staticmethod
+    def format_knowledge(knowledge_base: List[Dict[str, str]]) -> str:
         formatted_items = []
 
         for item in knowledge_base:
@@ -116,20 +219,19 @@ class GoogleSheetsService:
 
     def get_questions_history(self) -> List[Dict[str, str]]:
         """Get questions history from Google Sheet."""
-        raw_data = self._get_sheet_data(self.QUESTIONS_SHEET_ID, self.QUESTIONS_RANGE)
-        if not raw_data or len(raw_data) < 2:
-            return []
+        return self._knowledge_items(
+            self._get_sheet_data(self.QUESTIONS_SHEET_ID, self.QUESTIONS_RANGE)
+        )
 
-        headers = raw_data[0]
-        history = []
 
-        for row in raw_data[1:]:
-            if len(row) >= 2:
-                item = {
-                    "question": row[0],
-                    "answer": row[1],
-                    "category": row[2] if len(row) > 2 else "General",
-                }
-                history.append(item)
+_service = None
+_service_lock = threading.Lock()
+
 
-        return history
+def get_sheets_service() -> GoogleSheetsService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = GoogleSheetsService()
+    return _service
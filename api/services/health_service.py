@@ -0,0 +1,207 @@
+import os
+import functools
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+from api.services.metrics_service import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Probe:
+    """
+    One dependency check. check() raises when the dependency is unusable and may
+    return a short detail string; probes whose failure should take the instance
+    out of the load balancer are critical.
+    """
+
+    def __init__(self, name: str, check: Callable[[], Optional[str]], critical: bool):
+        self.name = name
+        self.check = check
+        self.critical = critical
+
+
+def check_database() -> str:
+    from sqlalchemy import text
+    from api.database.database import engine
+
+    # A pooled connection, returned on exit; pool_pre_ping already drops dead ones
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    return "connected"
+
+
+def check_chat_service(timeout: float = 5.0) -> str:
+    from api.services.openai_service import OpenAIService
+
+    service = OpenAIService()
+    if not urlparse(service.url or "").hostname:
+        raise RuntimeError("EXTERNAL_CHAT_SERVICE_URL is not set")
+    # HEAD on the chat endpoint: any answer short of a 5xx means the service is up
+    # (usually 405, the endpoint only takes POST), and nothing is generated
+    response = service.probe(timeout)
+    response.close()
+    if response.status_code >= 500:
+        raise RuntimeError(f"HTTP {response.status_code}")
+    return f"reachable (HTTP {response.status_code})"
+
+
+def check_knowledge_base() -> str:
+    from api.services.knowledge_base_service import get_knowledge_base_cache
+
+    # Reads what the knowledge base refresh thread last saw, never the sheet itself
+    status = get_knowledge_base_cache().status()
+    if status["source"] == "empty":
+        raise RuntimeError(status["last_error"] or "no knowledge base loaded")
+    detail = f"{status['items']} items from {status['source']}"
+    if status["consecutive_failures"]:
+        detail += f", {status['consecutive_failures']} failed refreshes"
+    return detail
+
+
+def default_probes(timeout: float = 5.0) -> List[Probe]:
+    # Only this instance's own dependencies are critical by default: an outage of
+    # the shared chat service would otherwise pull every instance out at once
+    critical = {
+        name.strip() for name in os.getenv("READINESS_PROBES", "database").split(",")
+    }
+    checks = {
+        "database": check_database,
+        "chat_service": functools.partial(check_chat_service, timeout),
+        "knowledge_base": check_knowledge_base,
+    }
+    return [Probe(name, check, name in critical) for name, check in checks.items()]
+
+
+class HealthMonitor:
+    """
+    Runs the dependency probes on a background thread every interval, each
+    bounded by timeout, and keeps the last result of each. Health endpoints only
+    read those results, so a probe from the load balancer costs nothing and
+    never waits on a slow dependency.
+    """
+
+    def __init__(self, probes: List[Probe], interval: float, timeout: float):
+        self.probes = probes
+        self.interval = interval
+        self.timeout = timeout
+        self.results: Dict[str, Dict] = {}
+        self._pending = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(probes) or 1, thread_name_prefix="health"
+        )
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _record(self, probe: Probe, status: str, detail: str, seconds: float):
+        self.results[probe.name] = {
+            "status": status,
+            "detail": detail,
+            "critical": probe.critical,
+            "latency_ms": round(seconds * 1e3, 1),
+            "checked_at": time.time(),
+        }
+        labels = {"probe": probe.name}
+        metrics.set_gauge("health_probe_up", 1 if status == "ok" else 0, labels)
+        metrics.observe("health_probe_seconds", seconds, labels)
+        if status != "ok":
+            metrics.increment("health_probe_failures_total", labels=labels)
+
+    def run_once(self):
+        started = time.perf_counter()
+        futures = {}
+        for probe in self.probes:
+            pending = self._pending.get(probe.name)
+            if pending is not None and not pending.done():
+                # Still stuck since the last round; don't pile up more threads
+                self._record(probe, "timeout", "previous check still running", 0.0)
+                continue
+            futures[probe.name] = self._pending[probe.name] = self._executor.submit(
+                probe.check
+            )
+
+        for probe in self.probes:
+            future = futures.get(probe.name)
+            if future is None:
+                continue
+            remaining = max(0.0, self.timeout - (time.perf_counter() - started))
+            try:
+                detail = future.result(timeout=remaining) or "ok"
+                status = "ok"
+            except FutureTimeoutError:
+                status, detail = "timeout", f"no answer within {self.timeout:g}s"
+            except Exception as e:
+                status, detail = "error", f"{type(e).__name__}: {e}"
+            self._record(probe, status, detail, time.perf_counter() - started)
+            if status != "ok":
+                logger.warning(f"🩺 {probe.name} probe {status}: {detail}")
+
+    def is_ready(self) -> bool:
+        """Every critical probe passed in a recent round."""
+        max_age = 3 * self.interval + self.timeout
+        now = time.time()
+        for probe in self.probes:
+            if not probe.critical:
+                continue
+            result = self.results.get(probe.name)
+            if (
+                result is None
+                or result["status"] != "ok"
+                or now - result["checked_at"] > max_age
+            ):
+                return False
+        return True
+
+    def status(self) -> Dict:
+        return {
+            "ready": self.is_ready(),
+            "checks": {
+                probe.name: self.results.get(
+                    probe.name, {"status": "pending", "critical": probe.critical}
+                )
+                for probe in self.probes
+            },
+        }
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"🩺 Health probes failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._loop, name="health-probes", daemon=True
+            )
+            self._thread.start()
+            logger.info(
+                f"🩺 Health probes started ({len(self.probes)} checks, "
+                f"every {self.interval:.0f}s)"
+            )
+
+    def stop(self):
+        self._stop.set()
+
+
+_monitor = None
+_monitor_lock = threading.Lock()
+
+
+def get_health_monitor() -> HealthMonitor:
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                timeout = float(os.getenv("HEALTH_PROBE_TIMEOUT", "5"))
+                _monitor = HealthMonitor(
+                    default_probes(timeout),
+                    float(os.getenv("HEALTH_PROBE_INTERVAL", "15")),
+                    timeout,
+                )
+    return _monitor
@@ -0,0 +1,181 @@
+import os
+import glob
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Set
+from api.services.metrics_service import metrics
+from api.services import answer_cache_service, artifact_store_service
+
+logger = logging.getLogger(__name__)
+
+AUDIO_DIR = "audios"
+
+
+class RetentionPolicy:
+    """
+    What the janitor may delete for one class of generated files.
+
+    Files older than max_age are removed. If the class still holds more than
+    max_bytes, the oldest files go next, but never one younger than min_age,
+    which protects files a request is still writing or serving. File names
+    returned by keep are never removed but still count towards max_bytes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        directory: str,
+        patterns: List[str],
+        max_age: float,
+        max_bytes: int,
+        min_age: float = 120.0,
+        keep: Optional[Callable[[], Set[str]]] = None,
+    ):
+        self.name = name
+        self.directory = directory
+        self.patterns = patterns
+        self.max_age = float(os.getenv(f"JANITOR_{name.upper()}_MAX_AGE", max_age))
+        self.max_bytes = int(os.getenv(f"JANITOR_{name.upper()}_MAX_BYTES", max_bytes))
+        self.min_age = min_age
+        self.keep = keep
+
+    def files(self) -> List[str]:
+        found = set()
+        for pattern in self.patterns:
+            found.update(glob.glob(os.path.join(self.directory, pattern)))
+        return sorted(found)
+
+
+def default_policies() -> List[RetentionPolicy]:
+    policies = [
+        # Per-message mp3/wav/json of /chat (message_<session>_<i>.*, batch clips)
+        RetentionPolicy(
+            "chat_temp",
+            AUDIO_DIR,
+            ["message_*_*.mp3", "message_*_*.wav", "message_*_*.json", "*.part"],
+            max_age=600,
+            max_bytes=200 * 1024 * 1024,
+        ),
+        # Output of /test-avashow
+        RetentionPolicy(
+            "test_audio",
+            os.path.join(AUDIO_DIR, "test_avashow"),
+            ["test_avashow_*.mp3"],
+            max_age=3600,
+            max_bytes=50 * 1024 * 1024,
+        ),
+    ]
+    store = artifact_store_service.get_artifact_store()
+    if isinstance(store, artifact_store_service.LocalArtifactStore):
+        # Signed URLs stay valid for up to two TTL windows
+        policies.append(
+            RetentionPolicy(
+                "artifacts",
+                store.directory,
+                ["*.mp3", "*.wav", "*.json", "*.bin", "*.part"],
+                max_age=7 * 24 * 3600,
+                max_bytes=1024 * 1024 * 1024,
+                min_age=2 * artifact_store_service.URL_TTL_SECONDS,
+                # Pre-synthesized answers stay until a rebuild drops them
+                keep=answer_cache_service.manifest_keys,
+            )
+        )
+    return policies
+
+
+class Janitor:
+    """Applies retention policies on a background thread, off the request path."""
+
+    def __init__(self, policies: List[RetentionPolicy], interval: float):
+        self.policies = policies
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sweep(self, policy: RetentionPolicy, now: Optional[float] = None) -> Dict:
+        now = time.time() if now is None else now
+        entries = []
+        for path in policy.files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # removed by its request in the meantime
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        kept = policy.keep() if policy.keep else set()
+        removed, reclaimed = 0, 0
+        for mtime, size, path in entries:
+            if os.path.basename(path) in kept:
+                continue
+            age = now - mtime
+            expired = age > policy.max_age
+            over_budget = total > policy.max_bytes and age > policy.min_age
+            if not (expired or over_budget):
+                continue
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"🧹 Could not remove {path}: {e}")
+                continue
+            total -= size
+            removed += 1
+            reclaimed += size
+
+        labels = {"class": policy.name}
+        metrics.increment("janitor_files_removed_total", removed, labels=labels)
+        metrics.increment("janitor_bytes_reclaimed_total", reclaimed, labels=labels)
+        metrics.set_gauge("janitor_files", len(entries) - removed, labels)
+        metrics.set_gauge("janitor_bytes", total, labels)
+        return {"removed": removed, "reclaimed_bytes": reclaimed, "bytes": total}
+
+    def run_once(self) -> Dict[str, Dict]:
+        started = time.perf_counter()
+        results = {}
+        for policy in self.policies:
+            try:
+                results[policy.name] = self.sweep(policy)
+            except Exception as e:
+                logger.error(f"🧹 Janitor failed on {policy.name}: {e}")
+        metrics.observe("janitor_run_seconds", time.perf_counter() - started)
+        removed = sum(result["removed"] for result in results.values())
+        if removed:
+            reclaimed = sum(result["reclaimed_bytes"] for result in results.values())
+            logger.info(f"🧹 Janitor removed {removed} files ({reclaimed} bytes)")
+        return results
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._loop, name="artifact-janitor", daemon=True
+            )
+            self._thread.start()
+            logger.info(
+                f"🧹 Janitor started ({len(self.policies)} classes, "
+                f"every {self.interval:.0f}s)"
+            )
+
+    def stop(self):
+        self._stop.set()
+
+
+_janitor = None
+_janitor_lock = threading.Lock()
+
+
+def get_janitor() -> Janitor:
+    global _janitor
+    if _janitor is None:
+        with _janitor_lock:
+            if _janitor is None:
+                _janitor = Janitor(
+                    default_policies(), float(os.getenv("JANITOR_INTERVAL", "60"))
+                )
+    return _janitor
@@ -0,0 +1,302 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Optional
+from api.services.google_sheets_service import GoogleSheetsService, get_sheets_service
+from api.services.faq_service import FaqIndex
+from api.services.knowledge_index_service import KnowledgeIndex
+from api.services.metrics_service import metrics
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PATH = os.getenv(
+    "KNOWLEDGE_BASE_SNAPSHOT", os.path.join("data", "knowledge_base.json")
+)
+# Rows sent with an /ask prompt; 0 sends the whole knowledge base
+ASK_TOP_K = int(os.getenv("ASK_TOP_K", "5"))
+ASK_MIN_SCORE = float(os.getenv("ASK_MIN_SCORE", "0"))
+# Drop rows scoring below this fraction of the best row
+ASK_MIN_RELATIVE_SCORE = float(os.getenv("ASK_MIN_RELATIVE_SCORE", "0.25"))
+
+
+class KnowledgeBase:
+    """One version of the knowledge base. Never modified; a refresh swaps in a new one."""
+
+    def __init__(
+        self,
+        items: List[Dict[str, str]],
+        revision: Optional[str] = None,
+        fetched_at: Optional[float] = None,
+        source: str = "sheets",
+        questions: Optional[List[Dict[str, str]]] = None,
+    ):
+        self.items = items
+        # Questions history sheet; not indexed and not part of the digest
+        self.questions = questions or []
+        self.revision = revision
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+        self.source = source  # "sheets", "snapshot" or "empty"
+        self.prompt = GoogleSheetsService.format_knowledge(items)
+        self.index = KnowledgeIndex(items)
+        self.faq = FaqIndex(items)
+        self.digest = hashlib.sha256(
+            json.dumps(items, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def prompt_for(self, question: str, top_k: int = ASK_TOP_K) -> str:
+        """The rows relevant to a question, formatted like the full prompt."""
+        if top_k <= 0:
+            return self.prompt
+        started = time.perf_counter()
+        hits = self.index.search(question, top_k, ASK_MIN_SCORE, ASK_MIN_RELATIVE_SCORE)
+        prompt = GoogleSheetsService.format_knowledge([item for _, item in hits])
+        metrics.observe("knowledge_retrieval_seconds", time.perf_counter() - started)
+        metrics.observe("knowledge_retrieval_rows", len(hits))
+        metrics.increment(
+            "knowledge_prompt_chars_saved_total", len(self.prompt) - len(prompt)
+        )
+        if not hits:
+            metrics.increment("knowledge_retrieval_misses_total")
+        return prompt
+
+
+class KnowledgeBaseCache:
+    """
+    Serves the knowledge sheet from memory instead of fetching it per question.
+
+    A background thread checks the sheet's revision every check_interval and
+    refetches when it changed, or at least every refresh_interval when the
+    revision cannot be read. Each good fetch is also written to a snapshot
+    file, which is what gets served after a restart while Google is unreachable.
+    """
+
+    def __init__(
+        self,
+        sheets_service: GoogleSheetsService,
+        snapshot_path: str,
+        refresh_interval: float,
+        check_interval: float,
+    ):
+        self.sheets_service = sheets_service
+        self.snapshot_path = snapshot_path
+        self.refresh_interval = refresh_interval
+        self.check_interval = check_interval
+        self.failures = 0  # consecutive failed refreshes
+        self.last_error: Optional[str] = None
+        self._current: Optional[KnowledgeBase] = None
+        self._revision_readable = True
+        self._refresh_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def get(self) -> KnowledgeBase:
+        if self._current is None:
+            self.load()
+        return self._current
+
+    def load(self, fetch: bool = True):
+        """
+        Fetch the sheet, falling back to the snapshot, then to an empty base.
+        With fetch=False only the snapshot is read, leaving the first fetch to
+        the refresh thread, so nothing waits on Google.
+        """
+        with self._load_lock:
+            if self._current is not None:
+                return
+            if not (fetch and self.refresh()):
+                snapshot = self._read_snapshot()
+                if snapshot is not None:
+                    logger.warning(
+                        f"📚 Serving the knowledge base snapshot from "
+                        f"{time.ctime(snapshot.fetched_at)} ({len(snapshot.items)} items)"
+                    )
+                    self._current = snapshot
+                else:
+                    logger.error("📚 No knowledge base available yet, serving none")
+                    self._current = KnowledgeBase([], fetched_at=0, source="empty")
+            self._update_gauges()
+
+    def refresh(self, revision: Optional[str] = None) -> bool:
+        """Fetch the sheet now; True when the cache holds a fresh copy."""
+        with self._refresh_lock:
+            started = time.perf_counter()
+            current = self._current
+            try:
+                if revision is None:
+                    revision = self._read_revision()
+                items, questions = self.sheets_service.fetch_knowledge_and_questions()
+                if not items and current is not None and current.items:
+                    raise ValueError("sheet came back empty, keeping the cached copy")
+            except Exception as e:
+                self.failures += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                metrics.increment(
+                    "knowledge_base_refresh_total", labels={"result": "error"}
+                )
+                logger.warning(
+                    f"📚 Knowledge base refresh failed ({self.failures} in a row): {e}"
+                )
+                self._update_gauges()
+                return False
+
+            if questions is None:
+                # The questions history is optional; keep what we had
+                questions = current.questions if current is not None else []
+            fresh = KnowledgeBase(items, revision, questions=questions)
+            changed = current is None or fresh.digest != current.digest
+            self._current = fresh
+            self.failures = 0
+            self.last_error = None
+            metrics.increment(
+                "knowledge_base_refresh_total",
+                labels={"result": "changed" if changed else "unchanged"},
+            )
+            metrics.observe(
+                "knowledge_base_refresh_seconds", time.perf_counter() - started
+            )
+            if changed:
+                logger.info(
+                    f"📚 Knowledge base loaded: {len(items)} items, "
+                    f"revision {revision or 'unknown'}"
+                )
+            if changed or fresh.questions != current.questions:
+                self._write_snapshot(fresh)
+            self._update_gauges()
+            return True
+
+    def refresh_if_stale(self) -> bool:
+        current = self.get()
+        if (
+            current.source != "sheets"
+            or self.failures
+            or current.age >= self.refresh_interval
+        ):
+            return self.refresh()
+        revision = self._read_revision()
+        if revision is not None and revision != current.revision:
+            logger.info(f"📚 Knowledge sheet revision {current.revision} -> {revision}")
+            return self.refresh(revision)
+        return False
+
+    def status(self) -> Dict:
+        current = self.get()
+        self._update_gauges()
+        return {
+            "source": current.source,
+            "items": len(current.items),
+            "questions": len(current.questions),
+            "revision": current.revision,
+            "age_seconds": round(current.age, 1) if current.fetched_at else None,
+            "consecutive_failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+    def _read_revision(self) -> Optional[str]:
+        if not self._revision_readable:
+            return None
+        try:
+            return self.sheets_service.get_knowledge_revision()
+        except Exception as e:
+            metrics.increment("knowledge_base_revision_check_errors_total")
+            status = getattr(getattr(e, "resp", None), "status", None)
+            if status in (401, 403):
+                # Credentials without Drive metadata access: refresh on the interval
+                self._revision_readable = False
+                logger.warning(
+                    f"📚 Cannot read the knowledge sheet revision, refreshing "
+                    f"every {self.refresh_interval:.0f}s instead: {e}"
+                )
+            return None
+
+    def _read_snapshot(self) -> Optional[KnowledgeBase]:
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return KnowledgeBase(
+                data["items"],
+                data.get("revision"),
+                data["fetched_at"],
+                "snapshot",
+                data.get("questions"),
+            )
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"📚 Unreadable knowledge base snapshot: {e}")
+            return None
+
+    def _write_snapshot(self, knowledge_base: KnowledgeBase):
+        data = {
+            "revision": knowledge_base.revision,
+            "fetched_at": knowledge_base.fetched_at,
+            "items": knowledge_base.items,
+            "questions": knowledge_base.questions,
+        }
+        partial = f"{self.snapshot_path}.part"
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+            with open(partial, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(partial, self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"📚 Could not write the knowledge base snapshot: {e}")
+
+    def _update_gauges(self):
+        current = self._current
+        if current is None:
+            return
+        if current.fetched_at:
+            metrics.set_gauge("knowledge_base_age_seconds", current.age)
+        metrics.set_gauge("knowledge_base_items", len(current.items))
+        metrics.set_gauge("knowledge_base_refresh_failures", self.failures)
+
+    def _loop(self):
+        # The first pass runs right away: it fetches whatever load() did not
+        while not self._stop.is_set():
+            try:
+                self.refresh_if_stale()
+            except Exception as e:
+                logger.error(f"📚 Knowledge base refresh loop error: {e}")
+            self._update_gauges()
+            self._stop.wait(self.check_interval)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._loop, name="knowledge-base-refresh", daemon=True
+            )
+            self._thread.start()
+            logger.info(
+                f"📚 Knowledge base refresh started (revision check every "
+                f"{self.check_interval:.0f}s, full refresh every "
+                f"{self.refresh_interval:.0f}s)"
+            )
+
+    def stop(self):
+        self._stop.set()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_knowledge_base_cache() -> KnowledgeBaseCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = KnowledgeBaseCache(
+                    get_sheets_service(),
+                    SNAPSHOT_PATH,
+                    float(os.getenv("KNOWLEDGE_BASE_REFRESH_INTERVAL", "900")),
+                    float(os.getenv("KNOWLEDGE_BASE_CHECK_INTERVAL", "60")),
+                )
+    return _cache
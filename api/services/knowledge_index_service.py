@@ -0,0 +1,107 @@
+import math
+import heapq
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Tuple
+from api.services.phrase_library_service import fold_text
+
+# Words, and suffixes a zero-width non-joiner splits off, that say nothing about
+# which knowledge row is meant
+STOPWORDS = frozenset("""
+    و در به از که را با این ان برای یا تا هم می ای است هست بود شد کند کنم کنید
+    من تو او ما شما چه چی چیست چطور چگونه ایا یک هر اگر اگه ولی اما نیز باید میشه
+    ها های هایی ترین
+    the a an and or of to in on for is are be was what how do does can i you my
+    your we our it this that with at by from as me please
+    """.split())
+# Persian plural endings written without a zero-width non-joiner
+PLURAL_SUFFIXES = ("هایی", "های", "ها")
+QUESTION_WEIGHT = 2  # a word in the row's question counts this many times
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Search terms of a Persian or English text: letters folded the way the phrase
+    library folds them, digits made ASCII, stopwords dropped, plurals trimmed.
+    A zero-width non-joiner separates words (سلف‌سرویس matches سلف سرویس).
+    """
+    tokens, current = [], []
+    for char in fold_text((text or "").replace("\u200c", " ")) + " ":
+        category = unicodedata.category(char)
+        if category.startswith("L"):
+            current.append(char)
+        elif category == "Nd":
+            current.append(str(unicodedata.digit(char)))
+        elif category.startswith("M"):
+            continue  # diacritics
+        elif current:
+            tokens.append(_stem("".join(current)))
+            current = []
+    return [token for token in tokens if token not in STOPWORDS]
+
+
+def _stem(token: str) -> str:
+    for suffix in PLURAL_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[: -len(suffix)]
+    if token.isascii() and len(token) > 3 and token.endswith("s"):
+        return token[:-1]
+    return token
+
+
+class KnowledgeIndex:
+    """
+    BM25 over knowledge rows (question, answer, category) with an inverted
+    index, so a query only touches the rows that share a term with it.
+    """
+
+    def __init__(self, items: List[Dict[str, str]], k1: float = 1.2, b: float = 0.75):
+        self.items = items
+        self.k1 = k1
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        lengths = []
+        for doc, item in enumerate(items):
+            tokens = (
+                tokenize(item.get("question", "")) * QUESTION_WEIGHT
+                + tokenize(item.get("answer", ""))
+                + tokenize(item.get("category", ""))
+            )
+            lengths.append(len(tokens))
+            for term, frequency in Counter(tokens).items():
+                self.postings.setdefault(term, []).append((doc, frequency))
+
+        count = len(items)
+        average = sum(lengths) / count if count else 0.0
+        self.idf = {
+            term: math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+        # Per-row part of the BM25 denominator
+        self._norms = [
+            k1 * (1 - b + b * length / average) if average else k1 for length in lengths
+        ]
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        min_score: float = 0.0,
+        min_relative_score: float = 0.0,
+    ) -> List[Tuple[float, Dict[str, str]]]:
+        """
+        Up to k (score, row) pairs, best first. Rows scoring below min_score, or
+        below min_relative_score times the best score, are left out.
+        """
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc, frequency in self.postings[term]:
+                gain = idf * frequency * (self.k1 + 1) / (frequency + self._norms[doc])
+                scores[doc] = scores.get(doc, 0.0) + gain
+        if not scores:
+            return []
+        best = heapq.nlargest(k, scores.items(), key=lambda entry: entry[1])
+        cutoff = max(min_score, best[0][1] * min_relative_score)
+        return [(score, self.items[doc]) for doc, score in best if score >= cutoff]
@@ -0,0 +1,75 @@
+"""
+Compact lipsync encoding for clients that ask for it.
+
+Rhubarb writes a metadata block and one {"start", "end", "value"} dict per mouth
+cue. The compact form drops the metadata and stores the cues as parallel arrays:
+
+    {
+        "format": "compact",
+        "q": 10,              # time quantum in milliseconds
+        "v": "BGCB...",       # one mouth shape character per cue
+        "s": [0, 0, 0, ...],  # quanta between the previous cue's end and this start
+        "d": [6, 5, 7, ...],  # cue durations in quanta
+    }
+
+Rhubarb reports times in hundredths of a second, so the default 10 ms quantum
+is lossless for its output. Times are rounded on the absolute timeline before
+taking deltas, so rounding never accumulates drift along the clip.
+"""
+
+from typing import Any, Dict, Optional
+
+RHUBARB = "rhubarb"
+COMPACT = "compact"
+LIPSYNC_FORMATS = (RHUBARB, COMPACT)
+DEFAULT_QUANTUM_MS = 10
+
+
+def encode_compact(
+    lipsync: Optional[Dict[str, Any]], quantum_ms: int = DEFAULT_QUANTUM_MS
+) -> Optional[Dict[str, Any]]:
+    """Rhubarb JSON to the compact form; already-compact data is returned as is."""
+    if lipsync is None or lipsync.get("format") == COMPACT:
+        return lipsync
+    scale = 1000.0 / quantum_ms
+    cues = lipsync.get("mouthCues", [])
+    starts = [round(cue["start"] * scale) for cue in cues]
+    ends = [round(cue["end"] * scale) for cue in cues]
+    gaps = [start - end for start, end in zip(starts, [0] + ends)]
+    durations = [end - start for start, end in zip(starts, ends)]
+    return {
+        "format": COMPACT,
+        "q": quantum_ms,
+        "v": "".join(cue["value"][:1] or "X" for cue in cues),
+        "s": gaps,
+        "d": durations,
+    }
+
+
+def decode_compact(compact: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Compact form back to Rhubarb's {"mouthCues": [...]} (without metadata)."""
+    if compact is None or compact.get("format") != COMPACT:
+        return compact
+    seconds = compact["q"] / 1000.0
+    cues = []
+    position = 0
+    for value, gap, duration in zip(compact["v"], compact["s"], compact["d"]):
+        start = position + gap
+        position = start + duration
+        cues.append(
+            {
+                "start": round(start * seconds, 3),
+                "end": round(position * seconds, 3),
+                "value": value,
+            }
+        )
+    return {"mouthCues": cues}
+
+
+def encode_lipsync(
+    lipsync: Optional[Dict[str, Any]], lipsync_format: Optional[str]
+) -> Optional[Dict[str, Any]]:
+    """Lipsync in the format a client asked for; unknown formats get Rhubarb JSON."""
+    if lipsync_format == COMPACT:
+        return encode_compact(lipsync)
+    return lipsync
@@ -2,10 +2,98 @@ import subprocess
 import logging
 import os
 import stat
+import time
 
 logger = logging.getLogger(__name__)
 
 
+class StreamingWavDecoder:
+    """
+    Feeds mp3 bytes to ffmpeg as they arrive, so the WAV is ready moments after
+    the last chunk of a streamed TTS response instead of after a separate pass.
+
+    A decoder that breaks mid-stream never interrupts the download: close() just
+    reports False and the caller converts the finished mp3 the usual way.
+    """
+
+    def __init__(self, wav_path: str):
+        self.wav_path = wav_path
+        self.started_at = time.monotonic()
+        self.first_chunk_at = None
+        self.ready_at = None
+        self.failed = False
+        self.process = subprocess.Popen(
+            [
+                "ffmpeg",
+                "-y",
+                "-loglevel",
+                "error",
+                "-f",
+                "mp3",
+                "-i",
+                "pipe:0",
+                wav_path,
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+
+    def write(self, chunk: bytes):
+        if self.first_chunk_at is None:
+            self.first_chunk_at = time.monotonic()
+        if self.failed or not chunk:
+            return
+        try:
+            self.process.stdin.write(chunk)
+        except (BrokenPipeError, OSError) as e:
+            logger.warning(f"Streaming decode to {self.wav_path} broke: {e}")
+            self.failed = True
+
+    def close(self, timeout: float = 30) -> bool:
+        """Finish decoding; True when the WAV is complete."""
+        if self.failed or self.first_chunk_at is None:
+            self.abort()
+            return False
+        try:
+            _, stderr = self.process.communicate(timeout=timeout)
+        except (subprocess.TimeoutExpired, BrokenPipeError, OSError) as e:
+            logger.warning(f"Streaming decode to {self.wav_path} did not finish: {e}")
+            self.abort()
+            return False
+        if self.process.returncode != 0:
+            logger.warning(
+                f"Streaming decode failed ({self.process.returncode}): "
+                f"{(stderr or b'').decode(errors='replace').strip()[:300]}"
+            )
+            self.abort()
+            return False
+        self.ready_at = time.monotonic()
+        return True
+
+    def abort(self):
+        if self.process.poll() is None:
+            self.process.kill()
+        try:
+            self.process.communicate(timeout=5)
+        except Exception:
+            pass
+        if os.path.exists(self.wav_path):
+            os.remove(self.wav_path)
+
+    @property
+    def first_byte_seconds(self):
+        if self.first_chunk_at is None:
+            return None
+        return self.first_chunk_at - self.started_at
+
+    @property
+    def first_byte_to_ready_seconds(self):
+        if self.first_chunk_at is None or self.ready_at is None:
+            return None
+        return self.ready_at - self.first_chunk_at
+
+
 class LipSyncService:
     @staticmethod
     def mp3_to_wav(mp3_path: str, wav_path: str):
@@ -20,6 +108,12 @@ class LipSyncService:
             logger.error("FFmpeg not found. Please install FFmpeg.")
             raise
 
+    @staticmethod
+    def mp3_stream_to_wav(wav_path: str) -> StreamingWavDecoder:
+        """Start an ffmpeg decoder that takes mp3 chunks through write()."""
+        logger.info(f"Starting streaming decode to {wav_path}")
+        return StreamingWavDecoder(wav_path)
+
     @staticmethod
     def wav_to_lipsync_json(wav_path: str, json_path: str):
         try:
@@ -0,0 +1,159 @@
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+def _metric_key(name: str, labels: Optional[Dict[str, str]] = None) -> str:
+    if not labels:
+        return name
+    rendered = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    return f"{name}{{{rendered}}}"
+
+
+class RollingWindow:
+    """Fixed-size window of recent samples used for latency percentiles."""
+
+    def __init__(self, maxlen: int = 200):
+        self._samples = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def add(self, value: float):
+        with self._lock:
+            self._samples.append(value)
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the q-th quantile (0..1) of the window, or None when empty."""
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+        return ordered[index]
+
+    def mean(self) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            return sum(self._samples) / len(self._samples)
+
+
+class MetricsService:
+    """Process-local counters, gauges and latency summaries."""
+
+    def __init__(self, window_size: int = 500):
+        self._lock = threading.Lock()
+        self._window_size = window_size
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._summaries: Dict[str, dict] = {}
+
+    def increment(
+        self, name: str, value: float = 1.0, labels: Optional[Dict[str, str]] = None
+    ):
+        key = _metric_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set_gauge(
+        self, name: str, value: float, labels: Optional[Dict[str, str]] = None
+    ):
+        key = _metric_key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
+        key = _metric_key(name, labels)
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = {
+                    "count": 0,
+                    "sum": 0.0,
+                    "window": RollingWindow(self._window_size),
+                }
+                self._summaries[key] = summary
+            summary["count"] += 1
+            summary["sum"] += value
+        summary["window"].add(value)
+
+    def get_counter(self, name: str, labels: Optional[Dict[str, str]] = None) -> float:
+        with self._lock:
+            return self._counters.get(_metric_key(name, labels), 0.0)
+
+    def get_percentile(
+        self, name: str, q: float, labels: Optional[Dict[str, str]] = None
+    ) -> Optional[float]:
+        """Recent q-percentile of a summary; None before anything was observed."""
+        with self._lock:
+            summary = self._summaries.get(_metric_key(name, labels))
+        return summary["window"].percentile(q) if summary else None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            summaries = list(self._summaries.items())
+
+        rendered_summaries = {}
+        for key, summary in summaries:
+            window = summary["window"]
+            rendered_summaries[key] = {
+                "count": summary["count"],
+                "sum": summary["sum"],
+                "p50": window.percentile(0.5),
+                "p90": window.percentile(0.9),
+                "p99": window.percentile(0.99),
+            }
+
+        return {
+            "counters": counters,
+            "gauges": gauges,
+            "summaries": rendered_summaries,
+        }
+
+
+# Shared registry for the whole process
+metrics = MetricsService()
+
+
+class StageTimer:
+    """Accumulates wall time per pipeline stage for one request.
+
+    Stages may run on several threads (messages are processed in parallel), so the
+    per-stage totals can exceed the request's wall time.
+    """
+
+    def __init__(self, metric_name: str = "chat_stage_seconds"):
+        self.metric_name = metric_name
+        self._lock = threading.Lock()
+        self._durations: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(name, time.monotonic() - started)
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            self._durations[name] = self._durations.get(name, 0.0) + seconds
+        metrics.observe(self.metric_name, seconds, {"stage": name})
+
+    def durations(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._durations)
+
+    def server_timing_header(self) -> str:
+        """Render the stages as an HTTP Server-Timing header value (milliseconds)."""
+        return ", ".join(
+            f"{name};dur={seconds * 1000:.1f}"
+            for name, seconds in self.durations().items()
+        )
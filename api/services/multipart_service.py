@@ -0,0 +1,69 @@
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+MULTIPART_MIXED = "multipart/mixed"
+
+Part = Tuple[Dict[str, str], bytes]
+
+
+def accepts_multipart(accept: Optional[str]) -> bool:
+    """True when the Accept header lists multipart/mixed (and does not refuse it)."""
+    for media_range in (accept or "").split(","):
+        media_type, *params = [value.strip() for value in media_range.split(";")]
+        if media_type.lower() == MULTIPART_MIXED:
+            return not any(
+                param.replace(" ", "") in ("q=0", "q=0.0") for param in params
+            )
+    return False
+
+
+def build_multipart(parts: List[Part]) -> Tuple[bytes, str]:
+    """Body and Content-Type of a multipart/mixed message made of (headers, body) parts."""
+    boundary = uuid.uuid4().hex
+    chunks = []
+    for headers, body in parts:
+        chunks.append(f"--{boundary}\r\n".encode())
+        headers = {**headers, "Content-Length": str(len(body))}
+        for name, value in headers.items():
+            chunks.append(f"{name}: {value}\r\n".encode())
+        chunks.append(b"\r\n")
+        chunks.append(body)
+        chunks.append(b"\r\n")
+    chunks.append(f"--{boundary}--\r\n".encode())
+    return b"".join(chunks), f'{MULTIPART_MIXED}; boundary="{boundary}"'
+
+
+def parse_multipart(body: bytes, content_type: str) -> List[Part]:
+    """Split a multipart/mixed body back into (headers, body) parts.
+
+    Parts are read by their Content-Length, so binary audio never has to be
+    scanned for the boundary.
+    """
+    boundary = None
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.strip().partition("=")
+        if name.lower() == "boundary":
+            boundary = value.strip('"')
+    if not boundary:
+        raise ValueError(f"No boundary in Content-Type: {content_type}")
+
+    delimiter = f"--{boundary}".encode()
+    parts = []
+    position = body.index(delimiter)
+    while True:
+        position += len(delimiter)
+        if body[position : position + 2] == b"--":
+            return parts
+        header_end = body.index(b"\r\n\r\n", position)
+        headers = {}
+        for line in body[position:header_end].decode().split("\r\n"):
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip()] = value.strip()
+        start = header_end + 4
+        if "Content-Length" in headers:
+            end = start + int(headers["Content-Length"])
+        else:
+            end = body.index(b"\r\n" + delimiter, start)
+        parts.append((headers, body[start:end]))
+        position = body.index(delimiter, end)
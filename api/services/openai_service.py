@@ -1,23 +1,236 @@
 import os
+import json
+import math
+import time
+import codecs
+import threading
 import requests
 import logging
+from collections import deque
+from typing import Callable, Optional
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-import socket
+from urllib.parse import urlparse
 from hashlib import md5  # برای hash message + session
+from api.services.config_service import env_flag
+from api.services.metrics_service import metrics, RollingWindow
+from api.services.dns_service import dns_resolver
+from api.services.rate_limit_service import get_limiter, retry_statuses
 
 logger = logging.getLogger(__name__)
 
 # Cache dict for duplicate prevention (session-based)
 _cache = {}  # key: session_id + message_hash, value: normalized response
 
+# Request hedging state, shared by all OpenAIService instances (one is created per request)
+_latency_window = RollingWindow(maxlen=200)
+_hedge_decisions = deque(maxlen=100)  # True for each request that fired a hedge
+_hedge_lock = threading.Lock()
+# Primaries get a pool wider than the server's worker threads, so they never queue
+# and queueing never counts against the hedge delay; only hedges are bounded
+_primary_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("CHAT_HEDGE_PRIMARY_WORKERS", "64")),
+    thread_name_prefix="chat-primary",
+)
+_hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="chat-hedge")
+
+
+def _hedge_threshold(
+    percentile: float, min_samples: int, default_delay: float
+) -> float:
+    """Delay before firing a hedge: the rolling latency percentile once warmed up."""
+    if _latency_window.count() < min_samples:
+        return default_delay
+    return max(_latency_window.percentile(percentile) or default_delay, 0.05)
+
+
+def _record_hedge_decision(
+    hedged: bool, max_rate: float, acquire: Optional[Callable[[], bool]] = None
+) -> bool:
+    """
+    Record one request; when hedging is requested, only allow it under the rate
+    cap and, if acquire is given, only once acquire() got the hedge its slot. A
+    hedge that is never sent does not use up the budget.
+    """
+    with _hedge_lock:
+        if not _hedge_decisions and max_rate > 0:
+            # Start from a window at the cap, so a cold process may hedge right away
+            _hedge_decisions.extend([False] * (math.ceil(1 / max_rate) - 1))
+        if hedged:
+            projected = (sum(_hedge_decisions) + 1) / (len(_hedge_decisions) + 1)
+            hedged = projected <= max_rate and (acquire is None or acquire())
+        _hedge_decisions.append(hedged)
+        rate = sum(_hedge_decisions) / len(_hedge_decisions)
+    metrics.set_gauge("chat_hedge_rate", rate)
+    return hedged
+
+
+def _discard_response(future):
+    """Release the connection held by a hedge loser once it finishes."""
+    try:
+        future.result().close()
+    except Exception:
+        pass
+
+
+def normalize_chat_message(item) -> dict:
+    """Normalize one item of the chat service's ``messages`` array."""
+    if isinstance(item, dict):
+        return {
+            "text": item.get("text", ""),
+            "facialExpression": item.get("facialExpression", "default"),
+            "animation": item.get("animation", "StandingIdle"),
+        }
+    return {
+        "text": str(item),
+        "facialExpression": "default",
+        "animation": "StandingIdle",
+    }
+
+
+def normalize_chat_messages(result) -> list:
+    """Normalize a chat service response body to a list of message dicts."""
+    payload_messages = result.get("messages") if isinstance(result, dict) else None
+
+    if isinstance(payload_messages, dict) and "text" in payload_messages:
+        return [normalize_chat_message(payload_messages)]
+    if isinstance(payload_messages, list):
+        return [normalize_chat_message(item) for item in payload_messages]
+
+    fallback = payload_messages if isinstance(payload_messages, dict) else {}
+    return [
+        {
+            "text": str(fallback.get("text", str(result))),
+            "facialExpression": "default",
+            "animation": "StandingIdle",
+        }
+    ]
+
+
+def service_unavailable_message(language: str) -> dict:
+    """Special message that makes /chat answer with the error audio and lipsync."""
+    return {
+        "text": "ERROR_SERVICE_UNAVAILABLE",
+        "facialExpression": "sad",
+        "animation": "Sad",
+        "is_error": True,
+        "language": language,
+    }
+
+
+class MessagesStreamParser:
+    """Incrementally extract items of the top-level ``messages`` array from JSON text.
+
+    ``feed`` returns every array item whose closing token has arrived, so callers
+    can act on the first message while the rest of the body is still in flight.
+    Items of any JSON type are returned, in order, so they line up with
+    ``normalize_chat_messages`` of the whole body.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False  # next string at depth 1 is a key, not a value
+        self._last_key = None
+        self._in_messages = False
+        # Text of the key or item being read: its pieces from earlier chunks, and
+        # where it starts in the current one
+        self._capture = None  # "key", "item" or "scalar"
+        self._pieces = []
+        self._capture_from = 0
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    def _start(self, kind: str, offset: int):
+        self._capture = kind
+        self._pieces = []
+        self._capture_from = offset
+
+    def _finish(self, chunk: str, end: int) -> str:
+        self._pieces.append(chunk[self._capture_from : end])
+        self._capture = None
+        return "".join(self._pieces)
+
+    def feed(self, chunk: str) -> list:
+        items = []
+        self._chunks.append(chunk)
+        for offset, ch in enumerate(chunk):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._capture == "key":
+                        self._last_key = json.loads(self._finish(chunk, offset + 1))
+                        self._expect_key = False
+                    elif self._capture == "item" and self._depth == 2:
+                        items.append(json.loads(self._finish(chunk, offset + 1)))
+                continue
+
+            if self._capture == "scalar":
+                if ch not in ",]" and not ch.isspace():
+                    continue
+                # Numbers, true, false and null end at the next separator
+                items.append(json.loads(self._finish(chunk, offset)))
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._start("key", offset)
+                elif self._in_messages and self._depth == 2:
+                    self._start("item", offset)
+            elif ch in "{[":
+                if self._in_messages and self._depth == 2:
+                    self._start("item", offset)
+                elif (
+                    ch == "["
+                    and self._depth == 1
+                    and not self._expect_key
+                    and self._last_key == "messages"
+                ):
+                    self._in_messages = True
+                self._depth += 1
+                if self._depth == 1:
+                    self._expect_key = ch == "{"
+            elif ch in "}]":
+                self._depth -= 1
+                if self._in_messages and self._depth == 2 and self._capture == "item":
+                    items.append(json.loads(self._finish(chunk, offset + 1)))
+                elif self._in_messages and self._depth == 1:
+                    self._in_messages = False
+            elif self._depth == 1 and ch == ",":
+                self._expect_key = True
+            elif (
+                self._in_messages
+                and self._depth == 2
+                and ch != ","
+                and not ch.isspace()
+            ):
+                self._start("scalar", offset)
+
+        if self._capture is not None:
+            self._pieces.append(chunk[self._capture_from :])
+            self._capture_from = 0
+        return items
+
 
 class OpenAIService:
     def __init__(self):
         self.url = os.getenv("EXTERNAL_CHAT_SERVICE_URL")
         self.session = requests.Session()
+        self.limiter = get_limiter("chat")
+        # 429s are left to the rate limiter, unless it is off
         retries = Retry(
-            total=3, backoff_factor=2.0, status_forcelist=[429, 500, 502, 503, 504]
+            total=3,
+            backoff_factor=2.0,
+            status_forcelist=retry_statuses(self.limiter),
         )
         self.session.mount("https://", HTTPAdapter(max_retries=retries))
         self.session.headers.update(
@@ -43,6 +256,119 @@ class OpenAIService:
             self.session.proxies.update(proxies)
             logger.info(f"Proxies set: {proxies}")
 
+        # Optional request hedging against the external service's cold-start tails
+        self.hedging_enabled = env_flag("CHAT_HEDGING_ENABLED")
+        self.hedge_percentile = float(os.getenv("CHAT_HEDGE_PERCENTILE", "0.9"))
+        self.hedge_max_rate = float(os.getenv("CHAT_HEDGE_MAX_RATE", "0.1"))
+        self.hedge_min_samples = int(os.getenv("CHAT_HEDGE_MIN_SAMPLES", "20"))
+        self.hedge_default_delay = float(os.getenv("CHAT_HEDGE_DEFAULT_DELAY", "5.0"))
+
+    def _post_chat(
+        self, payload: dict, timeout: float, stream: bool = False, limited: bool = True
+    ):
+        """POST to the chat service; limited=False when the caller holds the rate-limit slot."""
+        if limited:
+            with self.limiter.limit(timeout):
+                return self._post_chat(payload, timeout, stream, limited=False)
+        started = time.monotonic()
+        response = self.session.post(
+            self.url, json=payload, timeout=timeout, verify=False, stream=stream
+        )
+        self.limiter.observe_response(response)
+        if response.ok and not stream:
+            elapsed = time.monotonic() - started
+            _latency_window.add(elapsed)
+            metrics.observe("chat_service_response_seconds", elapsed)
+        return response
+
+    def probe(self, timeout: float) -> requests.Response:
+        """
+        HEAD the chat endpoint with this client's headers, proxies and TLS
+        settings. Sent outside the rate limiter and without the session's
+        retries, so one health check stays one request bounded by timeout.
+        """
+        with requests.Session() as session:
+            session.headers.update(self.session.headers)
+            session.proxies.update(self.session.proxies)
+            return session.head(
+                self.url, timeout=timeout, verify=False, allow_redirects=False
+            )
+
+    def _post_hedge(self, payload: dict, timeout: float):
+        with self.limiter.held():
+            return self._post_chat(payload, timeout, limited=False)
+
+    def _post_with_hedge(self, payload: dict, timeout: float):
+        """POST to the chat service, firing a second identical request if the first is slow.
+
+        Whichever attempt answers first with a successful status wins; an error
+        status only wins when no other attempt is left. requests cannot abort a call
+        that is already in flight, so the loser is cancelled if it has not started
+        yet and otherwise has its response discarded when it completes.
+        """
+        metrics.increment("chat_requests_total")
+        if not self.hedging_enabled:
+            return self._post_chat(payload, timeout)
+
+        threshold = _hedge_threshold(
+            self.hedge_percentile, self.hedge_min_samples, self.hedge_default_delay
+        )
+        metrics.set_gauge("chat_hedge_threshold_seconds", threshold)
+
+        primary = _primary_executor.submit(self._post_chat, payload, timeout)
+        done, _ = wait([primary], timeout=threshold)
+        if done:
+            _record_hedge_decision(False, self.hedge_max_rate)
+            return primary.result()
+
+        rate_limited = []
+
+        def acquire_slot() -> bool:
+            # A hedge only goes out on spare quota; it never queues behind real requests
+            if self.limiter.try_acquire():
+                return True
+            rate_limited.append(True)
+            return False
+
+        if not _record_hedge_decision(True, self.hedge_max_rate, acquire_slot):
+            if rate_limited:
+                logger.info("⏳ Chat service rate limit reached, not hedging")
+                metrics.increment("chat_hedges_rate_limited_total")
+            else:
+                logger.info("⏳ Hedge budget exhausted, waiting on primary request")
+            return primary.result()
+
+        logger.info(f"🏁 No response after {threshold:.2f}s, sending hedged request")
+        metrics.increment("chat_hedged_requests_total")
+        hedge = _hedge_executor.submit(self._post_hedge, payload, timeout)
+        pending = {primary, hedge}
+        last_error, failed_response = None, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except requests.exceptions.RequestException as e:
+                    last_error = e
+                    continue
+                if not response.ok and (pending or len(done) > 1):
+                    # A fast 5xx must not beat an attempt that may still succeed
+                    if failed_response is not None:
+                        failed_response.close()
+                    failed_response = response
+                    continue
+                if failed_response is not None and failed_response is not response:
+                    failed_response.close()
+                for loser in pending | (done - {future}):
+                    if not loser.cancel():
+                        loser.add_done_callback(_discard_response)
+                if future is hedge:
+                    metrics.increment("chat_hedge_wins_total")
+                return response
+        if failed_response is not None:
+            return failed_response
+        raise last_error
+
     def get_assistant_response(
         self, user_message: str, session_id: str, language: str = "fa"
     ):
@@ -82,12 +408,9 @@ class OpenAIService:
             try:
                 timeout = 30
 
-                # Log DNS resolution
-                try:
-                    ip = socket.gethostbyname("elevenlab-test.vercel.app")
-                    logger.info(f"🌐 DNS Resolution: elevenlab-test.vercel.app -> {ip}")
-                except Exception as dns_error:
-                    logger.error(f"❌ DNS Resolution failed: {dns_error}")
+                # Log cached DNS resolution (never blocks the request path)
+                host = urlparse(self.url or "").hostname
+                logger.info(f"🌐 DNS Cache: {host} -> {dns_resolver.peek(host)}")
 
                 logger.info(f"📡 Making HTTP POST request to: {self.url}")
                 logger.info(f"⏱️  Timeout: {timeout} seconds")
@@ -99,9 +422,7 @@ class OpenAIService:
                 logger.info(f"   - Payload Size: {len(str(payload))} characters")
                 logger.info(f"   - Verify SSL: False")
 
-                response = self.session.post(
-                    self.url, json=payload, timeout=timeout, verify=False
-                )
+                response = self._post_with_hedge(payload, timeout)
 
                 # Log response details
                 logger.info(f"📨 Response Received:")
@@ -142,60 +463,9 @@ class OpenAIService:
                 )
 
                 # Normalize to List[Dict]
-                payload_messages = result.get("messages")
                 logger.info(f"🔍 Processing Messages:")
-                logger.info(f"   - Messages Type: {type(payload_messages)}")
-                logger.info(f"   - Messages Content: {payload_messages}")
-
-                if isinstance(payload_messages, dict) and "text" in payload_messages:
-                    logger.info("📝 Processing single message dict")
-                    normalized = [
-                        {
-                            "text": payload_messages.get("text", ""),
-                            "facialExpression": payload_messages.get(
-                                "facialExpression", "default"
-                            ),
-                            "animation": payload_messages.get(
-                                "animation", "StandingIdle"
-                            ),
-                        }
-                    ]
-                elif isinstance(payload_messages, list):
-                    logger.info(
-                        f"📝 Processing message list with {len(payload_messages)} items"
-                    )
-                    normalized = []
-                    for i, item in enumerate(payload_messages):
-                        logger.info(f"   - Processing item {i}: {type(item)} = {item}")
-                        if isinstance(item, dict):
-                            normalized.append(
-                                {
-                                    "text": item.get("text", ""),
-                                    "facialExpression": item.get(
-                                        "facialExpression", "default"
-                                    ),
-                                    "animation": item.get("animation", "StandingIdle"),
-                                }
-                            )
-                        else:
-                            normalized.append(
-                                {
-                                    "text": str(item),
-                                    "facialExpression": "default",
-                                    "animation": "StandingIdle",
-                                }
-                            )
-                else:
-                    logger.info("📝 Processing fallback case")
-                    normalized = [
-                        {
-                            "text": str(
-                                result.get("messages", {}).get("text", str(result))
-                            ),
-                            "facialExpression": "default",
-                            "animation": "StandingIdle",
-                        }
-                    ]
+                logger.info(f"   - Messages Content: {result.get('messages')}")
+                normalized = normalize_chat_messages(result)
 
                 logger.info(f"✅ Normalization Complete:")
                 logger.info(f"   - Normalized Messages Count: {len(normalized)}")
@@ -220,15 +490,7 @@ class OpenAIService:
                     logger.error("💥 ALL ATTEMPTS FAILED - TIMEOUT")
                     logger.error("=" * 80)
                     # Return special error response that will trigger error audio and lipsync
-                    return [
-                        {
-                            "text": "ERROR_SERVICE_UNAVAILABLE",
-                            "facialExpression": "sad",
-                            "animation": "Sad",
-                            "is_error": True,
-                            "language": language,
-                        }
-                    ]
+                    return [service_unavailable_message(language)]
                 else:
                     logger.info(f"🔄 Retrying in next attempt...")
 
@@ -245,14 +507,101 @@ class OpenAIService:
                     logger.error(f"❌ Final Error: {e}")
                     logger.error(f"❌ Error Type: {type(e).__name__}")
                     # Return special error response that will trigger error audio and lipsync
-                    return [
-                        {
-                            "text": "ERROR_SERVICE_UNAVAILABLE",
-                            "facialExpression": "sad",
-                            "animation": "Sad",
-                            "is_error": True,
-                            "language": language,
-                        }
-                    ]
+                    return [service_unavailable_message(language)]
                 else:
                     logger.info(f"🔄 Retrying in next attempt...")
+
+    def iter_assistant_response(
+        self, user_message: str, session_id: str, language: str = "fa"
+    ):
+        """Yield normalized messages as soon as each one is complete in the response body.
+
+        Same contract as ``get_assistant_response``, but the body is read in chunks so
+        the media pipeline can start on the first message while the chat service is
+        still streaming the rest of its ``messages`` array.
+
+        Streamed requests are never hedged: a second attempt could only be compared
+        on its headers, and messages already handed to the media pipeline cannot be
+        taken back. They count in chat_hedge_bypassed_total when hedging is on.
+        """
+        cache_key = md5(f"{session_id}_{user_message}".encode()).hexdigest()
+        if cache_key in _cache:
+            logger.info(f"Cache hit for key {cache_key} - returning cached response")
+            yield from _cache[cache_key]
+            return
+
+        payload = {
+            "message": user_message,
+            "session_id": session_id,
+            "language": language,
+        }
+        timeout = 30
+
+        for attempt in range(3):
+            logger.info(f"🔄 Streaming attempt {attempt + 1}/3 to {self.url}")
+            metrics.increment("chat_requests_total")
+            if self.hedging_enabled:
+                metrics.increment("chat_hedge_bypassed_total")
+            emitted = []
+            try:
+                started = time.monotonic()
+                # The slot is held until the whole body has been read
+                with self.limiter.limit(timeout), self._post_chat(
+                    payload, timeout, stream=True, limited=False
+                ) as response:
+                    response.raise_for_status()
+                    parser = MessagesStreamParser()
+                    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+                    for chunk in response.iter_content(chunk_size=1024):
+                        for item in parser.feed(decoder.decode(chunk)):
+                            message = normalize_chat_message(item)
+                            if not emitted:
+                                metrics.observe(
+                                    "chat_service_first_message_seconds",
+                                    time.monotonic() - started,
+                                )
+                            emitted.append(message)
+                            logger.info(
+                                f"📨 Streamed message {len(emitted)}: {message}"
+                            )
+                            yield message
+                    parser.feed(decoder.decode(b"", final=True))
+
+                try:
+                    normalized = normalize_chat_messages(json.loads(parser.text))
+                except json.JSONDecodeError as e:
+                    logger.error(f"❌ JSON Parsing Failed: {e}")
+                    if emitted:
+                        _cache[cache_key] = emitted
+                        return
+                    yield {
+                        "text": "خطا: پاسخ سرور نامعتبر است.",
+                        "facialExpression": "default",
+                        "animation": "StandingIdle",
+                    }
+                    return
+
+                # Body shapes the incremental parser does not cover (a single message
+                # dict, a fallback body) are only known once the whole body is parsed
+                for message in normalized[len(emitted) :]:
+                    emitted.append(message)
+                    yield message
+
+                elapsed = time.monotonic() - started
+                _latency_window.add(elapsed)
+                metrics.observe("chat_service_response_seconds", elapsed)
+                _cache[cache_key] = emitted
+                logger.info(f"🎉 Streamed {len(emitted)} messages in {elapsed:.2f}s")
+                return
+
+            except requests.exceptions.RequestException as e:
+                logger.warning(
+                    f"❌ Streaming attempt {attempt + 1} failed: {type(e).__name__}: {e}"
+                )
+                if emitted:
+                    # Messages already handed to the pipeline cannot be taken back
+                    logger.error("💥 Stream broke after partial response, stopping")
+                    return
+                if attempt == 2:
+                    logger.error("💥 ALL STREAMING ATTEMPTS FAILED")
+                    yield service_unavailable_message(language)
@@ -0,0 +1,216 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+import unicodedata
+from typing import Dict, List, Optional
+from api.services.file_service import FileService
+from api.services.metrics_service import metrics
+
+logger = logging.getLogger(__name__)
+
+PHRASES_DIR = os.getenv("PHRASE_LIBRARY_DIR", os.path.join("audios", "phrases"))
+SOURCE_FILE = "phrases.json"
+MANIFEST_FILE = "manifest.json"
+
+# Arabic code points the chat service sometimes emits in place of Persian ones
+_CHAR_MAP = str.maketrans(
+    {
+        "ي": "ی",
+        "ى": "ی",
+        "ك": "ک",
+        "ة": "ه",
+        "ۀ": "ه",
+        "أ": "ا",
+        "إ": "ا",
+        "آ": "ا",
+        "ـ": None,  # tatweel
+        "‌": None,  # zero-width non-joiner
+        "‏": None,
+        "‎": None,
+    }
+)
+
+
+def fold_text(text: str) -> str:
+    """NFKC-normalized, lowercased text with Arabic letter variants made Persian."""
+    return unicodedata.normalize("NFKC", text or "").translate(_CHAR_MAP).lower()
+
+
+def normalize_phrase(text: str) -> str:
+    """
+    Matching key for a sentence: case, digits, Arabic/Persian letter variants,
+    diacritics, punctuation, emoji and all spacing are ignored.
+    """
+    text = fold_text(text)
+    kept = []
+    for char in text:
+        category = unicodedata.category(char)
+        if category.startswith(("P", "S", "Z", "C", "M")):
+            continue
+        if category == "Nd":
+            char = str(unicodedata.digit(char))
+        kept.append(char)
+    return "".join(kept)
+
+
+def phrase_key(text: str, language: str) -> str:
+    digest = hashlib.md5(normalize_phrase(text).encode("utf-8")).hexdigest()[:12]
+    return f"{language}_{digest}"
+
+
+class Phrase:
+    """One pre-synthesized sentence; audio and lipsync are read once, then kept."""
+
+    served_by = "phrase_library"
+
+    def __init__(self, directory: str, entry: dict):
+        self.text = entry["text"]
+        self.language = entry["language"]
+        self.provider = entry.get("provider")
+        self.audio_path = os.path.join(directory, entry["audio"])
+        self.lipsync_path = os.path.join(directory, entry["lipsync"])
+        self._audio = None
+        self._audio_bytes = None
+        self._lipsync = None
+
+    def load(self):
+        if self._audio is None:
+            self._lipsync = FileService.read_json_transcript(self.lipsync_path)
+            self._audio = FileService.audio_file_to_base64(self.audio_path)
+        return self._audio, self._lipsync
+
+    def load_bytes(self):
+        """Like load(), with the raw mp3 instead of base64."""
+        if self._audio_bytes is None:
+            self._lipsync = FileService.read_json_transcript(self.lipsync_path)
+            self._audio_bytes = FileService.audio_file_to_bytes(self.audio_path)
+        return self._audio_bytes, self._lipsync
+
+
+class PhraseLibrary:
+    """Lookup of built phrases by normalized text, per language."""
+
+    def __init__(self, directory: str = PHRASES_DIR):
+        self.directory = directory
+        self.phrases: Dict[str, Dict[str, Phrase]] = {}
+        manifest_path = os.path.join(directory, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            logger.info(f"No phrase library manifest at {manifest_path}")
+            return
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        for entry in manifest.get("phrases", []):
+            phrase = Phrase(directory, entry)
+            if os.path.exists(phrase.audio_path) and os.path.exists(
+                phrase.lipsync_path
+            ):
+                self.phrases.setdefault(phrase.language, {})[
+                    normalize_phrase(phrase.text)
+                ] = phrase
+            else:
+                logger.warning(f"Phrase library files missing for: {phrase.text}")
+        logger.info(
+            f"Phrase library loaded: "
+            f"{ {language: len(p) for language, p in self.phrases.items()} }"
+        )
+
+    def __len__(self):
+        return sum(len(phrases) for phrases in self.phrases.values())
+
+    def lookup(self, text: str, language: str, record: bool = True) -> Optional[Phrase]:
+        if not self.phrases:
+            return None
+        language = "en" if (language or "").lower().startswith("en") else "fa"
+        phrase = self.phrases.get(language, {}).get(normalize_phrase(text))
+        if record:
+            metrics.increment(
+                "phrase_library_lookups_total",
+                labels={"language": language, "hit": "true" if phrase else "false"},
+            )
+        return phrase
+
+
+_library = None
+_library_lock = threading.Lock()
+
+
+def get_phrase_library() -> PhraseLibrary:
+    global _library
+    if _library is None:
+        with _library_lock:
+            if _library is None:
+                _library = PhraseLibrary()
+    return _library
+
+
+def build_library(
+    sources: Dict[str, List[str]],
+    tts_router,
+    lipsync_service,
+    directory: str = PHRASES_DIR,
+    force: bool = False,
+) -> dict:
+    """
+    Synthesize and lip-sync every source phrase into directory and write the
+    manifest. Phrases already built from the same normalized text are kept
+    unless force is set.
+    """
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    existing = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            existing = {entry["key"]: entry for entry in json.load(f)["phrases"]}
+
+    # Languages not being built keep their entries as they are
+    entries = [entry for entry in existing.values() if entry["language"] not in sources]
+    built, failed = 0, []
+    for language, texts in sources.items():
+        os.makedirs(os.path.join(directory, language), exist_ok=True)
+        for text in texts:
+            key = phrase_key(text, language)
+            previous = None if force else existing.get(key)
+            if previous and all(
+                os.path.exists(os.path.join(directory, previous[name]))
+                for name in ("audio", "lipsync")
+            ):
+                entries.append({**previous, "text": text})
+                continue
+
+            # Manifest paths use "/" so a library built on Windows loads anywhere
+            audio = f"{language}/{key}.mp3"
+            lipsync = f"{language}/{key}.json"
+            wav_path = os.path.join(directory, language, f"{key}.wav")
+            try:
+                provider = tts_router.synthesize(
+                    text, os.path.join(directory, audio), language
+                )
+                lipsync_service.mp3_to_wav(os.path.join(directory, audio), wav_path)
+                lipsync_service.wav_to_lipsync_json(
+                    wav_path, os.path.join(directory, lipsync)
+                )
+            except Exception as e:
+                logger.error(f"Failed to build phrase '{text}': {e}")
+                failed.append(text)
+                continue
+            finally:
+                if os.path.exists(wav_path):
+                    os.remove(wav_path)
+            entries.append(
+                {
+                    "key": key,
+                    "language": language,
+                    "text": text,
+                    "audio": audio,
+                    "lipsync": lipsync,
+                    "provider": provider,
+                    "built_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                }
+            )
+            built += 1
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"phrases": entries}, f, indent=2, ensure_ascii=False)
+    return {"built": built, "kept": len(entries) - built, "failed": failed}
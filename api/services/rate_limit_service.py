@@ -0,0 +1,219 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import requests
+from api.services.metrics_service import metrics
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = ("chat", "extract_info", "avashow", "elevenlabs")
+
+
+class RateLimitExceeded(requests.exceptions.RequestException):
+    """No slot freed up for a provider before the caller's deadline.
+
+    It is a RequestException so the services' existing retry and fallback paths
+    treat it like any other failed call.
+    """
+
+    def __init__(self, provider: str, waited: float):
+        super().__init__(f"Rate limit for {provider} not available after {waited:.2f}s")
+        self.provider = provider
+        self.waited = waited
+
+
+class ProviderLimiter:
+    """
+    Token bucket plus concurrency cap for one external provider.
+
+    Callers queue in arrival order and wait at most until their deadline (the
+    call's timeout, capped by max_wait). A 429 from the provider empties the
+    bucket and holds every caller until its Retry-After has passed, instead of
+    each thread sleeping through its own backoff; a Retry-After longer than
+    max_wait is still waited out within the call's timeout. A rate or concurrency
+    of 0 means unlimited; with both at 0 the limiter is off and ignores 429s,
+    which are then retried per request as before (see retry_statuses).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float = 0.0,
+        burst: Optional[float] = None,
+        max_concurrency: int = 0,
+        max_wait: float = 5.0,
+        default_backoff: float = 2.0,
+    ):
+        self.name = name
+        self.rate = rate
+        self.burst = burst if burst else max(1.0, rate)
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+        self.default_backoff = default_backoff
+        self.tokens = self.burst
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._labels = {"provider": name}
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0 or self.max_concurrency > 0
+
+    def _refill(self, now: float):
+        if self.rate > 0:
+            self.tokens = min(
+                self.burst, self.tokens + (now - self._updated) * self.rate
+            )
+        self._updated = now
+
+    def _can_grant(self, now: float) -> bool:
+        return (
+            now >= self.blocked_until
+            and (self.rate <= 0 or self.tokens >= 1)
+            and (self.max_concurrency <= 0 or self.in_flight < self.max_concurrency)
+        )
+
+    def _grant(self):
+        if self.rate > 0:
+            self.tokens -= 1
+        self.in_flight += 1
+        metrics.set_gauge("rate_limit_in_flight", self.in_flight, self._labels)
+
+    def _seconds_until_token(self, now: float) -> Optional[float]:
+        """How long until a token or the 429 block frees up; None if waiting on a slot."""
+        waits = []
+        if now < self.blocked_until:
+            waits.append(self.blocked_until - now)
+        if self.rate > 0 and self.tokens < 1:
+            waits.append((1 - self.tokens) / self.rate)
+        return max(waits) if waits else None
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """Wait in line for a slot; returns the seconds waited."""
+        started = time.monotonic()
+        budget = self.max_wait if timeout is None else min(timeout, self.max_wait)
+        deadline = started + budget
+        # A 429 pause is waited out for as long as the call itself may take
+        pause_deadline = started + (float("inf") if timeout is None else timeout)
+        ticket = object()
+        with self._cond:
+            self._queue.append(ticket)
+            metrics.set_gauge("rate_limit_queue_depth", len(self._queue), self._labels)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._queue[0] is ticket and self._can_grant(now):
+                        self._queue.popleft()
+                        self._grant()
+                        self._cond.notify_all()
+                        break
+                    if deadline < self.blocked_until <= pause_deadline:
+                        # Retry-After beyond max_wait: sleep through it, then queue
+                        deadline = self.blocked_until + budget
+                    # Waiting past the call's timeout for a 429 block to lift is pointless
+                    if now >= deadline or self.blocked_until > deadline:
+                        raise RateLimitExceeded(self.name, now - started)
+                    wake = self._seconds_until_token(now)
+                    remaining = deadline - now
+                    self._cond.wait(remaining if wake is None else min(wake, remaining))
+            except RateLimitExceeded:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+                metrics.increment("rate_limit_rejected_total", labels=self._labels)
+                raise
+            finally:
+                metrics.set_gauge(
+                    "rate_limit_queue_depth", len(self._queue), self._labels
+                )
+        waited = time.monotonic() - started
+        metrics.observe("rate_limit_wait_seconds", waited, self._labels)
+        return waited
+
+    def try_acquire(self) -> bool:
+        """Take a slot only if one is free right now and nobody is queued."""
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            if self._queue or not self._can_grant(now):
+                return False
+            self._grant()
+            return True
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            metrics.set_gauge("rate_limit_in_flight", self.in_flight, self._labels)
+            self._cond.notify_all()
+
+    @contextmanager
+    def limit(self, timeout: Optional[float] = None):
+        self.acquire(timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @contextmanager
+    def held(self):
+        """Release on exit a slot already taken with try_acquire()."""
+        try:
+            yield
+        finally:
+            self.release()
+
+    def backoff(self, seconds: float):
+        with self._cond:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+            self._cond.notify_all()
+        metrics.increment("rate_limit_backoffs_total", labels=self._labels)
+        logger.warning(f"⏸️ {self.name} answered 429, pausing it for {seconds:.1f}s")
+
+    def observe_response(self, response):
+        """Pause the provider when it says we are over its quota."""
+        if not self.enabled or response is None or response.status_code != 429:
+            return
+        retry_after = response.headers.get("Retry-After")
+        try:
+            seconds = float(retry_after) if retry_after else self.default_backoff
+        except ValueError:
+            seconds = self.default_backoff
+        self.backoff(seconds)
+
+
+def retry_statuses(limiter: ProviderLimiter) -> List[int]:
+    """Statuses urllib3 retries for a provider; 429 too while its limiter is off."""
+    statuses = [500, 502, 503, 504]
+    return statuses if limiter.enabled else [429] + statuses
+
+
+def _limiter_from_env(name: str) -> ProviderLimiter:
+    prefix = f"RATE_LIMIT_{name.upper()}"
+    return ProviderLimiter(
+        name,
+        rate=float(os.getenv(f"{prefix}_RPS", "0")),
+        burst=float(os.getenv(f"{prefix}_BURST", "0")),
+        max_concurrency=int(os.getenv(f"{prefix}_CONCURRENCY", "0")),
+        max_wait=float(os.getenv(f"{prefix}_MAX_WAIT", "5")),
+        default_backoff=float(os.getenv(f"{prefix}_429_BACKOFF", "2")),
+    )
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name: str) -> ProviderLimiter:
+    """Process-wide limiter for a provider, configured from RATE_LIMIT_<NAME>_*."""
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = _limiter_from_env(name)
+        return _limiters[name]
@@ -0,0 +1,414 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Union
+from api.services.avashow_service import AvashowService
+from api.services.config_service import env_flag
+from api.services.elevenlabs_service import ElevenLabsService
+from api.services.metrics_service import metrics, RollingWindow
+from api.services.rate_limit_service import RateLimitExceeded
+
+logger = logging.getLogger(__name__)
+
+# Each language's own voice first. The other language's voice is a deliberate
+# last resort: an accented sentence beats a reply with no audio at all. Set
+# TTS_ROUTE_EN / TTS_ROUTE_FA to one provider to never cross languages.
+DEFAULT_ROUTES = {"en": "elevenlabs,avashow", "fa": "avashow,elevenlabs"}
+
+_race_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tts-race")
+
+
+class StreamInterrupted(Exception):
+    """A provider failed after part of its audio had already reached the sink."""
+
+
+class _CountingSink:
+    """Passes chunks through to a sink, counting how many bytes it has seen."""
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.written = 0
+
+    def write(self, chunk: bytes):
+        self.written += len(chunk)
+        self.sink.write(chunk)
+
+    def abort(self):
+        self.sink.abort()
+
+
+def route_language(language: Optional[str]) -> str:
+    """Routing key for a request language: "en" for English, "fa" otherwise."""
+    return "en" if (language or "").lower().startswith("en") else "fa"
+
+
+def _remove_quietly(path: str):
+    try:
+        if os.path.exists(path):
+            os.remove(path)
+    except OSError as e:
+        logger.warning(f"Could not remove {path}: {e}")
+
+
+class TTSProvider:
+    """A text-to-speech backend that writes the mp3 for a text to a file."""
+
+    name = "base"
+    # Put between messages of a batched request so the audio has a clear pause there
+    pause_marker = "\n...\n"
+
+    def join_batch(self, texts: List[str]) -> str:
+        return self.pause_marker.join(text.strip() for text in texts)
+
+    def synthesize(self, text: str, file_name: str, sink=None):
+        """Write the mp3 to file_name, copying chunks to sink as they arrive."""
+        raise NotImplementedError
+
+
+class AvashowProvider(TTSProvider):
+    name = "avashow"
+
+    def __init__(self, service: Optional[AvashowService] = None):
+        self.service = service or AvashowService()
+        self.pause_marker = os.getenv("AVASHOW_PAUSE_MARKER", self.pause_marker)
+
+    def synthesize(self, text: str, file_name: str, sink=None):
+        self.service.text_to_speech(text, file_name, sink=sink)
+
+
+class ElevenLabsProvider(TTSProvider):
+    name = "elevenlabs"
+
+    def __init__(self, service: Optional[ElevenLabsService] = None):
+        self.service = service or ElevenLabsService()
+        self.pause_marker = os.getenv(
+            "ELEVENLABS_PAUSE_MARKER", ' <break time="1.2s" /> '
+        )
+
+    def synthesize(self, text: str, file_name: str, sink=None):
+        self.service.text_to_speech(text, file_name, sink=sink)
+
+
+class ProviderStats:
+    """Rolling latency and error rate of one provider for one language."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.latency = RollingWindow(window)
+        self.outcomes = deque(maxlen=window)
+        self.last_failure = 0.0
+        self.slow_until = 0.0
+        self.lock = threading.Lock()
+
+    def demote(self, until: float):
+        """Mark as slow until the given time and start its latency afresh."""
+        with self.lock:
+            self.slow_until = until
+            self.latency = RollingWindow(self.window)
+
+    def record(self, seconds: float, ok: bool):
+        with self.lock:
+            self.outcomes.append(ok)
+            if ok:
+                self.latency.add(seconds)
+            else:
+                self.last_failure = time.monotonic()
+
+    def error_rate(self) -> float:
+        with self.lock:
+            if not self.outcomes:
+                return 0.0
+            return self.outcomes.count(False) / len(self.outcomes)
+
+    def samples(self) -> int:
+        return len(self.outcomes)
+
+
+class TTSRouter:
+    """
+    Sends each sentence to the preferred healthy provider for its language.
+
+    A provider whose recent error rate crosses the threshold is moved to the back
+    of the route until its cooldown passes, and so is a provider whose rolling
+    latency percentile exceeds the slow threshold. A failed synthesis falls
+    through to the next provider. With racing enabled, a provider slower than its own rolling
+    percentile gets the next provider started alongside it and the first
+    successful result wins.
+    """
+
+    def __init__(
+        self,
+        providers: List[TTSProvider],
+        routes: Optional[Dict[str, List[str]]] = None,
+    ):
+        self.providers = {provider.name: provider for provider in providers}
+        self.routes = routes or {
+            language: self._route_from_env(language, default)
+            for language, default in DEFAULT_ROUTES.items()
+        }
+        self.window = int(os.getenv("TTS_STATS_WINDOW", "50"))
+        self.min_samples = int(os.getenv("TTS_MIN_SAMPLES", "5"))
+        self.unhealthy_error_rate = float(os.getenv("TTS_UNHEALTHY_ERROR_RATE", "0.5"))
+        self.cooldown = float(os.getenv("TTS_UNHEALTHY_COOLDOWN", "30"))
+        # 0 turns latency demotion off
+        self.slow_seconds = float(os.getenv("TTS_SLOW_SECONDS", "6.0"))
+        self.slow_percentile = float(os.getenv("TTS_SLOW_PERCENTILE", "0.5"))
+        self.race_enabled = env_flag("TTS_RACE_ENABLED")
+        self.race_percentile = float(os.getenv("TTS_RACE_PERCENTILE", "0.9"))
+        self.race_default_delay = float(os.getenv("TTS_RACE_DEFAULT_DELAY", "4.0"))
+        self._stats: Dict[tuple, ProviderStats] = {}
+        self._stats_lock = threading.Lock()
+        logger.info(
+            f"TTS router initialized: routes={self.routes}, race={self.race_enabled}"
+        )
+
+    def _route_from_env(self, language: str, default: str) -> List[str]:
+        names = os.getenv(f"TTS_ROUTE_{language.upper()}", default).split(",")
+        route = [name.strip() for name in names if name.strip() in self.providers]
+        if not route:
+            logger.warning(f"No known TTS providers configured for '{language}'")
+        return route
+
+    def stats(self, provider: str, language: str) -> ProviderStats:
+        key = (provider, language)
+        with self._stats_lock:
+            if key not in self._stats:
+                self._stats[key] = ProviderStats(self.window)
+            return self._stats[key]
+
+    def is_healthy(self, provider: str, language: str) -> bool:
+        stats = self.stats(provider, language)
+        if stats.samples() < self.min_samples:
+            return True
+        if stats.error_rate() < self.unhealthy_error_rate:
+            return True
+        # Let it back in for a probe once it has been quiet for the cooldown
+        return time.monotonic() - stats.last_failure >= self.cooldown
+
+    def is_slow(self, provider: str, language: str) -> bool:
+        """
+        Whether a provider's latency percentile is over the slow threshold. A
+        slow provider stays demoted for the cooldown and is then judged again on
+        fresh samples, since it gets no traffic to recover its old ones.
+        """
+        stats = self.stats(provider, language)
+        now = time.monotonic()
+        if now < stats.slow_until:
+            return True
+        if self.slow_seconds <= 0 or stats.latency.count() < self.min_samples:
+            return False
+        latency = stats.latency.percentile(self.slow_percentile) or 0.0
+        if latency <= self.slow_seconds:
+            return False
+        stats.demote(now + self.cooldown)
+        metrics.increment(
+            "tts_slow_demotions_total",
+            labels={"provider": provider, "language": language},
+        )
+        logger.warning(
+            f"TTS {provider} is slow for '{language}' ({latency:.1f}s), "
+            f"demoting it for {self.cooldown:.0f}s"
+        )
+        return True
+
+    def candidates(self, language: str) -> List[TTSProvider]:
+        """
+        Providers for a language in try order: healthy first, then fast ones,
+        then by route.
+        """
+        language = route_language(language)
+        route = self.routes.get(language, [])
+        ordered = sorted(
+            route,
+            key=lambda name: (
+                not self.is_healthy(name, language),
+                self.is_slow(name, language),
+            ),
+        )
+        return [self.providers[name] for name in ordered]
+
+    def synthesize(
+        self,
+        text: str,
+        file_name: str,
+        language: str,
+        sink_factory: Optional[Callable[[], object]] = None,
+    ) -> str:
+        """Write the mp3 for text to file_name and return the serving provider's name.
+
+        sink_factory, when given, makes a fresh sink (write/abort) for every attempt
+        so the audio can be consumed while it streams in; a failed attempt's sink is
+        aborted. A provider that breaks off after its audio reached the sink is
+        retried once with a fresh sink before failing over, since it could not
+        retry by itself. Raced attempts never stream, since only one of them is kept.
+        """
+        language = route_language(language)
+        candidates = self.candidates(language)
+        if not candidates:
+            raise RuntimeError(f"No TTS provider available for language '{language}'")
+        if candidates[0].name != (self.routes.get(language) or [None])[0]:
+            logger.warning(
+                f"TTS primary for '{language}' unhealthy or slow, "
+                f"starting with {candidates[0].name}"
+            )
+        if self.race_enabled and len(candidates) > 1:
+            return self._race(candidates, text, file_name, language)
+        return self._failover(candidates, text, file_name, language, sink_factory)
+
+    def synthesize_batch(self, texts: List[str], file_name: str, language: str) -> str:
+        """Synthesize several messages in one request, joined by pause markers.
+
+        Batched requests fail over like single ones but are tracked under their
+        own stats key, so their longer latency does not skew the race delays.
+        """
+        language = route_language(language)
+        candidates = self.candidates(language)
+        if not candidates:
+            raise RuntimeError(f"No TTS provider available for language '{language}'")
+        return self._failover(candidates, list(texts), file_name, language, None)
+
+    def _attempt(
+        self,
+        provider: TTSProvider,
+        text: Union[str, List[str]],
+        file_name: str,
+        language: str,
+        sink_factory: Optional[Callable[[], object]] = None,
+    ):
+        if not isinstance(text, str):
+            text = provider.join_batch(text)
+            language = f"{language}:batch"
+        stats = self.stats(provider.name, language)
+        labels = {"provider": provider.name, "language": language}
+        sink = None
+        if sink_factory is not None:
+            try:
+                sink = _CountingSink(sink_factory())
+            except Exception as e:
+                logger.warning(f"Could not start TTS sink, continuing without: {e}")
+        start = time.perf_counter()
+        try:
+            provider.synthesize(text, file_name, sink=sink)
+            if not os.path.exists(file_name) or not os.path.getsize(file_name):
+                raise RuntimeError(f"{provider.name} produced no audio")
+        except Exception as e:
+            # Our own quota says nothing about the provider's health
+            if isinstance(e, RateLimitExceeded):
+                metrics.increment("tts_rate_limited_total", labels=labels)
+            else:
+                stats.record(time.perf_counter() - start, False)
+                metrics.increment("tts_failures_total", labels=labels)
+            _remove_quietly(file_name)
+            if sink is not None:
+                sink.abort()
+                if sink.written and not isinstance(e, RateLimitExceeded):
+                    raise StreamInterrupted(str(e)) from e
+            raise
+        else:
+            elapsed = time.perf_counter() - start
+            stats.record(elapsed, True)
+            metrics.observe("tts_request_seconds", elapsed, labels)
+        finally:
+            metrics.set_gauge("tts_error_rate", stats.error_rate(), labels)
+
+    def _failover(self, candidates, text, file_name, language, sink_factory) -> str:
+        last_error = None
+        for index, provider in enumerate(candidates):
+            if index:
+                metrics.increment("tts_failovers_total", labels={"language": language})
+                logger.warning(f"TTS failing over to {provider.name}")
+            try:
+                try:
+                    self._attempt(provider, text, file_name, language, sink_factory)
+                except StreamInterrupted as e:
+                    # The provider cannot retry by itself once audio reached the
+                    # sink; give it one more go with a fresh sink before moving to
+                    # another voice
+                    logger.warning(
+                        f"TTS provider {provider.name} broke off mid-stream ({e}), "
+                        f"retrying it"
+                    )
+                    metrics.increment(
+                        "tts_stream_retries_total",
+                        labels={"provider": provider.name, "language": language},
+                    )
+                    self._attempt(provider, text, file_name, language, sink_factory)
+                return provider.name
+            except Exception as e:
+                logger.warning(f"TTS provider {provider.name} failed: {e}")
+                last_error = e
+        raise last_error
+
+    def _race_delay(self, provider: TTSProvider, language: str) -> float:
+        latency = self.stats(provider.name, language).latency
+        if latency.count() < self.min_samples:
+            return self.race_default_delay
+        return latency.percentile(self.race_percentile) or self.race_default_delay
+
+    def _race(self, candidates, text, file_name, language) -> str:
+        queue = list(candidates)
+        pending = {}
+        last_error = None
+
+        def launch():
+            provider = queue.pop(0)
+            # Each contender writes its own file; only the winner is moved into place
+            partial = f"{file_name}.{provider.name}.part"
+            future = _race_executor.submit(
+                self._attempt, provider, text, partial, language
+            )
+            pending[future] = (provider, partial)
+            return provider
+
+        latest = launch()
+        try:
+            while pending:
+                timeout = self._race_delay(latest, language) if queue else None
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    metrics.increment("tts_races_total", labels={"language": language})
+                    logger.info(f"TTS {latest.name} is slow, racing {queue[0].name}")
+                    latest = launch()
+                    continue
+                for future in done:
+                    provider, partial = pending.pop(future)
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.warning(f"TTS provider {provider.name} failed: {e}")
+                        last_error = e
+                        if queue:
+                            metrics.increment(
+                                "tts_failovers_total", labels={"language": language}
+                            )
+                            latest = launch()
+                        continue
+                    os.replace(partial, file_name)
+                    if provider is not candidates[0]:
+                        metrics.increment(
+                            "tts_race_wins_total",
+                            labels={"provider": provider.name, "language": language},
+                        )
+                    return provider.name
+        finally:
+            # Losers keep running to completion (it feeds their stats); drop their output
+            for future, (_, partial) in pending.items():
+                future.add_done_callback(lambda _f, path=partial: _remove_quietly(path))
+        raise last_error
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_tts_router() -> TTSRouter:
+    """Process-wide router; providers and their connection pools live as long as it does."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = TTSRouter([AvashowProvider(), ElevenLabsProvider()])
+    return _router
@@ -0,0 +1 @@
+# Reproducible benchmarks for the API hot paths
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Compare the two Avashow synthesis modes: filePath (longText + download) and
+inline base64 (longText only).
+
+Runs AvashowService in-process against the local stand-ins and reports the
+per-sentence latency of each mode, how much of it each hop takes, and how often
+the base64 mode had to fall back to a download.
+
+    python -m benchmarks.avashow_modes --launch --profile realistic --requests 40
+    python -m benchmarks.avashow_modes --url http://host/TextToSpeech/v1/longText
+"""
+
+import argparse
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import (
+    latency_summary,
+    launch_mock,
+    run_metadata,
+    wait_until_up,
+    write_results,
+)
+from benchmarks.corpus import ASSISTANT_REPLIES_FA
+from api.services.metrics_service import metrics
+
+MODES = ("filepath", "base64")
+
+
+def run_mode(mode: str, requests_count: int, concurrency: int, warmup: int) -> dict:
+    from api.services.avashow_service import AvashowService
+
+    service = AvashowService()
+
+    def synthesize(n: int):
+        text = ASSISTANT_REPLIES_FA[n % len(ASSISTANT_REPLIES_FA)]
+        start = time.perf_counter()
+        try:
+            buffer = io.BytesIO()
+            service.text_to_speech(text, buffer, mode=mode)
+            return time.perf_counter() - start, len(buffer.getvalue()), None
+        except Exception as e:
+            return time.perf_counter() - start, 0, repr(e)
+
+    for n in range(warmup):
+        synthesize(n)
+
+    fallbacks_before = metrics.get_counter("avashow_inline_fallback_total")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(synthesize, range(requests_count)))
+    wall = time.perf_counter() - started
+
+    ok = [s for s in samples if s[2] is None]
+    errors = [s[2] for s in samples if s[2] is not None]
+    return {
+        "requests": len(samples),
+        "error_rate": len(errors) / len(samples) if samples else None,
+        "errors": sorted(set(errors))[:5],
+        "throughput_rps": round(len(ok) / wall, 2) if wall else None,
+        "audio_bytes": ok[0][1] if ok else 0,
+        "fallbacks": metrics.get_counter("avashow_inline_fallback_total")
+        - fallbacks_before,
+        "latency": latency_summary([s[0] for s in ok]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--url", help="Avashow longText URL (default: stand-in)")
+    parser.add_argument("--launch", action="store_true", help="start the stand-ins")
+    parser.add_argument("--mock-port", type=int, default=4120)
+    parser.add_argument("--profile", default="realistic", help="stand-in profile")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=30, help="per mode")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--output", default="benchmarks/results/avashow_modes.json")
+    args = parser.parse_args()
+
+    mock = None
+    url = args.url or f"http://127.0.0.1:{args.mock_port}/TextToSpeech/v1/longText"
+    os.environ["AVASHOW_API_URL"] = url
+    os.environ.setdefault("AVASHOW_GATEWAY_TOKEN", "bench")
+    try:
+        if args.launch:
+            mock = launch_mock(args.mock_port, args.profile, args.seed)
+            wait_until_up(f"http://127.0.0.1:{args.mock_port}/health")
+
+        results = {
+            "meta": run_metadata(
+                url=url,
+                launched=args.launch,
+                profile=args.profile if args.launch else None,
+                seed=args.seed,
+                concurrency=args.concurrency,
+                requests_per_mode=args.requests,
+            ),
+            "modes": {},
+        }
+        for mode in MODES:
+            print(f"🚀 Running {mode} ...")
+            results["modes"][mode] = run_mode(
+                mode, args.requests, args.concurrency, args.warmup
+            )
+    finally:
+        if mock:
+            mock.terminate()
+            mock.wait(timeout=10)
+
+    results["hops"] = {
+        key: {"count": value["count"], "p50_ms": round(value["p50"] * 1000, 2)}
+        for key, value in metrics.snapshot()["summaries"].items()
+        if key.startswith("avashow_request_seconds")
+    }
+    write_results(args.output, results)
+
+    print("=" * 72)
+    print(f"{'mode':<10}{'reqs':>6}{'err%':>7}{'rps':>8}{'p50 ms':>10}{'p95 ms':>10}")
+    print("-" * 72)
+    for mode, summary in results["modes"].items():
+        latency = summary["latency"]
+        print(
+            f"{mode:<10}{summary['requests']:>6}"
+            f"{(summary['error_rate'] or 0) * 100:>6.1f}%"
+            f"{summary['throughput_rps'] or 0:>8.2f}"
+            f"{latency['p50_ms'] or 0:>10.1f}{latency['p95_ms'] or 0:>10.1f}"
+            + (f"   ({summary['fallbacks']:.0f} fallbacks)" if mode == "base64" else "")
+        )
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Compare per-message TTS calls with one batched call split at the pauses.
+
+For replies of 2 and 3 messages, measures the time until every message has its
+own mp3: per-message calls one after another (the sequential /chat path), the
+same calls in parallel (the incremental path's media workers), and one batched
+call plus silence detection and cutting. The batch column also reports the
+split confidence and how often it passed BATCH_TTS_MIN_CONFIDENCE.
+
+    python -m benchmarks.batch_tts --launch --profile realistic --replies 10
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import (
+    latency_summary,
+    launch_mock,
+    run_metadata,
+    wait_until_up,
+    write_results,
+)
+from benchmarks.corpus import ASSISTANT_REPLIES_EN, ASSISTANT_REPLIES_FA
+
+
+def run(language: str, size: int, replies: int, workdir: str) -> dict:
+    from api.services import batch_tts_service
+    from api.services.tts_service import get_tts_router
+
+    router = get_tts_router()
+    corpus = ASSISTANT_REPLIES_EN if language == "en" else ASSISTANT_REPLIES_FA
+    timings = {"sequential": [], "parallel": [], "batch": []}
+    confidences, passed, errors = [], 0, 0
+
+    for reply in range(replies):
+        texts = [corpus[(reply + k) % len(corpus)] for k in range(size)]
+        prefix = os.path.join(workdir, f"{language}_{size}_{reply}")
+
+        start = time.perf_counter()
+        try:
+            for k, text in enumerate(texts):
+                router.synthesize(text, f"{prefix}_seq_{k}.mp3", language)
+            timings["sequential"].append(time.perf_counter() - start)
+        except Exception:
+            errors += 1
+
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=size) as pool:
+                list(
+                    pool.map(
+                        lambda item: router.synthesize(
+                            item[1], f"{prefix}_par_{item[0]}.mp3", language
+                        ),
+                        enumerate(texts),
+                    )
+                )
+            timings["parallel"].append(time.perf_counter() - start)
+        except Exception:
+            errors += 1
+
+        start = time.perf_counter()
+        try:
+            result = batch_tts_service.synthesize_batch(
+                router, texts, language, f"{prefix}_batch"
+            )
+            timings["batch"].append(time.perf_counter() - start)
+            if result is not None:
+                passed += 1
+                confidences.append(result.confidence)
+        except Exception:
+            errors += 1
+
+    return {
+        "replies": replies,
+        "errors": errors,
+        "split_pass_rate": round(passed / replies, 3) if replies else None,
+        "mean_confidence": (
+            round(sum(confidences) / len(confidences), 3) if confidences else None
+        ),
+        "latency": {mode: latency_summary(values) for mode, values in timings.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--launch", action="store_true", help="start the stand-ins")
+    parser.add_argument("--mock-port", type=int, default=4130)
+    parser.add_argument("--profile", default="realistic", help="stand-in profile")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--replies", type=int, default=10, help="per reply size")
+    parser.add_argument("--languages", default="fa,en")
+    parser.add_argument("--output", default="benchmarks/results/batch_tts.json")
+    args = parser.parse_args()
+
+    if args.launch:
+        base = f"http://127.0.0.1:{args.mock_port}"
+        os.environ["AVASHOW_API_URL"] = f"{base}/TextToSpeech/v1/longText"
+        os.environ["EXTERNAL_ELEVENLABS_SERVICE_URL"] = f"{base}/elevenlabs"
+        os.environ.setdefault("AVASHOW_GATEWAY_TOKEN", "bench")
+
+    mock = None
+    workdir = tempfile.mkdtemp(prefix="batch_tts_")
+    try:
+        if args.launch:
+            mock = launch_mock(args.mock_port, args.profile, args.seed)
+            wait_until_up(f"http://127.0.0.1:{args.mock_port}/health")
+
+        results = {
+            "meta": run_metadata(
+                launched=args.launch,
+                profile=args.profile if args.launch else None,
+                seed=args.seed,
+                replies=args.replies,
+            ),
+            "runs": {},
+        }
+        for language in [lang.strip() for lang in args.languages.split(",")]:
+            for size in (2, 3):
+                name = f"{language}-{size}"
+                print(f"🚀 Running {name} ...")
+                results["runs"][name] = run(language, size, args.replies, workdir)
+    finally:
+        if mock:
+            mock.terminate()
+            mock.wait(timeout=10)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    write_results(args.output, results)
+    print("=" * 84)
+    print(
+        f"{'run':<8}{'seq p50':>10}{'par p50':>10}{'batch p50':>11}"
+        f"{'batch p95':>11}{'split ok':>10}{'conf':>7}{'errors':>8}"
+    )
+    print("-" * 84)
+    for name, run_result in results["runs"].items():
+        latency = run_result["latency"]
+        print(
+            f"{name:<8}{latency['sequential']['p50_ms'] or 0:>10.0f}"
+            f"{latency['parallel']['p50_ms'] or 0:>10.0f}"
+            f"{latency['batch']['p50_ms'] or 0:>11.0f}"
+            f"{latency['batch']['p95_ms'] or 0:>11.0f}"
+            f"{(run_result['split_pass_rate'] or 0) * 100:>9.0f}%"
+            f"{run_result['mean_confidence'] or 0:>7.2f}{run_result['errors']:>8}"
+        )
+    print("=" * 84)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Compare CPU per /chat response for the FastAPI/pydantic path and the fast path.
+
+Builds replies of 1 to 3 messages from the intro mp3 and a Rhubarb transcript
+and measures, in process CPU time, what it takes to turn them into the response
+body:
+
+  pydantic   Message(...) validation, then what FastAPI does with a returned
+             ChatResponse: dump, validate against response_model, serialize,
+             jsonable_encoder and json.dumps
+  fast       Message.model_construct, lipsync parsed into a dict, fast encoder
+  fast_raw   Message.model_construct, Rhubarb's file bytes embedded verbatim
+
+Each fast column runs with orjson when it is installed and with the stdlib
+fallback; the bodies of all paths are checked to decode to the same JSON.
+
+    python -m benchmarks.chat_response_json --iterations 200
+"""
+
+import argparse
+import base64
+import json
+import os
+import time
+
+from benchmarks.common import REPO_ROOT, run_metadata, write_results
+
+AUDIO = os.path.join(REPO_ROOT, "audios", "introduction.mp3")
+TRANSCRIPT = os.path.join(REPO_ROOT, "audios", "message_0.json")
+
+
+def build_paths():
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from fastapi.utils import create_response_field
+    from api.schemas.assistant_schema import ChatResponse, Message
+    from api.services.fast_json_service import chat_response_json
+
+    field = create_response_field(name="response", type_=ChatResponse)
+    with open(AUDIO, "rb") as f:
+        audio = base64.b64encode(f.read()).decode()
+    with open(TRANSCRIPT, "rb") as f:
+        raw = f.read()
+    fields = {"text": "سلام! چطور می‌تونم کمکتون کنم؟", "audio": audio}
+    fields.update(facialExpression="smile", animation="Talking_1", ttsProvider="x")
+
+    def pydantic_path(count):
+        messages = [Message(**fields, lipsync=json.loads(raw)) for _ in range(count)]
+        content = ChatResponse(messages=messages).model_dump(by_alias=True)
+        value, _ = field.validate(content, {}, loc=("response",))
+        payload = field.serialize(value, mode="json", by_alias=True)
+        return JSONResponse(jsonable_encoder(payload)).body
+
+    def fast_path(count):
+        messages = [
+            Message.model_construct(**fields, lipsync=json.loads(raw))
+            for _ in range(count)
+        ]
+        return chat_response_json(messages)
+
+    def fast_raw_path(count):
+        messages = []
+        for _ in range(count):
+            message = Message.model_construct(**fields, lipsync=None)
+            message._lipsync_raw = raw
+            messages.append(message)
+        return chat_response_json(messages)
+
+    return {"pydantic": pydantic_path, "fast": fast_path, "fast_raw": fast_raw_path}
+
+
+def cpu_per_call(func, count: int, iterations: int) -> float:
+    func(count)
+    started = time.process_time()
+    for _ in range(iterations):
+        func(count)
+    return (time.process_time() - started) / iterations
+
+
+def run(iterations: int) -> dict:
+    from api.services import fast_json_service
+
+    paths = build_paths()
+    encoders = ["stdlib"]
+    orjson = fast_json_service.orjson
+    if orjson is not None:
+        encoders.insert(0, "orjson")
+
+    results = {}
+    for count in (1, 2, 3):
+        reference = json.loads(paths["pydantic"](count))
+        row = {
+            "pydantic_ms": round(
+                cpu_per_call(paths["pydantic"], count, iterations) * 1e3, 3
+            ),
+            "bytes": len(paths["pydantic"](count)),
+        }
+        for encoder in encoders:
+            fast_json_service.orjson = orjson if encoder == "orjson" else None
+            for name in ("fast", "fast_raw"):
+                assert json.loads(paths[name](count)) == reference, name
+                seconds = cpu_per_call(paths[name], count, iterations)
+                row[f"{name}_{encoder}_ms"] = round(seconds * 1e3, 3)
+        fast_json_service.orjson = orjson
+        results[f"{count}_messages"] = row
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument(
+        "--output", default="benchmarks/results/chat_response_json.json"
+    )
+    args = parser.parse_args()
+
+    print("🚀 Serializing replies ...")
+    results = {
+        "meta": run_metadata(iterations=args.iterations),
+        "runs": run(args.iterations),
+    }
+    write_results(args.output, results)
+
+    columns = [key for key in next(iter(results["runs"].values())) if key != "bytes"]
+    print("=" * (14 + 22 * len(columns)))
+    print(f"{'reply':<14}" + "".join(f"{column:>22}" for column in columns))
+    print("-" * (14 + 22 * len(columns)))
+    for name, row in results["runs"].items():
+        print(f"{name:<14}" + "".join(f"{row[column]:>22.3f}" for column in columns))
+    print("=" * (14 + 22 * len(columns)))
+    print("CPU milliseconds per response")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Peak memory of building an inline /chat reply, buffered versus streamed.
+
+For replies of three messages with clips of growing length, measures with
+tracemalloc the peak Python allocation of:
+
+  buffered   each mp3 read and base64 encoded into the message, then the whole
+             body encoded at once (the fast JSON path without streaming)
+  streamed   each mp3 left on disk and base64 encoded chunk by chunk while the
+             body is consumed, as the StreamingResponse does
+
+Both bodies are checked to be byte for byte the same.
+
+    python -m benchmarks.chat_response_memory --sizes-kb 256 1024 4096
+"""
+
+import argparse
+import hashlib
+import os
+import tempfile
+import tracemalloc
+
+from benchmarks.common import REPO_ROOT, run_metadata, write_results
+
+TRANSCRIPT = os.path.join(REPO_ROOT, "audios", "message_0.json")
+MESSAGES = 3
+
+
+def build_messages(paths, stream: bool):
+    from api.schemas.assistant_schema import Message
+    from api.services.file_service import FileService
+
+    with open(TRANSCRIPT, "rb") as f:
+        raw = f.read()
+    messages = []
+    for path in paths:
+        message = Message.model_construct(
+            text="سلام! چطور می‌تونم کمکتون کنم؟",
+            audio=None if stream else FileService.audio_file_to_base64(path),
+            lipsync=None,
+            facialExpression="smile",
+            animation="Talking_1",
+            ttsProvider="x",
+        )
+        message._lipsync_raw = raw
+        message._audio_path = path if stream else None
+        messages.append(message)
+    return messages
+
+
+def buffered(paths):
+    from api.services.fast_json_service import chat_response_json
+
+    body = chat_response_json(build_messages(paths, stream=False))
+    return len(body), hashlib.sha256(body).hexdigest()
+
+
+def streamed(paths):
+    from api.services.fast_json_service import iter_chat_response_json
+
+    size, digest = 0, hashlib.sha256()
+    for chunk in iter_chat_response_json(build_messages(paths, stream=True)):
+        size += len(chunk)
+        digest.update(chunk)
+    return size, digest.hexdigest()
+
+
+def peak_bytes(func, paths):
+    tracemalloc.start()
+    try:
+        result = func(paths)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, result
+
+
+def run(sizes_kb) -> dict:
+    # Import outside the traced sections so module loading is not counted
+    import api.services.fast_json_service  # noqa: F401
+    import api.services.file_service  # noqa: F401
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size_kb in sizes_kb:
+            paths = []
+            for i in range(MESSAGES):
+                path = os.path.join(directory, f"clip_{size_kb}_{i}.mp3")
+                with open(path, "wb") as f:
+                    f.write(os.urandom(size_kb * 1024))
+                paths.append(path)
+            buffered_peak, buffered_body = peak_bytes(buffered, paths)
+            streamed_peak, streamed_body = peak_bytes(streamed, paths)
+            assert buffered_body == streamed_body, "bodies differ"
+            results[f"{size_kb}_kb"] = {
+                "body_bytes": buffered_body[0],
+                "buffered_peak_kb": round(buffered_peak / 1024, 1),
+                "streamed_peak_kb": round(streamed_peak / 1024, 1),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--sizes-kb", type=int, nargs="+", default=[256, 1024, 4096, 16384]
+    )
+    parser.add_argument(
+        "--output", default="benchmarks/results/chat_response_memory.json"
+    )
+    args = parser.parse_args()
+
+    print(f"🚀 Building replies of {MESSAGES} messages ...")
+    results = {
+        "meta": run_metadata(sizes_kb=args.sizes_kb, messages=MESSAGES),
+        "runs": run(args.sizes_kb),
+    }
+    write_results(args.output, results)
+
+    print("=" * 62)
+    print(f"{'clip':<12}{'body bytes':>16}{'buffered KiB':>17}{'streamed KiB':>17}")
+    print("-" * 62)
+    for name, row in results["runs"].items():
+        print(
+            f"{name:<12}{row['body_bytes']:>16}"
+            f"{row['buffered_peak_kb']:>17.1f}{row['streamed_peak_kb']:>17.1f}"
+        )
+    print("=" * 62)
+    print("Peak Python allocation while building one reply")
+
+
+if __name__ == "__main__":
+    main()
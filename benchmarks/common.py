@@ -0,0 +1,103 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import requests
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile for q in 0..1; None for an empty list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def latency_summary(values: List[float]) -> Dict[str, Optional[float]]:
+    """p50/p95/p99/mean/max of a list of seconds, reported in milliseconds."""
+
+    def to_ms(value):
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        "p50_ms": to_ms(percentile(values, 0.50)),
+        "p95_ms": to_ms(percentile(values, 0.95)),
+        "p99_ms": to_ms(percentile(values, 0.99)),
+        "mean_ms": to_ms(sum(values) / len(values)) if values else None,
+        "max_ms": to_ms(max(values)) if values else None,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=REPO_ROOT,
+                stderr=subprocess.DEVNULL,
+            )
+            .decode()
+            .strip()
+        )
+    except Exception:
+        return "unknown"
+
+
+def run_metadata(**extra) -> dict:
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        **extra,
+    }
+
+
+def write_results(path: str, results: dict):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"📄 Results written to {path}")
+
+
+def load_results(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def wait_until_up(url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(url, timeout=2)
+            return
+        except requests.RequestException:
+            time.sleep(0.3)
+    raise RuntimeError(f"Service at {url} did not come up within {timeout}s")
+
+
+def launch_mock(port: int, profile: str, seed: int) -> subprocess.Popen:
+    """Start the external-service stand-ins (mock_services) as a subprocess."""
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "mock_services",
+            "--port",
+            str(port),
+            "--profile",
+            profile,
+            "--seed",
+            str(seed),
+        ],
+        cwd=REPO_ROOT,
+        stdout=subprocess.DEVNULL,
+    )
@@ -0,0 +1,85 @@
+"""Realistic Persian/English inputs for the per-request helper microbenchmarks."""
+
+import json
+
+ASSISTANT_REPLIES_FA = [
+    "در سالن VIP CIP، امکاناتی مثل لانژ اختصاصی، رستوران سلف‌سرویس، اتاق بازی کودکان و اینترنت پرسرعت داریم.",
+    "خدمات ویژه‌ای مثل Home Check-in، ویلچر و پذیرش حیوان خانگی هم ارائه می‌دیم.",
+    "اگه سوال دیگه‌ای داری، بگو تا راهنماییت کنم.",
+    "برای رزرو CIP پرواز ۲۸ سپتامبر به استانبول، لطفاً نام و نام خانوادگی مسافران را بفرمایید.",
+    "سلام! من نکسا هستم، دستیار هوش مصنوعی CIP فرودگاه امام خمینی و مشهد.",
+]
+ASSISTANT_REPLIES_EN = [
+    "The CIP lounge offers a private lounge, a self-service restaurant, a kids' playroom and high-speed internet.",
+    "We also provide Home Check-in, wheelchair service and pet acceptance.",
+    "If you have any other questions, just ask and I'll guide you.",
+    "To book CIP service for your September 28 flight to Istanbul, please tell me the passengers' full names.",
+]
+
+# Replies as the chat service sometimes returns them: text with a JSON array appended
+ASSISTANT_REPLIES_WITH_ARTIFACTS = [
+    reply
+    + " "
+    + json.dumps(
+        [
+            {"text": part, "facialExpression": "smile", "animation": f"Talking_{i}"}
+            for i, part in enumerate(ASSISTANT_REPLIES_FA[:3])
+        ],
+        ensure_ascii=False,
+    )
+    for reply in ASSISTANT_REPLIES_FA[:2]
+] + [
+    ASSISTANT_REPLIES_EN[0] + ' {"facialExpression": "smile"}',
+]
+
+TEXT_CORPUS = (
+    ASSISTANT_REPLIES_FA + ASSISTANT_REPLIES_EN + ASSISTANT_REPLIES_WITH_ARTIFACTS
+)
+
+DATES_PERSIAN = ["۲۸ سپتامبر ۲۰۲۵", "8 سپتامبر 2025", "۱۵ ژانویه ۲۰۲۶", "۳ مه ۲۰۲۵"]
+DATES_ENGLISH = [
+    "September 28, 2025",
+    "28 September 2025",
+    "28/09/2025",
+    "2025-09-28",
+    "28-09-2025",
+]
+DATES_NUMERIC = ["2025/09/28", "28.09.2025", "۱۴۰۴/۰۷/۰۶", "تاریخ 2025.9.28"]
+DATES_UNPARSEABLE = ["۲۸ مرداد ۱۴۰۴", "فردا صبح", "next Tuesday"]
+DATE_CORPUS = DATES_PERSIAN + DATES_ENGLISH + DATES_NUMERIC + DATES_UNPARSEABLE
+
+CHAT_SERVICE_BODIES = [
+    {
+        "messages": [
+            {"text": text, "facialExpression": "smile", "animation": f"Talking_{i}"}
+            for i, text in enumerate(ASSISTANT_REPLIES_FA[:3])
+        ]
+    },
+    {"messages": [{"text": text} for text in ASSISTANT_REPLIES_EN]},
+    {"messages": {"text": ASSISTANT_REPLIES_FA[3], "facialExpression": "default"}},
+    {"messages": ["plain string message", {"text": ASSISTANT_REPLIES_EN[2]}]},
+    {"error": "unexpected body"},
+]
+
+PASSENGERS = [
+    {
+        "name": "علی",
+        "lastName": "رضایی",
+        "nationalId": "0012345678",
+        "passportNumber": "",
+        "baggageCount": "2",
+        "passengerType": "بزرگسال",
+        "gender": "مرد",
+    },
+    {
+        "name": "Sara",
+        "lastName": "Ahmadi",
+        "passportNumber": "X1234567",
+        "luggageCount": 1,
+        "passengerType": "adult",
+        "gender": "female",
+        "nationality": "غیر ایرانی",
+    },
+    {"name": "مریم", "lastName": "کریمی", "baggageCount": "دو", "gender": "زن"},
+    {"name": "Reza", "lastName": "Karimi", "baggageCount": " 3 "},
+]
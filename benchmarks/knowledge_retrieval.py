@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Lookup cost of knowledge retrieval: top-k rows for /ask, FAQ matches for /chat.
+
+Builds synthetic knowledge bases of growing size from the Persian/English
+corpus (each row a distinct question about a numbered service), then reports:
+
+  build_ms      time to tokenize the rows and build the BM25 index
+  query_us      median time of one top-k search
+  full_chars    size of the prompt with the whole knowledge base
+  topk_chars    mean size of the prompt with only the retrieved rows
+  hit_rate      share of questions whose own row ranks first
+  faq_build_ms  time to build the character n-gram TF-IDF index of the /chat
+                FAQ fast path
+  faq_us        median time of one FAQ match
+  faq_hit_rate  share of questions, reworded with Arabic letter variants and
+                no punctuation, that the fast path would answer
+
+    python -m benchmarks.knowledge_retrieval --rows 100 1000 5000
+"""
+
+import argparse
+import random
+import statistics
+import time
+import timeit
+
+from benchmarks.common import run_metadata, write_results
+from benchmarks.corpus import ASSISTANT_REPLIES_EN, ASSISTANT_REPLIES_FA
+
+TOPICS_FA = ["رزرو", "هزینه", "ساعت کاری", "پارکینگ", "ویلچر", "چمدان", "ترانزیت"]
+TOPICS_EN = ["booking", "price", "opening hours", "parking", "wheelchair", "baggage"]
+
+
+def build_rows(count: int, seed: int):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        if i % 2:
+            topic = rng.choice(TOPICS_EN)
+            question = f"What about {topic} for service {i} code x{i}?"
+            answer = rng.choice(ASSISTANT_REPLIES_EN)
+        else:
+            topic = rng.choice(TOPICS_FA)
+            question = f"{topic} خدمت شماره {i} کد x{i} چطور است؟"
+            answer = rng.choice(ASSISTANT_REPLIES_FA)
+        rows.append({"question": question, "answer": answer, "category": topic})
+    return rows
+
+
+def run(row_counts, top_k: int, queries: int, seed: int) -> dict:
+    from api.services.google_sheets_service import GoogleSheetsService
+    from api.services.faq_service import FaqIndex
+    from api.services.knowledge_index_service import KnowledgeIndex
+
+    results = {}
+    for count in row_counts:
+        rows = build_rows(count, seed)
+        started = time.perf_counter()
+        index = KnowledgeIndex(rows)
+        build_seconds = time.perf_counter() - started
+
+        rng = random.Random(seed)
+        sample = [rng.choice(rows) for _ in range(queries)]
+        hits, sizes = 0, []
+        for row in sample:
+            found = index.search(row["question"], top_k, 0.0, 0.25)
+            hits += bool(found) and found[0][1] is row
+            sizes.append(
+                len(GoogleSheetsService.format_knowledge([item for _, item in found]))
+            )
+        timer = timeit.Timer(lambda: index.search(sample[0]["question"], top_k))
+        number, _ = timer.autorange()
+        query_seconds = statistics.median(timer.repeat(repeat=5, number=number))
+
+        started = time.perf_counter()
+        faq = FaqIndex(rows)
+        faq_build_seconds = time.perf_counter() - started
+        faq_hits = 0
+        for row in sample:
+            language = "en" if row["question"].isascii() else "fa"
+            asked = row["question"].replace("ی", "ي").replace("ک", "ك").rstrip("?؟")
+            faq_hits += faq.answer(asked, language) is row
+        timer = timeit.Timer(lambda: faq.match(sample[0]["question"]))
+        faq_number, _ = timer.autorange()
+        faq_seconds = statistics.median(timer.repeat(repeat=5, number=faq_number))
+
+        results[f"{count}_rows"] = {
+            "build_ms": round(build_seconds * 1e3, 2),
+            "query_us": round(query_seconds / number * 1e6, 1),
+            "full_chars": len(GoogleSheetsService.format_knowledge(rows)),
+            "topk_chars": round(statistics.mean(sizes)),
+            "hit_rate": round(hits / len(sample), 3),
+            "faq_build_ms": round(faq_build_seconds * 1e3, 2),
+            "faq_us": round(faq_seconds / faq_number * 1e6, 1),
+            "faq_hit_rate": round(faq_hits / len(sample), 3),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output", default="benchmarks/results/knowledge_retrieval.json"
+    )
+    args = parser.parse_args()
+
+    print(f"🚀 Indexing knowledge bases of {args.rows} rows ...")
+    results = {
+        "meta": run_metadata(top_k=args.top_k, queries=args.queries, seed=args.seed),
+        "runs": run(args.rows, args.top_k, args.queries, args.seed),
+    }
+    write_results(args.output, results)
+
+    columns = list(next(iter(results["runs"].values())))
+    print("=" * (12 + 13 * len(columns)))
+    print(f"{'rows':<12}" + "".join(f"{column:>13}" for column in columns))
+    print("-" * (12 + 13 * len(columns)))
+    for name, row in results["runs"].items():
+        print(f"{name:<12}" + "".join(f"{row[column]:>13}" for column in columns))
+    print("=" * (12 + 13 * len(columns)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Compare the compact lipsync encoding with Rhubarb's JSON.
+
+For every Rhubarb transcript under audios/, reports the serialized size (raw and
+gzipped, as it goes over the wire) and the time to turn the transcript into the
+JSON of one /chat message: building the Message, which validates the lipsync
+dict, and dumping it. The compact column includes the encoding step itself. A
+decode round trip checks that no cue moved by more than half a quantum.
+
+    python -m benchmarks.lipsync_codec
+    python -m benchmarks.lipsync_codec --transcripts audios/introduction.json
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import statistics
+import timeit
+
+from benchmarks.common import REPO_ROOT, run_metadata, write_results
+
+
+def message_json(lipsync) -> str:
+    from api.schemas.assistant_schema import Message
+
+    return Message(
+        text="", lipsync=lipsync, facialExpression="default", animation="Idle"
+    ).model_dump_json()
+
+
+def median_seconds(func, repeat: int) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return statistics.median(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def max_error_ms(original: dict, decoded: dict) -> float:
+    worst = 0.0
+    for before, after in zip(original["mouthCues"], decoded["mouthCues"]):
+        if before["value"] != after["value"]:
+            return float("inf")
+        for key in ("start", "end"):
+            worst = max(worst, abs(float(before[key]) - after[key]) * 1000)
+    return round(worst, 3)
+
+
+def run(path: str, repeat: int) -> dict:
+    from api.services.lipsync_codec import decode_compact, encode_compact
+
+    with open(path, "r", encoding="utf-8") as f:
+        rhubarb = json.load(f)
+    compact = encode_compact(rhubarb)
+    sizes = {}
+    for name, data in (("rhubarb", rhubarb), ("compact", compact)):
+        body = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+        sizes[name] = {"bytes": len(body), "gzip_bytes": len(gzip.compress(body))}
+
+    seconds = {
+        "rhubarb": median_seconds(lambda: message_json(rhubarb), repeat),
+        "compact": median_seconds(
+            lambda: message_json(encode_compact(rhubarb)), repeat
+        ),
+        "encode": median_seconds(lambda: encode_compact(rhubarb), repeat),
+        "decode": median_seconds(lambda: decode_compact(compact), repeat),
+    }
+    return {
+        "cues": len(rhubarb.get("mouthCues", [])),
+        "sizes": sizes,
+        "us_per_message": {name: round(s * 1e6, 2) for name, s in seconds.items()},
+        "size_ratio": round(sizes["compact"]["bytes"] / sizes["rhubarb"]["bytes"], 3),
+        "max_error_ms": max_error_ms(rhubarb, decode_compact(compact)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--transcripts", nargs="*", help="Rhubarb JSON files")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--output", default="benchmarks/results/lipsync_codec.json")
+    args = parser.parse_args()
+
+    paths = args.transcripts or sorted(
+        glob.glob(os.path.join(REPO_ROOT, "audios", "*.json"))
+    )
+    paths = [
+        path for path in paths if "mouthCues" in open(path, encoding="utf-8").read()
+    ]
+    results = {"meta": run_metadata(repeat=args.repeat), "runs": {}}
+    for path in paths:
+        name = os.path.basename(path)
+        print(f"🚀 Running {name} ...")
+        results["runs"][name] = run(path, args.repeat)
+
+    write_results(args.output, results)
+    print("=" * 92)
+    print(
+        f"{'transcript':<28}{'cues':>6}{'json B':>9}{'compact B':>11}{'gz json':>9}"
+        f"{'gz cmp':>8}{'json µs':>9}{'cmp µs':>8}{'err ms':>8}"
+    )
+    print("-" * 92)
+    for name, run_result in results["runs"].items():
+        sizes, timing = run_result["sizes"], run_result["us_per_message"]
+        print(
+            f"{name:<28}{run_result['cues']:>6}{sizes['rhubarb']['bytes']:>9}"
+            f"{sizes['compact']['bytes']:>11}{sizes['rhubarb']['gzip_bytes']:>9}"
+            f"{sizes['compact']['gzip_bytes']:>8}{timing['rhubarb']:>9.1f}"
+            f"{timing['compact']:>8.1f}{run_result['max_error_ms']:>8}"
+        )
+    print("=" * 92)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+End-to-end load benchmark for /chat, /intro and /extract-info.
+
+Drives the API at a fixed concurrency (closed loop) or a fixed request rate
+(open loop) and reports latency percentiles, throughput, error rate and the
+per-stage breakdown /chat reports in its Server-Timing header.
+
+    # start stand-ins + API locally, run all scenarios, save results
+    python -m benchmarks.load_chat --launch --concurrency 4 --requests 40 \\
+        --output benchmarks/results/load_before.json
+
+    # compare a new run against a previous one
+    python -m benchmarks.load_chat --launch --output after.json \\
+        --compare benchmarks/results/load_before.json
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from benchmarks.common import (
+    REPO_ROOT,
+    latency_summary,
+    launch_mock,
+    load_results,
+    run_metadata,
+    wait_until_up,
+    write_results,
+)
+
+FA_QUESTIONS = [
+    "سالن CIP فرودگاه امام خمینی چه امکاناتی دارد؟",
+    "آیا می‌توانم حیوان خانگی همراه داشته باشم؟",
+    "برای رزرو CIP پرواز استانبول چه مدارکی لازم است؟",
+    "خدمات ویلچر چطور ارائه می‌شود؟",
+]
+EN_QUESTIONS = [
+    "What facilities does the CIP lounge have?",
+    "Can I bring my pet to the lounge?",
+    "How do I book CIP service for my flight to Istanbul?",
+    "Do you offer wheelchair assistance?",
+]
+EXTRACT_MESSAGES = [
+    {"id": "1", "text": "سلام می‌خوام به نیویورک سفر کنم", "sender": "CLIENT"},
+    {"id": "2", "text": "فرودگاه امام خمینی", "sender": "CLIENT"},
+    {"id": "3", "text": "تاریخ سفر کی هست؟", "sender": "AVATAR"},
+    {"id": "4", "text": "۲۸ سپتامبر ۲۰۲۵", "sender": "CLIENT"},
+]
+
+
+def _chat_payload(questions: List[str], language: str) -> Callable[[int], dict]:
+    # A fresh session id per request keeps OpenAIService's response cache cold
+    return lambda n: {
+        "message": questions[n % len(questions)],
+        "session_id": f"bench_{language}_{n:06d}",
+        "language": language,
+    }
+
+
+SCENARIOS = {
+    "chat-fa": ("POST", "/api/v1/aiassistant/chat", _chat_payload(FA_QUESTIONS, "fa")),
+    "chat-en": ("POST", "/api/v1/aiassistant/chat", _chat_payload(EN_QUESTIONS, "en")),
+    "intro": ("GET", "/api/v1/aiassistant/intro?language=fa", None),
+    "extract-info": (
+        "POST",
+        "/api/v1/extract-info",
+        lambda n: {"messages": EXTRACT_MESSAGES},
+    ),
+}
+
+
+def parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    """'tts;dur=120.5, lipsync;dur=40' -> {'tts': 0.1205, 'lipsync': 0.04}"""
+    stages = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if name and key == "dur":
+                try:
+                    stages[name] = float(value) / 1000
+                except ValueError:
+                    pass
+    return stages
+
+
+class Sample:
+    __slots__ = ("latency", "status", "error", "stages")
+
+    def __init__(self, latency, status, error=None, stages=None):
+        self.latency = latency
+        self.status = status
+        self.error = error
+        self.stages = stages or {}
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and 200 <= self.status < 300
+
+
+def _send(session, base_url, scenario, n, timeout, scheduled_at=None) -> Sample:
+    method, path, payload = SCENARIOS[scenario]
+    # In open-loop mode latency counts from the scheduled send time, so queueing
+    # inside the generator is not hidden (coordinated omission)
+    started = scheduled_at if scheduled_at is not None else time.monotonic()
+    try:
+        response = session.request(
+            method,
+            base_url + path,
+            json=payload(n) if payload else None,
+            timeout=timeout,
+        )
+        response.content  # read the full body
+        return Sample(
+            time.monotonic() - started,
+            response.status_code,
+            None if response.ok else f"HTTP {response.status_code}",
+            parse_server_timing(response.headers.get("Server-Timing")),
+        )
+    except requests.RequestException as e:
+        return Sample(time.monotonic() - started, 0, type(e).__name__)
+
+
+def run_scenario(
+    base_url: str,
+    scenario: str,
+    concurrency: int,
+    total_requests: int,
+    rps: Optional[float],
+    timeout: float,
+    warmup: int,
+) -> dict:
+    local = threading.local()
+
+    def session():
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return local.session
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for n in range(warmup):
+            pool.submit(_send, session(), base_url, scenario, -1 - n, timeout)
+    samples: List[Sample] = []
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        if rps:
+            futures = []
+            for n in range(total_requests):
+                scheduled_at = started + n / rps
+                delay = scheduled_at - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(
+                    pool.submit(
+                        lambda n=n, at=scheduled_at: _send(
+                            session(), base_url, scenario, n, timeout, at
+                        )
+                    )
+                )
+        else:
+            futures = [
+                pool.submit(
+                    lambda n=n: _send(session(), base_url, scenario, n, timeout)
+                )
+                for n in range(total_requests)
+            ]
+        samples = [future.result() for future in futures]
+    wall_time = time.monotonic() - started
+
+    ok = [s for s in samples if s.ok]
+    errors: Dict[str, int] = {}
+    for s in samples:
+        if not s.ok:
+            errors[s.error] = errors.get(s.error, 0) + 1
+
+    stage_names = sorted({name for s in ok for name in s.stages})
+    stages = {
+        name: latency_summary([s.stages[name] for s in ok if name in s.stages])
+        for name in stage_names
+    }
+
+    return {
+        "requests": len(samples),
+        "successes": len(ok),
+        "error_rate": round(1 - len(ok) / len(samples), 4) if samples else None,
+        "errors": errors,
+        "wall_time_s": round(wall_time, 3),
+        "throughput_rps": round(len(ok) / wall_time, 3) if wall_time else None,
+        "latency": latency_summary([s.latency for s in ok]),
+        "stages": stages,
+    }
+
+
+def launch_stack(api_port: int, mock_port: int, profile: str, seed: int, env_extra):
+    """Start the stand-ins and the API as subprocesses wired to each other."""
+    mock_base = f"http://127.0.0.1:{mock_port}"
+    mock = launch_mock(mock_port, profile, seed)
+    env = dict(os.environ)
+    env.update(
+        {
+            "EXTERNAL_CHAT_SERVICE_URL": f"{mock_base}/chat",
+            "EXTERNAL_EXTRACTINFO_SERVICE_URL": f"{mock_base}/extract-info",
+            "AVASHOW_API_URL": f"{mock_base}/TextToSpeech/v1/longText",
+            "EXTERNAL_ELEVENLABS_SERVICE_URL": f"{mock_base}/elevenlabs",
+            "AVASHOW_GATEWAY_TOKEN": env.get("AVASHOW_GATEWAY_TOKEN", "bench"),
+            "OPENAI_API_KEY": env.get("OPENAI_API_KEY", "bench"),
+            "KNOWLEDGE_SHEET_ID": env.get("KNOWLEDGE_SHEET_ID", "bench"),
+            "POSTGRES_PASSWORD": env.get("POSTGRES_PASSWORD", "bench"),
+            "DATABASE_URL": env.get("DATABASE_URL", "sqlite:///:memory:"),
+        }
+    )
+    env.update(env_extra)
+    api = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "api.app:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(api_port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    wait_until_up(f"{mock_base}/health")
+    wait_until_up(f"http://127.0.0.1:{api_port}/api/v1/aiassistant/health")
+    return [api, mock]
+
+
+def print_report(results: dict, baseline: Optional[dict] = None):
+    print("=" * 96)
+    print(
+        f"{'scenario':<14}{'reqs':>6}{'err%':>7}{'rps':>8}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        + ("   Δp50 / Δp95 / Δp99" if baseline else "")
+    )
+    print("-" * 96)
+    for name, summary in results["scenarios"].items():
+        latency = summary["latency"]
+        line = (
+            f"{name:<14}{summary['requests']:>6}"
+            f"{(summary['error_rate'] or 0) * 100:>6.1f}%"
+            f"{summary['throughput_rps'] or 0:>8.2f}"
+            f"{latency['p50_ms'] or 0:>10.1f}{latency['p95_ms'] or 0:>10.1f}"
+            f"{latency['p99_ms'] or 0:>10.1f}"
+        )
+        previous = (baseline or {}).get("scenarios", {}).get(name)
+        if previous:
+            deltas = []
+            for key in ("p50_ms", "p95_ms", "p99_ms"):
+                before, after = previous["latency"].get(key), latency.get(key)
+                if before and after:
+                    deltas.append(f"{(after - before) / before * 100:+.1f}%")
+                else:
+                    deltas.append("n/a")
+            line += "   " + " / ".join(deltas)
+        print(line)
+        for stage, stage_latency in summary["stages"].items():
+            print(
+                f"    {stage:<22}p50 {stage_latency['p50_ms'] or 0:>9.1f} ms"
+                f"   p95 {stage_latency['p95_ms'] or 0:>9.1f} ms"
+            )
+    print("=" * 96)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--base-url", default="http://127.0.0.1:4000")
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help=f"comma-separated subset of: {', '.join(SCENARIOS)}",
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=40, help="per scenario")
+    parser.add_argument(
+        "--rps", type=float, default=None, help="open-loop request rate"
+    )
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", default="benchmarks/results/load_chat.json")
+    parser.add_argument("--compare", help="previous results file to diff against")
+    parser.add_argument(
+        "--launch",
+        action="store_true",
+        help="start the stand-ins and the API locally instead of using --base-url",
+    )
+    parser.add_argument("--api-port", type=int, default=4010)
+    parser.add_argument("--mock-port", type=int, default=4110)
+    parser.add_argument("--profile", default="realistic", help="stand-in profile")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="extra environment for the launched API (repeatable)",
+    )
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    processes = []
+    base_url = args.base_url
+    env_extra = dict(item.split("=", 1) for item in args.env)
+    try:
+        if args.launch:
+            processes = launch_stack(
+                args.api_port, args.mock_port, args.profile, args.seed, env_extra
+            )
+            base_url = f"http://127.0.0.1:{args.api_port}"
+
+        results = {
+            "meta": run_metadata(
+                base_url=base_url,
+                concurrency=args.concurrency,
+                requests_per_scenario=args.requests,
+                rps=args.rps,
+                launched=args.launch,
+                profile=args.profile if args.launch else None,
+                seed=args.seed,
+                env=env_extra,
+            ),
+            "scenarios": {},
+        }
+        for scenario in scenarios:
+            print(f"🚀 Running {scenario} ...")
+            results["scenarios"][scenario] = run_scenario(
+                base_url,
+                scenario,
+                args.concurrency,
+                args.requests,
+                args.rps,
+                args.timeout,
+                args.warmup,
+            )
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+    write_results(args.output, results)
+    print_report(results, load_results(args.compare) if args.compare else None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Microbenchmarks for the pure per-request helpers on the /chat and /extract-info paths.
+
+Each benchmark runs one pass over a realistic Persian/English corpus and reports the
+fastest time per pass. Results are normalized by a fixed calibration loop, timed
+alongside each benchmark, so a baseline recorded on one machine is still
+meaningful on another and a busy machine slows both sides of the ratio.
+
+    python -m benchmarks.micro                     # compare against the baseline
+    python -m benchmarks.micro --update-baseline   # record a new baseline
+    python -m benchmarks.micro --filter date       # only benchmarks matching "date"
+
+Exits with status 1 when a benchmark is slower than its baseline by more than its
+threshold (default 1.25x).
+"""
+
+import argparse
+import logging
+import os
+import sys
+import timeit
+from typing import Callable, Dict, List, Optional, Tuple
+
+# The services read their URLs at import time; the microbenchmarks never call out
+os.environ.setdefault("EXTERNAL_CHAT_SERVICE_URL", "http://127.0.0.1:9/chat")
+os.environ.setdefault("EXTERNAL_EXTRACTINFO_SERVICE_URL", "http://127.0.0.1:9/extract")
+
+from benchmarks import corpus  # noqa: E402
+from benchmarks.common import (  # noqa: E402
+    REPO_ROOT,
+    load_results,
+    run_metadata,
+    write_results,
+)
+
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, "benchmarks", "baselines", "micro.json")
+DEFAULT_THRESHOLD = 1.25
+INTRO_AUDIO = os.path.join(REPO_ROOT, "audios", "introduction.mp3")
+INTRO_TRANSCRIPT = os.path.join(REPO_ROOT, "audios", "introduction.json")
+
+
+def _calibration():
+    """Fixed pure-Python workload every result is expressed relative to."""
+    total = 0
+    for i in range(20000):
+        total += i * i % 7
+    return total
+
+
+def build_benchmarks() -> Dict[str, Callable[[], object]]:
+    from api.routes.assistant_routes import clean_text_from_json
+    from api.services import date_converter
+    from api.services.extract_info_service import normalize_passengers
+    from api.services.file_service import FileService
+    from api.services.openai_service import normalize_chat_messages
+
+    def over(func, inputs):
+        def run():
+            for value in inputs:
+                func(value)
+
+        return run
+
+    return {
+        "clean_text_from_json": over(clean_text_from_json, corpus.TEXT_CORPUS),
+        "convert_to_standard_date": over(
+            date_converter.convert_to_standard_date, corpus.DATE_CORPUS
+        ),
+        "parse_persian_date": over(
+            date_converter._parse_persian_date, corpus.DATES_PERSIAN
+        ),
+        "parse_english_date": over(
+            date_converter._parse_english_date, corpus.DATES_ENGLISH
+        ),
+        "parse_numeric_date": over(
+            date_converter._parse_numeric_date, corpus.DATES_NUMERIC
+        ),
+        "normalize_chat_messages": over(
+            normalize_chat_messages, corpus.CHAT_SERVICE_BODIES
+        ),
+        "normalize_passengers": lambda: normalize_passengers(corpus.PASSENGERS),
+        "audio_file_to_base64": lambda: FileService.audio_file_to_base64(INTRO_AUDIO),
+        "read_json_transcript": lambda: FileService.read_json_transcript(
+            INTRO_TRANSCRIPT
+        ),
+    }
+
+
+def _loop_count(func: Callable[[], object], min_time: float) -> int:
+    number, _ = timeit.Timer(func).autorange()
+    return max(1, int(number * min_time / 0.2))
+
+
+def measure(
+    func: Callable[[], object], repeat: int, min_time: float
+) -> Tuple[float, float]:
+    """
+    (seconds per call, seconds per calibration loop) for func.
+
+    Each of the repeat rounds times the calibration loop right before the
+    benchmark, so both see the same machine state, and the fastest round of each
+    is kept: noise from other processes only ever adds time.
+    """
+    func_timer, calibration_timer = timeit.Timer(func), timeit.Timer(_calibration)
+    func_number = _loop_count(func, min_time)
+    calibration_number = _loop_count(_calibration, min_time)
+    func_runs, calibration_runs = [], []
+    for _ in range(repeat):
+        calibration_runs.append(calibration_timer.timeit(calibration_number))
+        func_runs.append(func_timer.timeit(func_number))
+    return (
+        min(func_runs) / func_number,
+        min(calibration_runs) / calibration_number,
+    )
+
+
+def run_one(func: Callable[[], object], repeat: int, min_time: float) -> dict:
+    seconds, calibration = measure(func, repeat, min_time)
+    return {
+        "ns_per_op": round(seconds * 1e9, 1),
+        "relative": round(seconds / calibration, 4),
+        "calibration_ns": round(calibration * 1e9, 1),
+    }
+
+
+def run(
+    names: List[str], benchmarks: Dict[str, Callable], repeat: int, min_time: float
+) -> dict:
+    results = {}
+    for name in names:
+        results[name] = run_one(benchmarks[name], repeat, min_time)
+        print(
+            f"  {name:<28} {results[name]['ns_per_op'] / 1e3:>10.2f} µs  "
+            f"({results[name]['relative']:.4f}x)"
+        )
+    return {"benchmarks": results}
+
+
+def compare(
+    results: dict,
+    baseline: dict,
+    recheck: Optional[Callable[[str], dict]] = None,
+) -> List[str]:
+    """
+    Names of the benchmarks slower than their baseline by more than their
+    threshold. A benchmark over the limit is measured again through recheck and
+    only counts when the faster of the two runs is still over it, so a burst of
+    load during one measurement does not fail the gate.
+    """
+    regressions = []
+    for name, current in results["benchmarks"].items():
+        reference = baseline.get("benchmarks", {}).get(name)
+        if not reference:
+            print(f"  {name:<28} no baseline")
+            continue
+        threshold = reference.get("threshold", DEFAULT_THRESHOLD)
+        ratio = current["relative"] / reference["relative"]
+        if ratio > threshold and recheck is not None:
+            again = recheck(name)
+            if again["relative"] < current["relative"]:
+                results["benchmarks"][name] = current = again
+            ratio = current["relative"] / reference["relative"]
+        status = "ok" if ratio <= threshold else "REGRESSION"
+        print(f"  {name:<28} {ratio:>6.2f}x of baseline (limit {threshold}x) {status}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--filter", default="", help="substring of benchmark names")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    # The helpers log every call; keep that out of the measurements
+    logging.disable(logging.CRITICAL)
+
+    benchmarks = build_benchmarks()
+    names = [name for name in benchmarks if args.filter in name]
+    print(f"⏱️  Running {len(names)} microbenchmarks")
+    results = run(names, benchmarks, args.repeat, args.min_time)
+    results["metadata"] = run_metadata(repeat=args.repeat, min_time=args.min_time)
+
+    if args.output:
+        write_results(args.output, results)
+
+    if args.update_baseline:
+        previous = {}
+        if os.path.exists(args.baseline):
+            previous = load_results(args.baseline).get("benchmarks", {})
+        for name, entry in results["benchmarks"].items():
+            entry["threshold"] = previous.get(name, {}).get(
+                "threshold", DEFAULT_THRESHOLD
+            )
+        if os.path.exists(args.baseline):
+            merged = load_results(args.baseline)
+            merged["benchmarks"].update(results["benchmarks"])
+            merged["metadata"] = results["metadata"]
+            merged.pop("calibration_ns", None)  # now recorded per benchmark
+            results = merged
+        write_results(args.baseline, results)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"⚠️  No baseline at {args.baseline}; run with --update-baseline")
+        return 0
+
+    print("📊 Compared to baseline")
+    regressions = compare(
+        results,
+        load_results(args.baseline),
+        lambda name: run_one(benchmarks[name], args.repeat, args.min_time),
+    )
+    if regressions:
+        print(f"❌ Regressions: {', '.join(regressions)}")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Answer cache builder
+ساخت پیشاپیش صدا و lipsync برای پاسخ‌های شیت دانش
+
+Synthesizes and lip-syncs every answer of the knowledge sheet into the artifact
+store, so /chat serves a reply that repeats a sheet answer without calling TTS
+or Rhubarb. Only answers that are new or changed since the last run are
+synthesized, unless --force is given. Each answer is voiced in the language it
+is written in.
+
+    python build_answer_cache.py
+    python build_answer_cache.py --workers 8 --source data/knowledge_base.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from dotenv import load_dotenv
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the answer cache")
+    parser.add_argument("--workers", type=int, default=4, help="parallel syntheses")
+    parser.add_argument("--force", action="store_true", help="rebuild every answer")
+    parser.add_argument(
+        "--source", help="knowledge base snapshot to read instead of the sheet"
+    )
+    parser.add_argument("--manifest", help="default: data/answer_cache.json")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if args.manifest:
+        os.environ["ANSWER_CACHE_MANIFEST"] = args.manifest
+
+    from api.services import answer_cache_service
+    from api.services.artifact_store_service import (
+        MemoryArtifactStore,
+        get_artifact_store,
+    )
+    from api.services.lipsync_service import LipSyncService
+    from api.services.tts_service import get_tts_router
+
+    if isinstance(get_artifact_store(), MemoryArtifactStore):
+        # The clips would vanish with this process while the manifest points at them
+        print(
+            "❌ ARTIFACT_STORE=memory is private to each process; build in the app "
+            "with ANSWER_CACHE_BUILD=startup or background instead"
+        )
+        return False
+
+    if args.source:
+        with open(args.source, "r", encoding="utf-8") as f:
+            rows = json.load(f)["items"]
+    else:
+        from api.services.knowledge_base_service import get_knowledge_base_cache
+
+        knowledge_base = get_knowledge_base_cache().get()
+        if knowledge_base.source == "empty":
+            print("❌ Could not load the knowledge base")
+            return False
+        rows = knowledge_base.items
+
+    print("🔊 Building answer cache...")
+    print("=" * 50)
+    print(f"   - {len(rows)} knowledge rows, {args.workers} workers")
+
+    result = answer_cache_service.build_answers(
+        rows,
+        get_tts_router(),
+        LipSyncService(),
+        manifest_path=answer_cache_service.MANIFEST_PATH,
+        workers=args.workers,
+        force=args.force,
+    )
+    print("=" * 50)
+    print(
+        f"✅ Built: {result['built']}, kept: {result['kept']}, "
+        f"removed: {result['removed']}"
+    )
+    if result["failed"]:
+        print(f"❌ Failed ({len(result['failed'])}):")
+        for text in result["failed"]:
+            print(f"   - {text[:80]}")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Phrase library builder
+ساخت صدا و lipsync برای جمله‌های پرتکرار دستیار
+
+Synthesizes and lip-syncs the curated phrases in audios/phrases/phrases.json so
+/chat can serve them without calling TTS or Rhubarb. Run it again after editing
+the list; phrases that are already built are kept unless --force is given.
+
+    python build_phrase_library.py
+    python build_phrase_library.py --languages fa --force
+"""
+
+import argparse
+import json
+import os
+import sys
+from dotenv import load_dotenv
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the phrase library")
+    parser.add_argument("--languages", default="fa,en", help="comma-separated")
+    parser.add_argument("--force", action="store_true", help="rebuild every phrase")
+    parser.add_argument("--source", help="phrase list (default: <dir>/phrases.json)")
+    parser.add_argument("--dir", help="output directory (default: audios/phrases)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if args.dir:
+        os.environ["PHRASE_LIBRARY_DIR"] = args.dir
+
+    from api.services import phrase_library_service
+    from api.services.lipsync_service import LipSyncService
+    from api.services.tts_service import get_tts_router
+
+    directory = phrase_library_service.PHRASES_DIR
+    source = args.source or os.path.join(directory, phrase_library_service.SOURCE_FILE)
+    with open(source, "r", encoding="utf-8") as f:
+        phrases = json.load(f)
+    languages = [language.strip() for language in args.languages.split(",")]
+    sources = {language: phrases.get(language, []) for language in languages}
+
+    print("🔊 Building phrase library...")
+    print("=" * 50)
+    for language, texts in sources.items():
+        print(f"   - {language}: {len(texts)} phrases")
+
+    result = phrase_library_service.build_library(
+        sources, get_tts_router(), LipSyncService(), directory, force=args.force
+    )
+    print("=" * 50)
+    print(f"✅ Built: {result['built']}, kept: {result['kept']}")
+    if result["failed"]:
+        print(f"❌ Failed ({len(result['failed'])}):")
+        for text in result["failed"]:
+            print(f"   - {text}")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1 @@
+# Local stand-ins for the external services used by the API
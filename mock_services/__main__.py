@@ -0,0 +1,37 @@
+import argparse
+
+import uvicorn
+
+from mock_services.app import create_app
+from mock_services.profiles import BUILTIN_PROFILES, load_profile
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run local stand-ins for the chat, extract-info, Avashow and ElevenLabs services"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4100)
+    parser.add_argument(
+        "--profile",
+        default="fast",
+        help=f"built-in profile ({', '.join(BUILTIN_PROFILES)}) or path to a JSON profile",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    base = f"http://{args.host}:{args.port}"
+    print("🧪 Point the API at the stand-ins with:")
+    print(f"   EXTERNAL_CHAT_SERVICE_URL={base}/chat")
+    print(f"   EXTERNAL_EXTRACTINFO_SERVICE_URL={base}/extract-info")
+    print(f"   AVASHOW_API_URL={base}/TextToSpeech/v1/longText")
+    print(f"   EXTERNAL_ELEVENLABS_SERVICE_URL={base}/elevenlabs")
+    print("   AVASHOW_GATEWAY_TOKEN=<any non-empty value>")
+    print(f"   ARTIFACT_STORE=s3 ARTIFACT_S3_ENDPOINT_URL={base}/s3")
+
+    app = create_app(load_profile(args.profile, args.seed))
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
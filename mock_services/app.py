@@ -0,0 +1,310 @@
+import os
+import json
+import uuid
+import base64
+import asyncio
+import re
+import hashlib
+import logging
+from collections import Counter
+from typing import Optional
+
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from mock_services.profiles import MockProfile, load_profile
+
+logger = logging.getLogger(__name__)
+
+CLIPS_DIR = os.path.join(os.path.dirname(__file__), "clips")
+
+# Pause markers the API puts between messages of a batched TTS request
+PAUSE_MARKER_RE = re.compile(r"<break[^>]*/>|\n\.\.\.\n")
+
+CANNED_REPLIES = {
+    "fa": [
+        {
+            "text": "سالن CIP فرودگاه امام خمینی لانژ اختصاصی، رستوران و اینترنت پرسرعت دارد.",
+            "facialExpression": "smile",
+            "animation": "Talking_0",
+        },
+        {
+            "text": "خدمات ویلچر و پذیرش حیوان خانگی هم ارائه می‌شود.",
+            "facialExpression": "smile",
+            "animation": "Talking_1",
+        },
+        {
+            "text": "اگه سوال دیگه‌ای داری، بگو تا راهنماییت کنم.",
+            "facialExpression": "default",
+            "animation": "Talking_2",
+        },
+    ],
+    "en": [
+        {
+            "text": "The CIP lounge at Imam Khomeini Airport offers a private lounge, a restaurant and fast internet.",
+            "facialExpression": "smile",
+            "animation": "Talking_0",
+        },
+        {
+            "text": "Wheelchair service and pet acceptance are also available.",
+            "facialExpression": "smile",
+            "animation": "Talking_1",
+        },
+        {
+            "text": "How else can I help you?",
+            "facialExpression": "default",
+            "animation": "Talking_2",
+        },
+    ],
+}
+
+
+def _read_clip(language: str) -> bytes:
+    name = "en.mp3" if (language or "").lower().startswith("en") else "fa.mp3"
+    with open(os.path.join(CLIPS_DIR, name), "rb") as f:
+        return f.read()
+
+
+def _read_silence() -> bytes:
+    with open(os.path.join(CLIPS_DIR, "silence.mp3"), "rb") as f:
+        return f.read()
+
+
+def _segment_count(text: str) -> int:
+    return max(1, sum(1 for part in PAUSE_MARKER_RE.split(text) if part.strip()))
+
+
+def create_app(profile: Optional[MockProfile] = None) -> FastAPI:
+    """Build the stand-in app imitating every external service the API calls."""
+    profile = profile or load_profile(
+        os.getenv("MOCK_PROFILE", "fast"), int(os.getenv("MOCK_SEED", "0"))
+    )
+    app = FastAPI(title="Airport AI Assistant external service stand-ins")
+    app.state.profile = profile
+    app.state.clips = {"fa": _read_clip("fa"), "en": _read_clip("en")}
+    app.state.silence = _read_silence()
+    app.state.files = {}
+    app.state.objects = {}  # (bucket, key) -> (body, content type)
+    app.state.requests = Counter()
+    app.state.errors = Counter()
+
+    async def simulate(endpoint: str) -> float:
+        """Sleep for a sampled latency, or fail with the endpoint's error status."""
+        behavior = profile[endpoint]
+        app.state.requests[endpoint] += 1
+        latency = behavior.sample_latency()
+        if behavior.should_fail():
+            app.state.errors[endpoint] += 1
+            await asyncio.sleep(latency / 2)
+            raise HTTPException(
+                status_code=behavior.error_status,
+                detail=f"simulated {endpoint} failure",
+            )
+        return latency
+
+    def synthesize(endpoint: str, text: str, language: str, latency: float):
+        """One clip per pause-separated segment, joined by 1.2 s of silence."""
+        segments = _segment_count(text)
+        clip = app.state.clips[language]
+        audio = clip + (app.state.silence + clip) * (segments - 1)
+        cost = float(profile[endpoint].config.get("segment_cost", 0.35))
+        return audio, latency * (1 + cost * (segments - 1))
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", "profile": profile.name}
+
+    @app.get("/__stats")
+    async def stats():
+        return {
+            "profile": profile.name,
+            "requests": dict(app.state.requests),
+            "errors": dict(app.state.errors),
+            "stored_files": len(app.state.files),
+            "stored_objects": len(app.state.objects),
+        }
+
+    @app.post("/chat")
+    async def chat(request: Request):
+        """Contract of EXTERNAL_CHAT_SERVICE_URL used by OpenAIService."""
+        body = await request.json()
+        language = "en" if str(body.get("language", "fa")).startswith("en") else "fa"
+        latency = await simulate("chat")
+        replies = CANNED_REPLIES[language]
+        count = (
+            1 + int(hashlib.md5(body.get("message", "").encode()).hexdigest(), 16) % 3
+        )
+        messages = replies[:count]
+
+        behavior = profile["chat"]
+        if not behavior.config.get("stream"):
+            await asyncio.sleep(latency)
+            return {"messages": messages}
+
+        interval = float(behavior.config.get("stream_interval", 0.5))
+
+        async def stream_messages():
+            # Time to the first message is the sampled latency, then one per interval
+            await asyncio.sleep(latency)
+            yield b'{"messages": ['
+            for index, message in enumerate(messages):
+                if index:
+                    await asyncio.sleep(interval)
+                    yield b", "
+                yield json.dumps(message, ensure_ascii=False).encode()
+            yield b"]}"
+
+        return StreamingResponse(stream_messages(), media_type="application/json")
+
+    @app.post("/extract-info")
+    async def extract_info(request: Request):
+        """Contract of EXTERNAL_EXTRACTINFO_SERVICE_URL used by ExtractInfoService."""
+        body = await request.json()
+        await asyncio.sleep(await simulate("extract_info"))
+        client_texts = [
+            m.get("text", "")
+            for m in body.get("messages", [])
+            if m.get("sender") == "CLIENT"
+        ]
+        return {
+            "airportName": "فرودگاه امام خمینی",
+            "travelType": "خروجی",
+            "travelDate": "۲۸ سپتامبر ۲۰۲۵",
+            "passengerCount": "2",
+            "additionalInfo": " ".join(client_texts)[:200],
+            "flightNumber": "IR712",
+            "passengers": [
+                {
+                    "name": "علی",
+                    "lastName": "رضایی",
+                    "nationalId": "0012345678",
+                    "passportNumber": "",
+                    "baggageCount": "2",
+                    "passengerType": "بزرگسال",
+                    "gender": "مرد",
+                },
+                {
+                    "name": "Sara",
+                    "lastName": "Ahmadi",
+                    "nationalId": "",
+                    "passportNumber": "X1234567",
+                    "luggageCount": 1,
+                    "passengerType": "adult",
+                    "gender": "female",
+                    "nationality": "غیر ایرانی",
+                },
+            ],
+        }
+
+    @app.post("/TextToSpeech/v1/longText")
+    async def avashow_long_text(
+        request: Request, gateway_token: Optional[str] = Header(None)
+    ):
+        """Contract of AVASHOW_API_URL used by AvashowService (filePath and base64)."""
+        if not gateway_token:
+            raise HTTPException(status_code=401, detail="missing gateway-token")
+        body = json.loads(await request.body())
+        if not body.get("data"):
+            raise HTTPException(status_code=400, detail="missing data")
+        audio, latency = synthesize(
+            "avashow", body["data"], "fa", await simulate("avashow")
+        )
+        await asyncio.sleep(latency)
+
+        data = {"checksum": hashlib.md5(audio).hexdigest()}
+        if str(body.get("base64", "0")).lower() in ("1", "true"):
+            data["base64"] = base64.b64encode(audio).decode()
+        if str(body.get("filePath", "true")).lower() in ("1", "true"):
+            file_id = uuid.uuid4().hex
+            app.state.files[file_id] = audio
+            base_url = str(request.base_url).rstrip("/")
+            data["filePath"] = f"{base_url}/files/{file_id}.mp3"
+        return {
+            "data": {"status": "success", "data": data},
+            "meta": {"shamsiDate": "1404/07/27"},
+        }
+
+    @app.get("/files/{file_name}")
+    async def avashow_file(file_name: str):
+        """Second hop of the Avashow flow: download the synthesized mp3."""
+        audio = app.state.files.pop(file_name.rsplit(".", 1)[0], None)
+        if audio is None:
+            raise HTTPException(status_code=404, detail="file not found")
+        await asyncio.sleep(await simulate("avashow_file"))
+        return Response(content=audio, media_type="audio/mpeg")
+
+    @app.post("/elevenlabs")
+    async def elevenlabs(request: Request):
+        """Contract of EXTERNAL_ELEVENLABS_SERVICE_URL used by ElevenLabsService."""
+        body = await request.json()
+        if not body.get("text"):
+            return JSONResponse(status_code=422, content={"detail": "missing text"})
+        audio, latency = synthesize(
+            "elevenlabs", body["text"], "en", await simulate("elevenlabs")
+        )
+        first_byte = latency * float(
+            profile["elevenlabs"].config.get("first_byte_fraction", 1.0)
+        )
+
+        async def stream_audio():
+            await asyncio.sleep(first_byte)
+            chunk_size = 4096
+            chunks = max(1, (len(audio) + chunk_size - 1) // chunk_size)
+            per_chunk = (latency - first_byte) / chunks
+            for start in range(0, len(audio), chunk_size):
+                yield audio[start : start + chunk_size]
+                if per_chunk:
+                    await asyncio.sleep(per_chunk)
+
+        return StreamingResponse(stream_audio(), media_type="audio/mpeg")
+
+    @app.put("/s3/{bucket}/{key:path}")
+    async def s3_put_object(bucket: str, key: str, request: Request):
+        """PutObject of an S3-compatible store (path-style, no auth checks)."""
+        await asyncio.sleep(await simulate("s3"))
+        body = await request.body()
+        content_type = request.headers.get("content-type", "binary/octet-stream")
+        app.state.objects[(bucket, key)] = (body, content_type)
+        return Response(headers={"ETag": f'"{hashlib.md5(body).hexdigest()}"'})
+
+    @app.api_route("/s3/{bucket}/{key:path}", methods=["GET", "HEAD"])
+    async def s3_get_object(
+        bucket: str, key: str, request: Request, range: Optional[str] = Header(None)
+    ):
+        """GetObject / HeadObject, with single byte ranges."""
+        await asyncio.sleep(await simulate("s3"))
+        stored = app.state.objects.get((bucket, key))
+        if stored is None:
+            return Response(
+                status_code=404,
+                content=(
+                    "<Error><Code>NoSuchKey</Code>"
+                    "<Message>The specified key does not exist.</Message></Error>"
+                ),
+                media_type="application/xml",
+            )
+        body, content_type = stored
+        headers = {
+            "ETag": f'"{hashlib.md5(body).hexdigest()}"',
+            "Accept-Ranges": "bytes",
+            "Last-Modified": "Mon, 20 Oct 2025 00:00:00 GMT",
+        }
+        status_code = 200
+        if range and range.startswith("bytes="):
+            first, _, last = range[len("bytes=") :].partition("-")
+            start = int(first) if first else max(0, len(body) - int(last))
+            end = min(int(last), len(body) - 1) if first and last else len(body) - 1
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+            body = body[start : end + 1]
+            status_code = 206
+        if request.method == "HEAD":
+            headers["Content-Length"] = str(len(body))
+            body = b""
+        return Response(
+            content=body,
+            status_code=status_code,
+            media_type=content_type,
+            headers=headers,
+        )
+
+    return app
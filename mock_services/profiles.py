@@ -0,0 +1,160 @@
+import json
+import math
+import random
+import time
+import threading
+from typing import Dict, Optional
+
+# Per-endpoint latency and failure behaviour. Latencies are in seconds.
+#   distribution: "constant" | "uniform" | "lognormal"
+#   median / low / high / sigma: parameters of the distribution
+#   error_rate: fraction of requests answered with error_status
+#   cold_start: extra delay for the first request after idle_after seconds of idleness
+#   stream / stream_interval: chat only; send the messages one by one, this many
+#       seconds apart, instead of one JSON body
+#   segment_cost: TTS only; extra latency, as a fraction of the sample, for each
+#       additional pause-separated segment in one request (default 0.35)
+BUILTIN_PROFILES: Dict[str, Dict[str, dict]] = {
+    "fast": {
+        "chat": {"distribution": "constant", "median": 0.05},
+        "extract_info": {"distribution": "constant", "median": 0.05},
+        "avashow": {"distribution": "constant", "median": 0.05},
+        "avashow_file": {"distribution": "constant", "median": 0.01},
+        "elevenlabs": {"distribution": "constant", "median": 0.05},
+        "s3": {"distribution": "constant", "median": 0.005},
+    },
+    "realistic": {
+        "chat": {
+            "distribution": "lognormal",
+            "median": 1.8,
+            "sigma": 0.45,
+            "error_rate": 0.01,
+            "cold_start": {"idle_after": 300, "delay": 6.0},
+            "stream": True,
+            "stream_interval": 0.6,
+        },
+        "extract_info": {"distribution": "lognormal", "median": 1.5, "sigma": 0.4},
+        "avashow": {
+            "distribution": "lognormal",
+            "median": 1.2,
+            "sigma": 0.5,
+            "error_rate": 0.02,
+        },
+        "avashow_file": {"distribution": "lognormal", "median": 0.25, "sigma": 0.4},
+        "elevenlabs": {
+            "distribution": "lognormal",
+            "median": 0.9,
+            "sigma": 0.4,
+            "first_byte_fraction": 0.3,
+        },
+        "s3": {"distribution": "lognormal", "median": 0.03, "sigma": 0.4},
+    },
+    "degraded": {
+        "chat": {
+            "distribution": "lognormal",
+            "median": 3.5,
+            "sigma": 0.8,
+            "error_rate": 0.1,
+            "cold_start": {"idle_after": 60, "delay": 12.0},
+            "stream": True,
+            "stream_interval": 1.0,
+        },
+        "extract_info": {
+            "distribution": "lognormal",
+            "median": 3.0,
+            "sigma": 0.7,
+            "error_rate": 0.05,
+        },
+        "avashow": {
+            "distribution": "lognormal",
+            "median": 2.5,
+            "sigma": 0.8,
+            "error_rate": 0.1,
+            "error_status": 429,
+        },
+        "avashow_file": {"distribution": "uniform", "low": 0.2, "high": 1.5},
+        "elevenlabs": {
+            "distribution": "lognormal",
+            "median": 2.0,
+            "sigma": 0.7,
+            "error_rate": 0.05,
+        },
+        "s3": {"distribution": "uniform", "low": 0.05, "high": 0.5},
+    },
+}
+
+
+class EndpointBehavior:
+    """Samples latency, errors and cold starts for one stand-in endpoint."""
+
+    def __init__(self, name: str, config: Optional[dict], rng: random.Random):
+        config = config or {}
+        self.name = name
+        self.config = config
+        self.distribution = config.get("distribution", "constant")
+        self.median = float(config.get("median", 0.0))
+        self.sigma = float(config.get("sigma", 0.5))
+        self.low = float(config.get("low", 0.0))
+        self.high = float(config.get("high", self.low))
+        self.error_rate = float(config.get("error_rate", 0.0))
+        self.error_status = int(config.get("error_status", 503))
+        self.cold_start = config.get("cold_start") or {}
+        self._rng = rng
+        self._lock = threading.Lock()
+        self._last_request_at = None
+
+    def sample_latency(self) -> float:
+        with self._lock:
+            if self.distribution == "uniform":
+                latency = self._rng.uniform(self.low, self.high)
+            elif self.distribution == "lognormal" and self.median > 0:
+                latency = self._rng.lognormvariate(math.log(self.median), self.sigma)
+            else:
+                latency = self.median
+
+            now = time.monotonic()
+            idle_after = self.cold_start.get("idle_after")
+            if idle_after is not None and (
+                self._last_request_at is None
+                or now - self._last_request_at > float(idle_after)
+            ):
+                latency += float(self.cold_start.get("delay", 0.0))
+            self._last_request_at = now
+        return max(latency, 0.0)
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+
+class MockProfile:
+    """All endpoint behaviours of one latency profile."""
+
+    ENDPOINTS = (
+        "chat",
+        "extract_info",
+        "avashow",
+        "avashow_file",
+        "elevenlabs",
+        "s3",
+    )
+
+    def __init__(self, name: str, endpoints: Dict[str, dict], seed: int = 0):
+        self.name = name
+        rng = random.Random(seed)
+        self.endpoints = {
+            endpoint: EndpointBehavior(endpoint, endpoints.get(endpoint), rng)
+            for endpoint in self.ENDPOINTS
+        }
+
+    def __getitem__(self, endpoint: str) -> EndpointBehavior:
+        return self.endpoints[endpoint]
+
+
+def load_profile(name_or_path: str = "fast", seed: int = 0) -> MockProfile:
+    """Load a built-in profile by name, or a JSON file with the same structure."""
+    if name_or_path in BUILTIN_PROFILES:
+        return MockProfile(name_or_path, BUILTIN_PROFILES[name_or_path], seed)
+    with open(name_or_path, "r", encoding="utf-8") as f:
+        endpoints = json.load(f)
+    return MockProfile(name_or_path, endpoints, seed)
@@ -0,0 +1,92 @@
+import json
+import os
+
+from api.services.answer_cache_service import (
+    AnswerCache,
+    build_answers,
+    manifest_keys,
+    read_manifest,
+)
+from api.services.artifact_store_service import MemoryArtifactStore
+
+
+class FakeRouter:
+    def __init__(self):
+        self.texts = []
+
+    def synthesize(self, text, file_name, language):
+        self.texts.append(text)
+        with open(file_name, "wb") as f:
+            f.write(f"mp3 of {text}".encode())
+        return "fake"
+
+
+class FakeLipSync:
+    def mp3_to_wav(self, mp3_path, wav_path):
+        with open(mp3_path, "rb") as source, open(wav_path, "wb") as f:
+            f.write(source.read())
+
+    def wav_to_lipsync_json(self, wav_path, json_path):
+        with open(json_path, "w") as f:
+            json.dump({"mouthCues": [{"start": 0, "end": 0.1, "value": "X"}]}, f)
+
+
+def build(rows, store, manifest, **kwargs):
+    router = FakeRouter()
+    result = build_answers(rows, router, FakeLipSync(), store, manifest, **kwargs)
+    return result, router.texts
+
+
+def test_rebuilds_only_new_and_edited_answers(tmp_path):
+    store = MemoryArtifactStore(1024 * 1024)
+    manifest = str(tmp_path / "answer_cache.json")
+    rows = [{"answer": "دفتر از ۹ تا ۱۷ باز است"}, {"answer": "We open at 9."}]
+
+    result, synthesized = build(rows, store, manifest)
+    assert (result["built"], result["kept"]) == (2, 0)
+    assert sorted(synthesized) == sorted(row["answer"] for row in rows)
+    languages = {e["text"]: e["language"] for e in read_manifest(manifest).values()}
+    assert languages == {rows[0]["answer"]: "fa", rows[1]["answer"]: "en"}
+
+    rows[1] = {"answer": "We open at 10."}
+    result, synthesized = build(rows, store, manifest)
+    assert (result["built"], result["kept"], result["removed"]) == (1, 1, 1)
+    assert synthesized == ["We open at 10."]
+
+    result, synthesized = build(rows, store, manifest, force=True)
+    assert (result["built"], result["kept"]) == (2, 0)
+
+
+def test_lookup_serves_a_manifest_rebuilt_by_another_process(tmp_path):
+    store = MemoryArtifactStore(1024 * 1024)
+    manifest = str(tmp_path / "answer_cache.json")
+    cache = AnswerCache(manifest, store)
+    assert cache.lookup("We open at 9.", "en") is None
+
+    # What build_answer_cache.py does while the app is running
+    build([{"answer": "We open at 9."}], store, manifest)
+    answer = cache.lookup("we open at 9", "en")
+    assert answer is not None and answer.served_by == "answer_cache"
+    audio, lipsync = answer.load_bytes()
+    assert audio == b"mp3 of We open at 9."
+    assert lipsync["mouthCues"][0]["value"] == "X"
+
+    build([{"answer": "We open at 10."}], store, manifest)
+    assert cache.lookup("We open at 9.", "en") is None
+    assert cache.lookup("We open at 10.", "en") is not None
+    # The janitor's keep-set follows the rebuild too
+    assert answer.audio_key not in manifest_keys(manifest)
+    assert len(manifest_keys(manifest)) == 2
+
+
+def test_unreadable_manifest_keeps_the_loaded_answers(tmp_path):
+    store = MemoryArtifactStore(1024 * 1024)
+    manifest = str(tmp_path / "answer_cache.json")
+    build([{"answer": "We open at 9."}], store, manifest)
+    cache = AnswerCache(manifest, store)
+
+    partial = manifest + ".part"
+    with open(partial, "w") as f:
+        f.write("{not json")
+    os.replace(partial, manifest)
+    assert cache.lookup("We open at 9.", "en") is not None
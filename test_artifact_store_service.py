@@ -0,0 +1,120 @@
+import time
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routes import artifact_routes
+from api.services import artifact_store_service
+from api.services.artifact_store_service import (
+    ARTIFACT_ROUTE,
+    MemoryArtifactStore,
+    parse_range,
+    signed_url,
+    verify_signature,
+)
+
+CLIP = bytes(range(256)) * 4
+
+
+def url_parts(url):
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    return parsed.path.rsplit("/", 1)[1], int(query["expires"][0]), query["sig"][0]
+
+
+def test_signed_url_verifies_until_it_expires(monkeypatch):
+    monkeypatch.setattr(artifact_store_service.time, "time", lambda: 1000.0)
+    key, expires, sig = url_parts(signed_url("ab" * 16 + ".mp3", ttl=300))
+    assert 1000 + 300 <= expires <= 1000 + 600
+    # The same clip within the ttl window gets the same, cacheable URL
+    monkeypatch.setattr(artifact_store_service.time, "time", lambda: 1100.0)
+    assert url_parts(signed_url(key, ttl=300)) == (key, expires, sig)
+
+    assert verify_signature(key, expires, sig)
+    assert not verify_signature(key, expires + 1, sig)
+    assert not verify_signature("cd" * 16 + ".mp3", expires, sig)
+    assert not verify_signature(key, expires, "")
+    monkeypatch.setattr(artifact_store_service.time, "time", lambda: expires + 1.0)
+    assert not verify_signature(key, expires, sig)
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, None),
+        ("bytes=0-99", {"start": 0, "end": 99}),
+        ("bytes=1000-", {"start": 1000, "end": 1023}),
+        ("bytes=1000-5000", {"start": 1000, "end": 1023}),
+        ("bytes=-24", {"start": 1000, "end": 1023}),
+        ("bytes=-5000", {"start": 0, "end": 1023}),
+        ("bytes=0-1,5-9", None),
+        ("items=0-1", None),
+        ("bytes=a-b", None),
+    ],
+)
+def test_parse_range(header, expected):
+    assert parse_range(header, len(CLIP)) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1024-", "bytes=9-3"])
+def test_unsatisfiable_range(header):
+    with pytest.raises(ValueError):
+        parse_range(header, len(CLIP))
+
+
+def test_memory_eviction_does_not_break_a_clip_being_served():
+    store = MemoryArtifactStore(max_bytes=len(CLIP))
+    artifact = store.get(store.put(CLIP).key)
+    chunks = store.iter_range(artifact, 0, artifact.size - 1)
+    store.put(b"another clip that evicts the first")
+    assert store.get(artifact.key) is None
+    assert b"".join(chunks) == CLIP
+
+
+@pytest.fixture
+def client(monkeypatch):
+    store = MemoryArtifactStore(max_bytes=1 << 20)
+    monkeypatch.setattr(artifact_routes, "get_artifact_store", lambda: store)
+    app = FastAPI()
+    app.include_router(artifact_routes.router, prefix="/api/v1")
+    return TestClient(app), store
+
+
+def test_route_serves_ranges_and_etags(client):
+    client, store = client
+    url = signed_url(store.put(CLIP).key)
+
+    response = client.get(url)
+    assert response.status_code == 200 and response.content == CLIP
+    etag = response.headers["etag"]
+
+    response = client.get(url, headers={"Range": "bytes=-24"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == "bytes 1000-1023/1024"
+    assert response.content == CLIP[1000:]
+
+    response = client.get(url, headers={"Range": "bytes=2000-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */1024"
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_route_rejects_bad_signatures_and_unknown_keys(client):
+    client, store = client
+    key, expires, sig = url_parts(signed_url(store.put(CLIP).key))
+    assert (
+        client.get(f"{ARTIFACT_ROUTE}/{key}?expires={expires}&sig=0").status_code == 403
+    )
+    past = int(time.time()) - 1
+    stale = artifact_store_service._signature(key, past)
+    assert (
+        client.get(f"{ARTIFACT_ROUTE}/{key}?expires={past}&sig={stale}").status_code
+        == 403
+    )
+
+    missing = "ef" * 16 + ".mp3"
+    query = urlparse(signed_url(missing)).query
+    assert client.get(f"{ARTIFACT_ROUTE}/{missing}?{query}").status_code == 404
@@ -0,0 +1,145 @@
+import base64
+import hashlib
+import io
+import json
+
+import pytest
+
+from api.services.avashow_service import (
+    AvashowService,
+    _decode_inline_audio,
+    get_session,
+)
+
+AUDIO = b"ID3\x04mp3 frames"
+
+
+class Response:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, data=None, content=b""):
+        self.data = data
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"data": {"data": self.data}}
+
+    def iter_content(self, chunk_size):
+        yield self.content
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class FakeSession:
+    """Answers each longText call with the next scripted data dict."""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.posts = []
+        self.downloads = []
+
+    def post(self, url, headers, data, timeout):
+        self.posts.append(json.loads(data))
+        return Response(self.answers.pop(0))
+
+    def get(self, url, timeout, stream):
+        self.downloads.append(url)
+        return Response(content=AUDIO)
+
+
+def make_service(monkeypatch, session, retry_as_file=False):
+    monkeypatch.setenv("AVASHOW_AUDIO_MODE", "base64")
+    monkeypatch.setenv("AVASHOW_INLINE_RETRY_AS_FILE", str(retry_as_file).lower())
+    service = AvashowService()
+    service.url = "https://avashow.test/longText"
+    service.session = session
+    return service
+
+
+def inline(audio=AUDIO, checksum=None):
+    return {
+        "base64": base64.b64encode(audio).decode(),
+        "checksum": checksum or hashlib.md5(audio).hexdigest(),
+    }
+
+
+def test_inline_audio_is_checked_against_its_md5():
+    assert _decode_inline_audio(inline()) == AUDIO
+    assert _decode_inline_audio(inline(checksum="0" * 32)) is None
+    # Checksums in an undocumented format are passed through unverified
+    assert _decode_inline_audio(inline(checksum="sha1:abc")) == AUDIO
+    assert _decode_inline_audio({"base64": "not base64!"}) is None
+    assert _decode_inline_audio({}) is None
+
+
+def test_inline_audio_is_saved_from_one_request(monkeypatch):
+    session = FakeSession(inline())
+    out = io.BytesIO()
+    make_service(monkeypatch, session).text_to_speech("سلام", out)
+    assert out.getvalue() == AUDIO
+    assert [post["base64"] for post in session.posts] == ["1"]
+    assert session.downloads == []
+
+
+def test_bad_inline_audio_downloads_the_file_path_instead(monkeypatch):
+    session = FakeSession(dict(inline(checksum="0" * 32), filePath="files.test/a.mp3"))
+    out = io.BytesIO()
+    make_service(monkeypatch, session).text_to_speech("سلام", out)
+    assert out.getvalue() == AUDIO
+    assert len(session.posts) == 1
+    assert session.downloads == ["https://files.test/a.mp3"]
+
+
+def test_no_usable_audio_fails_without_a_second_synthesis(monkeypatch):
+    session = FakeSession(inline(checksum="0" * 32))
+    with pytest.raises(Exception, match="No usable inline audio"):
+        make_service(monkeypatch, session).text_to_speech("سلام", io.BytesIO())
+    assert len(session.posts) == 1
+
+
+def test_retry_as_file_only_when_configured(monkeypatch):
+    session = FakeSession({}, {"filePath": "https://files.test/b.mp3"})
+    out = io.BytesIO()
+    service = make_service(monkeypatch, session, retry_as_file=True)
+    service.text_to_speech("سلام", out)
+    assert out.getvalue() == AUDIO
+    assert [post["filePath"] for post in session.posts] == ["false", "true"]
+
+
+class BrokenDownload(FakeSession):
+    def get(self, url, timeout, stream):
+        response = Response()
+
+        def iter_content(chunk_size):
+            yield AUDIO[:4]
+            raise ConnectionError("download dropped")
+
+        response.iter_content = iter_content
+        return response
+
+
+def test_download_streams_to_the_sink_and_never_leaves_a_partial_file(
+    monkeypatch, tmp_path
+):
+    assert AvashowService().session is get_session()
+
+    target = tmp_path / "message.mp3"
+    sink = io.BytesIO()
+    session = FakeSession({"filePath": "files.test/a.mp3"})
+    service = make_service(monkeypatch, session)
+    service.text_to_speech("سلام", str(target), mode="filepath", sink=sink)
+    assert target.read_bytes() == sink.getvalue() == AUDIO
+
+    target.unlink()
+    service.session = BrokenDownload({"filePath": "files.test/a.mp3"})
+    with pytest.raises(ConnectionError):
+        service.text_to_speech("سلام", str(target), mode="filepath")
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,36 @@
+import pytest
+
+from api.services.batch_tts_service import plan_split
+
+
+def test_cuts_at_the_longest_pauses_in_order():
+    # Three messages of similar length with short pauses inside them
+    silences = [(1.0, 1.1), (2.9, 3.5), (4.2, 4.3), (6.1, 6.6), (7.5, 7.55)]
+    cuts, confidence = plan_split(silences, duration=9.0, weights=[30, 30, 30])
+    assert cuts == pytest.approx([3.2, 6.35])
+    assert confidence > 0.7
+
+
+def test_single_message_needs_no_cut():
+    assert plan_split([], duration=3.0, weights=[12]) == ([], 1.0)
+
+
+def test_too_few_interior_silences():
+    # Silence at the very start and end of the clip is not a pause between messages
+    silences = [(0.0, 0.04), (4.98, 5.0)]
+    assert plan_split(silences, duration=5.0, weights=[10, 10]) == (None, 0.0)
+
+
+def test_ambiguous_pauses_lower_the_confidence():
+    # Both pauses are equally long: nothing tells the real one from the other
+    silences = [(2.0, 2.4), (6.0, 6.4)]
+    _, confidence = plan_split(silences, duration=8.0, weights=[10, 10])
+    assert confidence == pytest.approx(0.0)
+
+
+def test_cuts_far_from_the_text_proportions_lower_the_confidence():
+    # A clear pause, but at 10% of the clip for two equally long messages
+    silences = [(0.9, 1.6), (5.0, 5.05)]
+    cuts, confidence = plan_split(silences, duration=10.0, weights=[50, 50])
+    assert cuts == pytest.approx([1.25])
+    assert confidence < 0.5
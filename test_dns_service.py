@@ -0,0 +1,102 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from api.services.dns_service import DNSResolverCache
+
+
+class ScriptedResolver(DNSResolverCache):
+    """Answers lookups from a script; an Exception in it is raised."""
+
+    def __init__(self, *answers):
+        super().__init__(ttl=300, negative_ttl=30, resolve_timeout=1)
+        self.answers = list(answers)
+        self.lookups = 0
+        self.looked_up = threading.Event()
+
+    def _lookup(self, host):
+        self.lookups += 1
+        answer = self.answers.pop(0) if len(self.answers) > 1 else self.answers[0]
+        self.looked_up.set()
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+def expire(resolver, host):
+    resolver._entries[host].expires_at = 0
+
+
+def wait_for_refresh(resolver, host):
+    resolver.looked_up.wait(1)
+    for _ in range(100):
+        if not resolver._entries[host].refreshing:
+            return
+        time.sleep(0.01)
+
+
+def test_answers_are_cached_until_the_ttl():
+    resolver = ScriptedResolver(["10.0.0.1", "10.0.0.2"])
+    assert resolver.resolve("chat.test") == ["10.0.0.1", "10.0.0.2"]
+    assert resolver.resolve("chat.test") == ["10.0.0.1", "10.0.0.2"]
+    assert resolver.lookups == 1
+    assert resolver.resolve("10.1.2.3") == ["10.1.2.3"]
+    assert resolver.lookups == 1
+
+
+def test_failures_are_cached_for_the_negative_ttl():
+    resolver = ScriptedResolver(socket.gaierror("NXDOMAIN"), ["10.0.0.1"])
+    for _ in range(2):
+        with pytest.raises(socket.gaierror):
+            resolver.resolve("chat.test")
+    assert resolver.lookups == 1
+    assert resolver.peek("chat.test") is None
+
+    expire(resolver, "chat.test")
+    assert resolver.resolve("chat.test") == ["10.0.0.1"]
+    assert resolver.lookups == 2
+
+
+def test_expired_answer_is_served_while_it_refreshes():
+    resolver = ScriptedResolver(["10.0.0.1"], ["10.0.0.9"])
+    resolver.resolve("chat.test")
+    expire(resolver, "chat.test")
+    resolver.looked_up.clear()
+    assert resolver.resolve("chat.test") == ["10.0.0.1"]
+    wait_for_refresh(resolver, "chat.test")
+    assert resolver.resolve("chat.test") == ["10.0.0.9"]
+    assert resolver.lookups == 2
+
+
+def test_failed_refresh_keeps_the_last_good_answer():
+    resolver = ScriptedResolver(["10.0.0.1"], socket.gaierror("SERVFAIL"))
+    resolver.resolve("chat.test")
+    expire(resolver, "chat.test")
+    resolver.looked_up.clear()
+    assert resolver.resolve("chat.test") == ["10.0.0.1"]
+    wait_for_refresh(resolver, "chat.test")
+    assert resolver.resolve("chat.test") == ["10.0.0.1"]
+    assert resolver.lookups == 2
+
+
+def test_connection_tries_each_address_then_forgets_the_host():
+    resolver = ScriptedResolver(["10.0.0.1", "10.0.0.2"])
+    tried = []
+
+    def create_connection(address, *args, **kwargs):
+        tried.append(address)
+        if address[0] == "10.0.0.1":
+            raise ConnectionRefusedError()
+        return "socket"
+
+    resolver._original_create_connection = create_connection
+    assert resolver._create_connection(("chat.test", 443)) == "socket"
+    assert tried == [("10.0.0.1", 443), ("10.0.0.2", 443)]
+
+    resolver.answers = [["10.0.0.1"]]
+    resolver.invalidate("chat.test")
+    with pytest.raises(ConnectionRefusedError):
+        resolver._create_connection(("chat.test", 443))
+    assert resolver.peek("chat.test") is None
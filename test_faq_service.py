@@ -0,0 +1,43 @@
+from api.services.faq_service import FaqIndex, normalize_question, script_language
+
+ITEMS = [
+    {"question": "ساعت کاری دفتر چیست؟", "answer": "دفتر از ۹ تا ۱۷ باز است"},
+    {"question": "چطور بلیط هواپیما بخرم؟", "answer": "از بخش بلیط‌ها در اپلیکیشن"},
+    {"question": "What are your office hours?", "answer": "We are open 9 to 5."},
+    # The same question twice with different answers
+    {"question": "How do I cancel my booking?", "answer": "From the app."},
+    {"question": "How do I cancel my booking", "answer": "Call support."},
+]
+
+
+def test_normalize_question_merges_spelling_variants():
+    assert normalize_question("می‌شود؟") == normalize_question("میشود")
+    assert normalize_question("ساعت  ۹!") == "ساعت 9"
+    assert script_language("سلام hello") == "fa"
+    assert script_language("hello") == "en"
+
+
+def test_exact_and_variant_questions_match():
+    index = FaqIndex(ITEMS)
+    score, margin, row = index.match("ساعت کاری دفتر چیست؟")
+    assert row is ITEMS[0]
+    assert score > 0.99 and margin > 0.5
+    # Arabic letter forms (ك), spacing and punctuation still land on the same row
+    assert index.answer("ساعت كاری  دفتر چیست", "fa") is ITEMS[0]
+    assert index.answer("what are your office hours", "en") is ITEMS[2]
+
+
+def test_unrelated_or_ambiguous_questions_are_not_answered():
+    index = FaqIndex(ITEMS)
+    assert index.answer("weather forecast for tomorrow", "en") is None
+    assert index.answer("How do I cancel my booking?", "en") is None  # no margin
+    assert index.match("؟!") is None
+
+
+def test_answer_must_be_in_the_question_language():
+    index = FaqIndex(ITEMS)
+    assert index.answer("What are your office hours?", "fa") is None
+
+
+def test_empty_index():
+    assert FaqIndex([]).match("anything") is None
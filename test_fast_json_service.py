@@ -0,0 +1,89 @@
+import base64
+import json
+
+from api.schemas.assistant_schema import ChatResponse, Message
+from api.services import fast_json_service
+
+LIPSYNC_RAW = (
+    b'{\n  "metadata": {"soundFile": "message_0.wav", "duration": 0.47},\n'
+    b'  "mouthCues": [\n    {"start": 0.00, "end": 0.27, "value": "B"},\n'
+    b'    {"start": 0.27, "end": 0.47, "value": "X"}\n  ]\n}\n'
+)
+
+
+def messages(audio_path=None):
+    spoken = Message(
+        text='سلام! "خوش آمدید" \\ 😊',
+        audio=None if audio_path else base64.b64encode(b"\x00\xffmp3").decode(),
+        facialExpression="smile",
+        animation="Talking_1",
+        ttsProvider="avashow",
+    )
+    spoken._lipsync_raw = LIPSYNC_RAW
+    spoken._audio_path = audio_path
+    plain = Message(
+        text="Hello\nthere",
+        lipsync={"mouthCues": [{"start": 0.05, "end": 61.27, "value": "A"}]},
+        facialExpression="default",
+        animation="Idle",
+        audioPart=2,
+    )
+    return [spoken, plain]
+
+
+def encode_both(monkeypatch, encode):
+    assert fast_json_service.orjson is not None, "orjson is in requirements.txt"
+    fast = encode()
+    monkeypatch.setattr(fast_json_service, "orjson", None)
+    return fast, encode()
+
+
+def test_stdlib_and_orjson_produce_identical_bytes(monkeypatch):
+    fast, stdlib = encode_both(
+        monkeypatch, lambda: fast_json_service.chat_response_json(messages())
+    )
+    assert fast == stdlib
+    # ...and the same document pydantic would have produced
+    decoded = json.loads(fast)
+    assert decoded["messages"][0]["lipsync"] == json.loads(LIPSYNC_RAW)
+    expected = ChatResponse(messages=messages()).model_dump()
+    expected["messages"][0]["lipsync"] = json.loads(LIPSYNC_RAW)
+    assert decoded == expected
+
+
+def test_streamed_body_matches_for_both_encoders(monkeypatch, tmp_path):
+    audio = tmp_path / "message_0.mp3"
+    audio.write_bytes(bytes(range(256)) * 40)
+
+    def streamed():
+        return b"".join(
+            fast_json_service.iter_chat_response_json(
+                messages(str(audio)), chunk_size=1000
+            )
+        )
+
+    fast, stdlib = encode_both(monkeypatch, streamed)
+    assert fast == stdlib
+    decoded = json.loads(fast)["messages"][0]
+    assert base64.b64decode(decoded["audio"]) == audio.read_bytes()
+
+
+def test_audio_is_streamed_in_bounded_pieces(tmp_path):
+    audio = tmp_path / "message_0.mp3"
+    audio.write_bytes(bytes(range(256)) * 400)
+    # An odd chunk size is rounded down to whole base64 groups
+    pieces = list(fast_json_service.iter_chat_response_json(messages(str(audio)), 1001))
+    audio_pieces = [piece for piece in pieces if len(piece) > 500]
+    assert len(audio_pieces) > 50
+    assert max(len(piece) for piece in audio_pieces[1:-1]) == 1000 // 3 * 4
+    decoded = json.loads(b"".join(pieces))["messages"][0]
+    assert base64.b64decode(decoded["audio"]) == audio.read_bytes()
+
+
+def test_missing_audio_file_sends_the_message_without_it(tmp_path):
+    body = b"".join(
+        fast_json_service.iter_chat_response_json(messages(str(tmp_path / "gone.mp3")))
+    )
+    decoded = json.loads(body)["messages"]
+    assert decoded[0]["audio"] is None
+    assert decoded[0]["text"] == messages()[0].text
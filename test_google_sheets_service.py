@@ -0,0 +1,104 @@
+import pytest
+
+from api.services.google_sheets_service import GoogleSheetsService
+
+KNOWLEDGE = [["question", "answer", "category"], ["Hours?", "9 to 5", "Office"]]
+QUESTIONS = [["question", "answer"], ["Parking?", "Level -2"]]
+
+
+class Request:
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self):
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+class FakeValues:
+    """values() of the Sheets API, answering from {(sheet id, range): rows}."""
+
+    def __init__(self, sheets, calls):
+        self.sheets = sheets
+        self.calls = calls
+
+    def _rows(self, sheet_id, range_name):
+        if (sheet_id, range_name) not in self.sheets:
+            return Exception(f"Unable to parse range: {range_name}")
+        return self.sheets[(sheet_id, range_name)]
+
+    def get(self, spreadsheetId, range):
+        self.calls.append(("get", spreadsheetId, range))
+        rows = self._rows(spreadsheetId, range)
+        return Request(rows if isinstance(rows, Exception) else {"values": rows})
+
+    def batchGet(self, spreadsheetId, ranges):
+        self.calls.append(("batchGet", spreadsheetId, tuple(ranges)))
+        found = [self._rows(spreadsheetId, range_name) for range_name in ranges]
+        for rows in found:
+            if isinstance(rows, Exception):
+                return Request(rows)
+        return Request({"valueRanges": [{"values": rows} for rows in found]})
+
+
+def make_service(sheets, knowledge_sheet, questions_sheet):
+    service = GoogleSheetsService()
+    service.KNOWLEDGE_SHEET_ID = knowledge_sheet
+    service.QUESTIONS_SHEET_ID = questions_sheet
+    service.KNOWLEDGE_RANGE = "Knowledge!A1:C"
+    service.QUESTIONS_RANGE = "Questions!A1:B"
+    calls = []
+    values = FakeValues(sheets, calls)
+
+    class Client:
+        def spreadsheets(self):
+            return self
+
+        def values(self):
+            return values
+
+    service._clients[("sheets", "v4", tuple(service.SCOPES))] = Client()
+    return service, calls
+
+
+def test_one_spreadsheet_is_read_in_a_single_batch_get():
+    sheets = {("kb", "Knowledge!A1:C"): KNOWLEDGE, ("kb", "Questions!A1:B"): QUESTIONS}
+    service, calls = make_service(sheets, "kb", "kb")
+    knowledge, questions = service.fetch_knowledge_and_questions()
+    assert knowledge == [
+        {"question": "Hours?", "answer": "9 to 5", "category": "Office"}
+    ]
+    assert questions == [
+        {"question": "Parking?", "answer": "Level -2", "category": "General"}
+    ]
+    assert calls == [("batchGet", "kb", ("Knowledge!A1:C", "Questions!A1:B"))]
+
+
+def test_bad_questions_range_does_not_fail_the_knowledge():
+    service, calls = make_service({("kb", "Knowledge!A1:C"): KNOWLEDGE}, "kb", "kb")
+    knowledge, questions = service.fetch_knowledge_and_questions()
+    assert len(knowledge) == 1 and questions is None
+    assert [call[0] for call in calls] == ["batchGet", "get"]
+
+    service, _ = make_service({("kb", "Knowledge!A1:C"): KNOWLEDGE}, "kb", "other")
+    knowledge, questions = service.fetch_knowledge_and_questions()
+    assert len(knowledge) == 1 and questions is None
+
+
+def test_other_spreadsheet_or_none_for_the_questions():
+    sheets = {("kb", "Knowledge!A1:C"): KNOWLEDGE, ("qs", "Questions!A1:B"): QUESTIONS}
+    service, calls = make_service(sheets, "kb", "qs")
+    knowledge, questions = service.fetch_knowledge_and_questions()
+    assert len(knowledge) == 1 and len(questions) == 1
+    assert [call[0] for call in calls] == ["get", "get"]
+
+    service, calls = make_service(sheets, "kb", None)
+    assert service.fetch_knowledge_and_questions()[1] is None
+    assert len(calls) == 1
+
+
+def test_unreadable_knowledge_raises():
+    service, _ = make_service({}, "kb", "kb")
+    with pytest.raises(Exception):
+        service.fetch_knowledge_and_questions()
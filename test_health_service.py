@@ -0,0 +1,95 @@
+import io
+import threading
+import time
+
+import requests
+
+from api.services import health_service
+from api.services.health_service import HealthMonitor, Probe
+
+
+def ok():
+    return "connected"
+
+
+def failing():
+    raise RuntimeError("down")
+
+
+def test_only_critical_probes_decide_readiness():
+    monitor = HealthMonitor(
+        [Probe("database", ok, True), Probe("chat_service", failing, False)],
+        interval=15,
+        timeout=1,
+    )
+    assert not monitor.is_ready()  # nothing checked yet
+    monitor.run_once()
+    status = monitor.status()
+    assert status["ready"]
+    assert status["checks"]["database"]["detail"] == "connected"
+    assert status["checks"]["chat_service"]["status"] == "error"
+    assert "down" in status["checks"]["chat_service"]["detail"]
+
+    monitor.probes[0].check = failing
+    monitor.run_once()
+    assert not monitor.is_ready()
+    monitor.probes[0].check = ok
+    monitor.run_once()
+    assert monitor.is_ready()
+
+
+def test_stale_results_are_not_ready():
+    monitor = HealthMonitor([Probe("database", ok, True)], interval=1, timeout=1)
+    monitor.run_once()
+    assert monitor.is_ready()
+    monitor.results["database"]["checked_at"] -= 10
+    assert not monitor.is_ready()
+
+
+def test_stuck_probe_times_out_and_is_not_resubmitted():
+    release = threading.Event()
+    calls = []
+
+    def stuck():
+        calls.append(1)
+        release.wait(5)
+        return "late"
+
+    monitor = HealthMonitor([Probe("database", stuck, True)], interval=15, timeout=0.1)
+    started = time.perf_counter()
+    monitor.run_once()
+    assert time.perf_counter() - started < 1
+    assert monitor.results["database"]["status"] == "timeout"
+    monitor.run_once()
+    assert monitor.results["database"]["detail"] == "previous check still running"
+    assert len(calls) == 1
+    release.set()
+
+
+def test_default_probes_make_only_the_database_critical(monkeypatch):
+    monkeypatch.delenv("READINESS_PROBES", raising=False)
+    probes = {probe.name: probe.critical for probe in health_service.default_probes()}
+    assert probes == {"database": True, "chat_service": False, "knowledge_base": False}
+
+    monkeypatch.setenv("READINESS_PROBES", "database, knowledge_base")
+    probes = {probe.name: probe.critical for probe in health_service.default_probes()}
+    assert probes["knowledge_base"] and not probes["chat_service"]
+
+
+def test_chat_probe_uses_the_clients_tls_and_proxy_settings(monkeypatch):
+    monkeypatch.setenv("EXTERNAL_CHAT_SERVICE_URL", "https://chat.invalid/chat")
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.invalid:3128")
+    sent = {}
+
+    def head(session, url, **kwargs):
+        sent.update(kwargs, url=url, proxies=dict(session.proxies))
+        response = requests.Response()
+        response.status_code = 405
+        response.raw = io.BytesIO()
+        return response
+
+    monkeypatch.setattr(requests.Session, "head", head)
+    assert health_service.check_chat_service(timeout=2) == "reachable (HTTP 405)"
+    assert sent["verify"] is False
+    assert sent["timeout"] == 2
+    assert sent["proxies"]["https://"] == "http://proxy.invalid:3128"
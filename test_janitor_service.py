@@ -0,0 +1,79 @@
+import json
+import os
+
+from api.services.answer_cache_service import manifest_keys
+from api.services.janitor_service import Janitor, RetentionPolicy
+
+NOW = 1_000_000.0
+
+
+def make_file(directory, name, size, age):
+    path = directory / name
+    path.write_bytes(b"x" * size)
+    os.utime(path, (NOW - age, NOW - age))
+    return name
+
+
+def remaining(directory):
+    return sorted(os.listdir(directory))
+
+
+def sweep(policy):
+    return Janitor([policy], interval=60).sweep(policy, now=NOW)
+
+
+def test_expired_files_are_removed(tmp_path):
+    make_file(tmp_path, "message_s_0.mp3", 10, age=700)
+    make_file(tmp_path, "message_s_1.mp3", 10, age=10)
+    make_file(tmp_path, "intro.mp3", 10, age=7000)  # not matched by the policy
+    policy = RetentionPolicy(
+        "chat_temp", str(tmp_path), ["message_*_*.mp3"], max_age=600, max_bytes=1000
+    )
+    result = sweep(policy)
+    assert result == {"removed": 1, "reclaimed_bytes": 10, "bytes": 10}
+    assert remaining(tmp_path) == ["intro.mp3", "message_s_1.mp3"]
+
+
+def test_over_budget_removes_oldest_first_but_not_young_files(tmp_path):
+    make_file(tmp_path, "a.mp3", 100, age=500)
+    make_file(tmp_path, "b.mp3", 100, age=400)
+    make_file(tmp_path, "c.mp3", 100, age=300)
+    make_file(tmp_path, "d.mp3", 100, age=30)
+    make_file(tmp_path, "e.mp3", 100, age=20)
+    policy = RetentionPolicy(
+        "chat_temp", str(tmp_path), ["*.mp3"], 3600, max_bytes=150, min_age=120
+    )
+    assert sweep(policy)["removed"] == 3
+    # Still over budget, but the rest may be in use by a request
+    assert remaining(tmp_path) == ["d.mp3", "e.mp3"]
+
+
+def test_manifest_artifacts_are_kept_but_counted(tmp_path):
+    store = tmp_path / "artifacts"
+    store.mkdir()
+    manifest = tmp_path / "manifest.json"
+    answer = {"key": "en:hi", "audio": "a.mp3", "lipsync": "a.json"}
+    manifest.write_text(json.dumps({"answers": [answer]}))
+    make_file(store, "a.mp3", 100, age=10**6)
+    make_file(store, "a.json", 10, age=10**6)
+    make_file(store, "b.mp3", 100, age=10**6)
+    make_file(store, "c.mp3", 100, age=1000)
+
+    policy = RetentionPolicy(
+        "artifacts",
+        str(store),
+        ["*.mp3", "*.json"],
+        max_age=7 * 24 * 3600,
+        max_bytes=200,
+        min_age=600,
+        keep=lambda: manifest_keys(str(manifest)),
+    )
+    result = sweep(policy)
+    assert remaining(store) == ["a.json", "a.mp3"]
+    assert result["bytes"] == 110
+
+    # A rebuild that drops the answer releases its artifacts
+    manifest.write_text(json.dumps({"answers": []}))
+    os.utime(manifest, (NOW, NOW))
+    assert sweep(policy)["removed"] == 2
+    assert remaining(store) == []
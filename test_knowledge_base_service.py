@@ -0,0 +1,117 @@
+import json
+
+from api.services.knowledge_base_service import KnowledgeBaseCache
+
+ROWS = [{"question": "Hours?", "answer": "9 to 5", "category": "Office"}]
+HISTORY = [{"question": "Parking?", "answer": "Level -2", "category": "General"}]
+
+
+class FakeSheets:
+    """Stands in for GoogleSheetsService; an Exception as a value is raised."""
+
+    def __init__(self, items=ROWS, questions=HISTORY, revision="1"):
+        self.items = items
+        self.questions = questions
+        self.revision = revision
+        self.fetches = 0
+
+    def fetch_knowledge_and_questions(self):
+        self.fetches += 1
+        if isinstance(self.items, Exception):
+            raise self.items
+        return list(self.items), self.questions
+
+    def get_knowledge_revision(self):
+        if isinstance(self.revision, Exception):
+            raise self.revision
+        return self.revision
+
+
+def make_cache(tmp_path, sheets):
+    return KnowledgeBaseCache(sheets, str(tmp_path / "knowledge_base.json"), 900, 60)
+
+
+def test_questions_history_is_optional(tmp_path):
+    sheets = FakeSheets()
+    cache = make_cache(tmp_path, sheets)
+    assert cache.get().questions == HISTORY
+
+    # The questions range failed: the refresh succeeds and keeps the last history
+    sheets.questions = None
+    sheets.items = ROWS + [{"question": "Wifi?", "answer": "guest", "category": "IT"}]
+    assert cache.refresh()
+    assert len(cache.get().items) == 2
+    assert cache.get().questions == HISTORY
+    assert cache.status()["questions"] == 1
+
+    with open(tmp_path / "knowledge_base.json") as f:
+        assert json.load(f)["questions"] == HISTORY
+
+
+def test_snapshot_is_served_while_the_sheet_is_unreachable(tmp_path):
+    assert make_cache(tmp_path, FakeSheets()).get().source == "sheets"
+
+    sheets = FakeSheets(items=ConnectionError("no route to Google"))
+    cache = make_cache(tmp_path, sheets)
+    assert cache.get().source == "snapshot"
+    assert cache.get().items == ROWS and cache.get().questions == HISTORY
+    assert cache.status()["consecutive_failures"] == 1
+
+    # A snapshot is never trusted as fresh: the next pass refetches
+    sheets.items = ROWS
+    assert cache.refresh_if_stale()
+    assert cache.get().source == "sheets"
+    assert cache.status()["last_error"] is None
+
+
+def test_load_without_fetch_reads_only_the_snapshot(tmp_path):
+    sheets = FakeSheets()
+    cache = make_cache(tmp_path, sheets)
+    cache.load(fetch=False)
+    assert cache.get().source == "empty" and sheets.fetches == 0
+
+    make_cache(tmp_path, sheets).get()
+    cache = make_cache(tmp_path, sheets)
+    cache.load(fetch=False)
+    assert cache.get().source == "snapshot" and sheets.fetches == 1
+
+
+def test_unchanged_revision_skips_the_fetch(tmp_path):
+    sheets = FakeSheets()
+    cache = make_cache(tmp_path, sheets)
+    cache.get()
+    assert not cache.refresh_if_stale()
+    assert sheets.fetches == 1
+
+    sheets.revision = "2"
+    assert cache.refresh_if_stale()
+    assert sheets.fetches == 2 and cache.get().revision == "2"
+
+
+def test_empty_sheet_keeps_the_cached_copy(tmp_path):
+    sheets = FakeSheets()
+    cache = make_cache(tmp_path, sheets)
+    before = cache.get()
+    sheets.items = []
+    assert not cache.refresh()
+    assert cache.get() is before
+    assert "empty" in cache.status()["last_error"]
+
+
+class Forbidden(Exception):
+    class resp:
+        status = 403
+
+
+def test_unreadable_revision_falls_back_to_the_refresh_interval(tmp_path):
+    sheets = FakeSheets(revision=Forbidden("drive.metadata scope missing"))
+    cache = make_cache(tmp_path, sheets)
+    assert cache.get().revision is None
+    assert not cache.refresh_if_stale()
+    assert not cache._revision_readable
+
+    # No more revision checks; the full refresh interval drives refetches
+    sheets.revision = "unused"
+    cache.get().fetched_at -= cache.refresh_interval
+    assert cache.refresh_if_stale()
+    assert sheets.fetches == 2 and cache.get().revision is None
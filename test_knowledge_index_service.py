@@ -0,0 +1,63 @@
+from api.services.knowledge_index_service import KnowledgeIndex, tokenize
+
+ITEMS = [
+    {
+        "question": "ساعت کاری دفتر",
+        "answer": "دفتر از ۹ تا ۱۷ باز است",
+        "category": "دفتر",
+    },
+    {
+        "question": "چطور بلیط هواپیما بخرم؟",
+        "answer": "از بخش بلیط‌ها در اپلیکیشن",
+        "category": "پرواز",
+    },
+    {
+        "question": "What documents do I need for a visa?",
+        "answer": "A passport valid for six months and two photos.",
+        "category": "Visa",
+    },
+    {
+        "question": "Is there a self-service restaurant?",
+        "answer": "Yes, the سلف‌سرویس is on the ground floor.",
+        "category": "General",
+    },
+]
+
+
+def test_tokenize_folds_and_trims():
+    assert tokenize("بلیط‌ها") == tokenize("بلیطها") == ["بلیط"]
+    assert tokenize("ساعت ۹") == tokenize("ساعت 9")
+    assert tokenize("What are the visas?") == ["visa"]
+    assert tokenize("سلف‌سرویس") == ["سلف", "سرویس"]
+
+
+def test_best_row_first():
+    index = KnowledgeIndex(ITEMS)
+    results = index.search("بلیط هواپیما", k=3)
+    assert results[0][1] is ITEMS[1]
+    assert [score for score, _ in results] == sorted(
+        (score for score, _ in results), reverse=True
+    )
+
+    results = index.search("visa documents", k=3)
+    assert results[0][1] is ITEMS[2]
+
+
+def test_only_rows_sharing_a_term_are_returned():
+    index = KnowledgeIndex(ITEMS)
+    assert [row for _, row in index.search("دفتر", k=10)] == [ITEMS[0]]
+    assert index.search("unrelated weather forecast", k=10) == []
+    assert index.search("the and of", k=10) == []  # stopwords only
+
+
+def test_k_and_score_cutoffs():
+    index = KnowledgeIndex(ITEMS)
+    assert len(index.search("دفتر بلیط visa", k=2)) == 2
+    best = index.search("دفتر بلیط visa", k=3)[0][0]
+    assert index.search("دفتر بلیط visa", k=3, min_score=best + 1) == []
+    relative = index.search("دفتر بلیط visa", k=3, min_relative_score=1.0)
+    assert all(score == best for score, _ in relative)
+
+
+def test_empty_index():
+    assert KnowledgeIndex([]).search("anything", k=5) == []
@@ -0,0 +1,48 @@
+from api.services.lipsync_codec import (
+    COMPACT,
+    decode_compact,
+    encode_compact,
+    encode_lipsync,
+)
+
+RHUBARB_OUTPUT = {
+    "metadata": {"soundFile": "message_0.wav", "duration": 1.47},
+    "mouthCues": [
+        {"start": 0.00, "end": 0.05, "value": "X"},
+        {"start": 0.05, "end": 0.27, "value": "B"},
+        {"start": 0.27, "end": 0.41, "value": "G"},
+        {"start": 0.41, "end": 0.55, "value": "C"},
+        # Rhubarb leaves no gaps, but the format allows them
+        {"start": 0.83, "end": 1.12, "value": "A"},
+        {"start": 1.12, "end": 1.47, "value": "X"},
+    ],
+}
+
+
+def test_round_trip_is_lossless_at_rhubarb_precision():
+    compact = encode_compact(RHUBARB_OUTPUT)
+    assert compact["format"] == COMPACT
+    assert compact["v"] == "XBGCAX"
+    assert compact["s"] == [0, 0, 0, 0, 28, 0]
+    assert decode_compact(compact) == {"mouthCues": RHUBARB_OUTPUT["mouthCues"]}
+
+
+def test_rounding_does_not_drift_along_the_clip():
+    cues = [
+        {"start": i * 0.013, "end": (i + 1) * 0.013, "value": "B"} for i in range(500)
+    ]
+    decoded = decode_compact(encode_compact({"mouthCues": cues}))["mouthCues"]
+    half_quantum = 0.005 + 1e-9
+    for original, cue in zip(cues, decoded):
+        assert abs(cue["start"] - original["start"]) <= half_quantum
+        assert abs(cue["end"] - original["end"]) <= half_quantum
+
+
+def test_passthrough_for_other_formats_and_missing_data():
+    compact = encode_compact(RHUBARB_OUTPUT)
+    assert encode_compact(compact) is compact
+    assert decode_compact(RHUBARB_OUTPUT) is RHUBARB_OUTPUT
+    assert encode_compact(None) is None
+    assert encode_lipsync(RHUBARB_OUTPUT, "rhubarb") is RHUBARB_OUTPUT
+    assert encode_lipsync(RHUBARB_OUTPUT, "unknown") is RHUBARB_OUTPUT
+    assert encode_lipsync(RHUBARB_OUTPUT, COMPACT) == compact
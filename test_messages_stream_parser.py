@@ -0,0 +1,65 @@
+import json
+
+from api.services.openai_service import MessagesStreamParser, normalize_chat_messages
+
+
+def feed_in_chunks(body: str, size: int):
+    parser = MessagesStreamParser()
+    items = []
+    for start in range(0, len(body), size):
+        items.extend(parser.feed(body[start : start + size]))
+    return parser, items
+
+
+def test_items_of_every_type_in_order():
+    body = json.dumps(
+        {
+            "messages": [
+                {"text": "سلام", "animation": "Talking_1"},
+                "plain text",
+                42,
+                None,
+                -1.5e3,
+                True,
+                ["nested", {"a": "]"}],
+            ]
+        },
+        ensure_ascii=False,
+    )
+    expected = json.loads(body)["messages"]
+    for size in (1, 2, 3, 7, len(body)):
+        parser, items = feed_in_chunks(body, size)
+        assert items == expected, size
+        assert parser.text == body
+        # The streamed items line up with normalizing the whole body
+        normalized = normalize_chat_messages(json.loads(parser.text))
+        assert len(normalized) == len(items)
+
+
+def test_string_values_are_not_taken_for_keys():
+    body = '{"note": "messages", "other": ["x"], "messages": ["a", 1]}'
+    _, items = feed_in_chunks(body, 1)
+    assert items == ["a", 1]
+
+    body = '{"status": "messages", "data": ["not a message"]}'
+    _, items = feed_in_chunks(body, 4)
+    assert items == []
+
+
+def test_escaped_quotes_and_keys_split_across_chunks():
+    body = '{"mess\\u0061ges": ["say \\"hi\\"", {"text": "a\\\\"}], "after": [1]}'
+    _, items = feed_in_chunks(body, 3)
+    assert items == ['say "hi"', {"text": "a\\"}]
+
+
+def test_nested_messages_keys_are_ignored():
+    body = '{"meta": {"messages": ["inner"]}, "messages": [{"text": "outer"}]}'
+    _, items = feed_in_chunks(body, 5)
+    assert items == [{"text": "outer"}]
+
+
+def test_single_message_object_is_left_to_the_full_parse():
+    body = '{"messages": {"text": "one"}}'
+    parser, items = feed_in_chunks(body, 2)
+    assert items == []
+    assert normalize_chat_messages(json.loads(parser.text))[0]["text"] == "one"
@@ -0,0 +1,36 @@
+import time
+
+from api.services.metrics_service import StageTimer, metrics
+from benchmarks.common import latency_summary, percentile
+from benchmarks.load_chat import parse_server_timing
+
+
+def test_stages_accumulate_and_round_trip_through_server_timing():
+    timer = StageTimer("test_stage_seconds")
+    with timer.stage("tts"):
+        time.sleep(0.01)
+    timer.add("tts", 0.1)
+    timer.add("lipsync", 0.04)
+
+    durations = timer.durations()
+    assert durations["tts"] >= 0.11 and durations["lipsync"] == 0.04
+    parsed = parse_server_timing(timer.server_timing_header())
+    assert parsed.keys() == durations.keys()
+    for name, seconds in durations.items():
+        assert abs(parsed[name] - seconds) < 0.0001
+    assert "test_stage_seconds" in str(metrics.snapshot()["summaries"])
+
+
+def test_server_timing_parser_skips_malformed_entries():
+    header = "tts;dur=120.5, cache;desc=hit, lipsync;dur=x, total;dur=200"
+    assert parse_server_timing(header) == {"tts": 0.1205, "total": 0.2}
+    assert parse_server_timing(None) == {}
+
+
+def test_latency_summary_uses_nearest_rank_percentiles():
+    values = [i / 1000 for i in range(1, 101)]
+    assert percentile(values, 0.5) == 0.051
+    assert percentile([], 0.5) is None
+    summary = latency_summary(values)
+    assert (summary["p50_ms"], summary["p99_ms"], summary["max_ms"]) == (51, 99, 100)
+    assert latency_summary([])["mean_ms"] is None
@@ -0,0 +1,57 @@
+# Imported first: it gives the services the URLs they require at import time
+from benchmarks import micro
+
+
+def result(relative):
+    return {"ns_per_op": 1.0, "relative": relative, "calibration_ns": 1.0}
+
+
+def test_every_benchmark_runs():
+    for name, func in micro.build_benchmarks().items():
+        func()
+
+
+def test_compare_flags_only_confirmed_regressions():
+    baseline = {
+        "benchmarks": {
+            "steady": {"relative": 1.0},
+            "noisy": {"relative": 1.0},
+            "slower": {"relative": 1.0, "threshold": 1.5},
+        }
+    }
+    results = {
+        "benchmarks": {
+            "steady": result(1.2),
+            "noisy": result(2.0),
+            "slower": result(1.6),
+            "new": result(9.0),
+        }
+    }
+    rechecked = []
+
+    def recheck(name):
+        rechecked.append(name)
+        return result(1.1 if name == "noisy" else 1.7)
+
+    assert micro.compare(results, baseline, recheck) == ["slower"]
+    assert rechecked == ["noisy", "slower"]
+    # The faster of the two runs is the one reported
+    assert results["benchmarks"]["noisy"]["relative"] == 1.1
+    assert results["benchmarks"]["slower"]["relative"] == 1.6
+
+
+def test_passengers_are_mapped_to_our_schema():
+    from api.services.extract_info_service import normalize_passengers
+
+    passengers = normalize_passengers(
+        [
+            {"name": "Sara", "baggageCount": " 2 "},
+            {"name": "Ali", "luggageCount": 1, "nationality": "غیر ایرانی"},
+            {"name": "Reza", "baggageCount": "two"},
+            "not a record",
+        ]
+    )
+    assert [p["luggageCount"] for p in passengers] == [2, 1, 0]
+    assert passengers[0]["nationality"] == "ایرانی"
+    assert passengers[1]["nationality"] == "غیر ایرانی"
+    assert normalize_passengers(None) == []
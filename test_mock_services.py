@@ -0,0 +1,60 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from api.services.avashow_service import _decode_inline_audio
+from api.services.openai_service import normalize_chat_messages
+from mock_services.app import create_app
+from mock_services.profiles import MockProfile, load_profile
+
+INSTANT = {"distribution": "constant", "median": 0}
+
+
+def make_client(**endpoints):
+    config = {endpoint: INSTANT for endpoint in MockProfile.ENDPOINTS}
+    config.update(endpoints)
+    return TestClient(create_app(MockProfile("test", config)))
+
+
+def test_streamed_chat_is_the_same_document():
+    question = {"message": "CIP lounge?", "language": "fa", "sessionId": "s"}
+    plain = make_client().post("/chat", json=question).json()
+    streamed = make_client(chat={**INSTANT, "stream": True, "stream_interval": 0})
+    body = streamed.post("/chat", json=question).content
+    assert json.loads(body) == plain
+    assert normalize_chat_messages(plain)[0]["text"].startswith("سالن CIP")
+
+
+def test_avashow_answers_inline_and_as_a_file():
+    client = make_client()
+    headers = {"gateway-token": "token"}
+    payload = {"data": "سلام", "base64": "1", "filePath": "true", "checksum": "1"}
+    response = client.post("/TextToSpeech/v1/longText", json=payload, headers=headers)
+    data = response.json()["data"]["data"]
+    audio = _decode_inline_audio(data)
+    assert audio
+
+    path = data["filePath"].replace("http://testserver", "")
+    assert client.get(path).content == audio
+    assert client.get(path).status_code == 404  # each file is served once
+
+    batched = dict(payload, data="سلام\n...\nخداحافظ")
+    response = client.post("/TextToSpeech/v1/longText", json=batched, headers=headers)
+    assert len(_decode_inline_audio(response.json()["data"]["data"])) > len(audio)
+    assert client.post("/TextToSpeech/v1/longText", json=payload).status_code == 401
+
+
+def test_error_injection_and_stats():
+    client = make_client(extract_info={**INSTANT, "error_rate": 1, "error_status": 429})
+    assert client.post("/extract-info", json={"messages": []}).status_code == 429
+    stats = client.get("/__stats").json()
+    assert stats["requests"]["extract_info"] == stats["errors"]["extract_info"] == 1
+
+
+def test_profiles_are_reproducible_for_a_seed():
+    def samples(seed):
+        profile = load_profile("realistic", seed)
+        return [profile["avashow"].sample_latency() for _ in range(5)]
+
+    assert samples(7) == samples(7)
+    assert samples(7) != samples(8)
@@ -0,0 +1,48 @@
+import pytest
+
+from api.services.multipart_service import (
+    accepts_multipart,
+    build_multipart,
+    parse_multipart,
+)
+
+
+def test_round_trip_keeps_binary_bodies_intact():
+    audio = bytes(range(256)) * 8
+    parts = [
+        ({"Content-Type": "application/json"}, b'{"messages": []}'),
+        # Binary that contains CRLFs and dashes must not be taken for a boundary
+        ({"Content-Type": "audio/mpeg", "Content-ID": "<audio-0>"}, audio),
+        ({"Content-Type": "text/plain"}, b"\r\n--\r\n"),
+        ({"Content-Type": "application/octet-stream"}, b""),
+    ]
+    body, content_type = build_multipart(parts)
+    assert content_type.startswith("multipart/mixed; boundary=")
+
+    parsed = parse_multipart(body, content_type)
+    assert [part_body for _, part_body in parsed] == [body for _, body in parts]
+    assert parsed[1][0]["Content-ID"] == "<audio-0>"
+    assert parsed[1][0]["Content-Length"] == str(len(audio))
+
+
+def test_parts_without_content_length_end_at_the_delimiter():
+    body = (
+        b"--xyz\r\nContent-Type: text/plain\r\n\r\nfirst\r\n"
+        b"--xyz\r\nContent-Type: text/plain\r\n\r\nsecond\r\n"
+        b"--xyz--\r\n"
+    )
+    parsed = parse_multipart(body, 'multipart/mixed; boundary="xyz"')
+    assert [part_body for _, part_body in parsed] == [b"first", b"second"]
+
+
+def test_missing_boundary_is_rejected():
+    with pytest.raises(ValueError):
+        parse_multipart(b"", "multipart/mixed")
+
+
+def test_accept_header_negotiation():
+    assert accepts_multipart("multipart/mixed")
+    assert accepts_multipart("application/json, Multipart/Mixed; q=0.5")
+    assert not accepts_multipart("multipart/mixed; q=0")
+    assert not accepts_multipart("application/json")
+    assert not accepts_multipart(None)
@@ -0,0 +1,81 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+
+from api.services import openai_service
+
+
+@pytest.fixture(autouse=True)
+def fresh_hedge_budget(monkeypatch):
+    monkeypatch.setattr(
+        openai_service, "_hedge_decisions", openai_service.deque(maxlen=100)
+    )
+
+
+class Response:
+    ok = True
+
+    def close(self):
+        pass
+
+
+class Limiter:
+    def __init__(self, free):
+        self.free = free
+        self.released = 0
+
+    def try_acquire(self):
+        return self.free
+
+    def release(self):
+        self.released += 1
+
+    @contextmanager
+    def held(self):
+        yield
+        self.release()
+
+
+def test_refused_slot_does_not_use_up_the_budget():
+    record = openai_service._record_hedge_decision
+    assert not record(True, 0.25, acquire=lambda: False)
+    assert list(openai_service._hedge_decisions) == [False] * 4
+    assert record(True, 0.25, acquire=lambda: True)
+    # Now over the cap, so no slot is even asked for
+    assert not record(True, 0.25, acquire=lambda: pytest.fail("slot taken"))
+
+
+def test_rate_limited_hedge_waits_on_the_primary(monkeypatch):
+    service = openai_service.OpenAIService()
+    service.hedging_enabled = True
+    service.hedge_default_delay = 0.01
+    service.limiter = Limiter(free=False)
+    release = threading.Event()
+    calls = []
+
+    def post_chat(payload, timeout, limited=True):
+        calls.append(limited)
+        release.wait(5)
+        return Response()
+
+    monkeypatch.setattr(service, "_post_chat", post_chat)
+    threading.Timer(0.2, release.set).start()
+    assert service._post_with_hedge({}, 5).ok
+    assert calls == [True]
+    assert True not in openai_service._hedge_decisions
+
+    # With spare quota the same slow primary gets its hedge
+    release.clear()
+    service.limiter = Limiter(free=True)
+    threading.Timer(0.2, release.set).start()
+    assert service._post_with_hedge({}, 5).ok
+    assert calls == [True, True, False]
+    # The losing attempt hands its slot back once it finishes
+    for _ in range(100):
+        if service.limiter.released:
+            break
+        time.sleep(0.01)
+    assert service.limiter.released == 1
+    assert list(openai_service._hedge_decisions).count(True) == 1
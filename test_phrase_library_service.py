@@ -0,0 +1,72 @@
+import base64
+import json
+
+from api.services.phrase_library_service import (
+    PhraseLibrary,
+    build_library,
+    normalize_phrase,
+)
+
+
+class FakeRouter:
+    def __init__(self, fail=()):
+        self.texts = []
+        self.fail = fail
+
+    def synthesize(self, text, file_name, language):
+        self.texts.append(text)
+        if text in self.fail:
+            raise RuntimeError("every provider failed")
+        with open(file_name, "wb") as f:
+            f.write(f"mp3 of {text}".encode())
+        return "fake"
+
+
+class FakeLipSync:
+    def mp3_to_wav(self, mp3_path, wav_path):
+        with open(mp3_path, "rb") as source, open(wav_path, "wb") as f:
+            f.write(source.read())
+
+    def wav_to_lipsync_json(self, wav_path, json_path):
+        with open(json_path, "w") as f:
+            json.dump({"mouthCues": [{"start": 0, "end": 0.1, "value": "X"}]}, f)
+
+
+def test_normalization_ignores_letter_variants_and_decoration():
+    assert normalize_phrase("چه کمک دیگه‌ای از دستم برمیاد؟") == normalize_phrase(
+        "چه كمك ديگه اي از دستم برمیاد 😊"
+    )
+    assert normalize_phrase("Gate ۱۲!") == normalize_phrase("gate 12")
+    assert normalize_phrase("Have a nice trip!") != normalize_phrase("Have a trip")
+
+
+def test_built_phrases_are_found_by_normalized_text(tmp_path):
+    sources = {"en": ["Have a nice trip!"], "fa": ["سفر خوبی داشته باشید!"]}
+    result = build_library(sources, FakeRouter(), FakeLipSync(), str(tmp_path))
+    assert result == {"built": 2, "kept": 0, "failed": []}
+    assert not list(tmp_path.glob("*/*.wav"))
+
+    library = PhraseLibrary(str(tmp_path))
+    assert len(library) == 2
+    phrase = library.lookup("have a nice trip", "en-US")
+    audio, lipsync = phrase.load()
+    assert base64.b64decode(audio) == b"mp3 of Have a nice trip!"
+    assert lipsync["mouthCues"][0]["value"] == "X"
+    assert library.lookup("سفر خوبي داشته باشيد", "fa").provider == "fake"
+    assert library.lookup("Have a nice trip!", "fa") is None
+
+
+def test_rebuild_keeps_built_phrases_and_reports_failures(tmp_path):
+    build_library({"en": ["Hello!"]}, FakeRouter(), FakeLipSync(), str(tmp_path))
+
+    router = FakeRouter(fail={"Goodbye!"})
+    sources = {"en": ["hello", "Goodbye!", "Thanks!"]}
+    result = build_library(sources, router, FakeLipSync(), str(tmp_path))
+    assert result == {"built": 1, "kept": 1, "failed": ["Goodbye!"]}
+    assert router.texts == ["Goodbye!", "Thanks!"]
+    assert PhraseLibrary(str(tmp_path)).lookup("Goodbye", "en") is None
+
+    # force synthesizes everything again
+    router = FakeRouter()
+    build_library(sources, router, FakeLipSync(), str(tmp_path), force=True)
+    assert router.texts == sources["en"]
@@ -0,0 +1,76 @@
+import time
+from typing import Optional
+
+import pytest
+import requests
+
+from api.services.rate_limit_service import (
+    ProviderLimiter,
+    RateLimitExceeded,
+    retry_statuses,
+)
+
+
+def response(status: int, retry_after: Optional[str] = None) -> requests.Response:
+    result = requests.Response()
+    result.status_code = status
+    if retry_after is not None:
+        result.headers["Retry-After"] = retry_after
+    return result
+
+
+def test_burst_then_refill_at_the_rate():
+    limiter = ProviderLimiter("test", rate=20, burst=2)
+    assert limiter.acquire() < 0.01
+    limiter.release()
+    assert limiter.acquire() < 0.01
+    limiter.release()
+    # The bucket is empty: the next token takes 1 / rate seconds
+    assert 0.03 < limiter.acquire() < 0.2
+    limiter.release()
+
+
+def test_waits_no_longer_than_the_timeout():
+    limiter = ProviderLimiter("test", rate=1, burst=1)
+    limiter.acquire()
+    started = time.monotonic()
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire(timeout=0.05)
+    assert time.monotonic() - started < 0.5
+    assert not limiter._queue
+
+
+def test_concurrency_cap():
+    limiter = ProviderLimiter("test", max_concurrency=1)
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire(timeout=0.05)
+    limiter.release()
+    with limiter.limit():
+        assert limiter.in_flight == 1
+    assert limiter.in_flight == 0
+
+
+def test_429_pauses_callers_until_retry_after():
+    limiter = ProviderLimiter("test", rate=100, max_wait=0.05)
+    limiter.observe_response(response(429, "0.2"))
+    # Longer than max_wait, but within the call's timeout: waited out
+    assert limiter.acquire(timeout=1.0) >= 0.19
+    limiter.release()
+
+    limiter.observe_response(response(429, "5"))
+    started = time.monotonic()
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire(timeout=0.5)
+    # Beyond the timeout: fails at once instead of sleeping until the deadline
+    assert time.monotonic() - started < 0.1
+
+
+def test_disabled_limiter_leaves_429s_to_retries():
+    limiter = ProviderLimiter("test")
+    assert not limiter.enabled
+    limiter.observe_response(response(429, "30"))
+    assert limiter.acquire(timeout=0.05) < 0.01
+    assert 429 in retry_statuses(limiter)
+    assert 429 not in retry_statuses(ProviderLimiter("test", rate=5))
@@ -0,0 +1,148 @@
+import threading
+
+import pytest
+
+from api.services.tts_service import TTSProvider, TTSRouter
+
+
+class FakeProvider(TTSProvider):
+    """Writes "<name>:<text>" after the scripted outcomes of earlier calls."""
+
+    def __init__(self, name, outcomes=()):
+        self.name = name
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def synthesize(self, text, file_name, sink=None):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else "ok"
+        audio = f"{self.name}:{text}".encode()
+        if outcome == "fail":
+            raise RuntimeError(f"{self.name} is down")
+        if sink is not None:
+            sink.write(audio[:3])
+        if outcome == "break":
+            raise ConnectionError("connection dropped mid-stream")
+        if sink is not None:
+            sink.write(audio[3:])
+        with open(file_name, "wb") as f:
+            f.write(audio)
+
+
+class FakeSink:
+    def __init__(self):
+        self.chunks = []
+        self.aborted = False
+
+    def write(self, chunk):
+        self.chunks.append(chunk)
+
+    def abort(self):
+        self.aborted = True
+
+
+def make_router(*providers, **routes):
+    return TTSRouter(
+        list(providers), routes or {"en": [p.name for p in providers], "fa": []}
+    )
+
+
+@pytest.fixture
+def mp3(tmp_path):
+    return str(tmp_path / "message.mp3")
+
+
+def test_broken_stream_retries_the_same_provider_with_a_fresh_sink(mp3):
+    english = FakeProvider("elevenlabs", ["break"])
+    persian = FakeProvider("avashow")
+    router = make_router(english, persian)
+    sinks = []
+
+    def sink_factory():
+        sinks.append(FakeSink())
+        return sinks[-1]
+
+    assert router.synthesize("Hello", mp3, "en", sink_factory) == "elevenlabs"
+    assert english.calls == 2 and persian.calls == 0
+    assert sinks[0].aborted and not sinks[1].aborted
+    assert b"".join(sinks[1].chunks) == b"elevenlabs:Hello"
+    with open(mp3, "rb") as f:
+        assert f.read() == b"elevenlabs:Hello"
+
+
+def test_second_broken_stream_fails_over(mp3):
+    english = FakeProvider("elevenlabs", ["break", "break"])
+    persian = FakeProvider("avashow")
+    router = make_router(english, persian)
+    sinks = []
+
+    def sink_factory():
+        sinks.append(FakeSink())
+        return sinks[-1]
+
+    assert router.synthesize("Hello", mp3, "en", sink_factory) == "avashow"
+    assert english.calls == 2
+    assert [sink.aborted for sink in sinks] == [True, True, False]
+
+
+def test_failure_before_any_audio_fails_over_at_once(mp3):
+    english = FakeProvider("elevenlabs", ["fail"])
+    persian = FakeProvider("avashow")
+    router = make_router(english, persian)
+    assert router.synthesize("Hello", mp3, "en", FakeSink) == "avashow"
+    assert english.calls == 1
+
+
+def test_unhealthy_primary_moves_back_until_its_cooldown(mp3):
+    english = FakeProvider("elevenlabs", ["fail"] * 5)
+    persian = FakeProvider("avashow")
+    router = make_router(english, persian)
+    for _ in range(5):
+        assert router.synthesize("Hello", mp3, "en") == "avashow"
+    assert not router.is_healthy("elevenlabs", "en")
+    assert router.synthesize("Hello", mp3, "en") == "avashow"
+    assert english.calls == 5  # no longer tried first
+
+    stats = router.stats("elevenlabs", "en")
+    stats.last_failure -= router.cooldown
+    assert [p.name for p in router.candidates("en")] == ["elevenlabs", "avashow"]
+    assert router.synthesize("Hello", mp3, "en") == "elevenlabs"
+
+
+def test_slow_primary_is_demoted_without_racing(mp3):
+    english = FakeProvider("elevenlabs")
+    persian = FakeProvider("avashow")
+    router = make_router(english, persian)
+    assert not router.race_enabled
+    stats = router.stats("elevenlabs", "en")
+    for _ in range(router.min_samples):
+        stats.record(router.slow_seconds + 1, True)
+
+    assert [p.name for p in router.candidates("en")] == ["avashow", "elevenlabs"]
+    assert router.synthesize("Hello", mp3, "en") == "avashow"
+
+    # After the cooldown it is tried first again and judged on fresh samples
+    stats.slow_until -= router.cooldown
+    assert stats.latency.count() == 0
+    assert router.synthesize("Hello", mp3, "en") == "elevenlabs"
+
+
+def test_race_starts_the_next_provider_when_the_primary_is_slow(mp3):
+    release = threading.Event()
+
+    class Stuck(FakeProvider):
+        def synthesize(self, text, file_name, sink=None):
+            release.wait(5)
+            super().synthesize(text, file_name, sink)
+
+    english = Stuck("elevenlabs")
+    persian = FakeProvider("avashow")
+    router = make_router(english, persian)
+    router.race_enabled = True
+    router.race_default_delay = 0.05
+    try:
+        assert router.synthesize("Hello", mp3, "en") == "avashow"
+        with open(mp3, "rb") as f:
+            assert f.read() == b"avashow:Hello"
+    finally:
+        release.set()